@@ -1,4 +1,7 @@
+import os
+
 from flask import Flask
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
 from controllers.cuota_controller import cuota_bp
 from controllers.departamento_controller import departamento_bp
 from controllers.feedback_controller import feedback_bp
@@ -15,12 +18,57 @@ from controllers.queja_controller import queja_bp
 from controllers.residente_controller import residente_bp
 from controllers.solicitud_controller import solicitud_bp
 from controllers.transaccion_controller import transaccion_bp
+from controllers.importacion_controller import importacion_bp
+from controllers.cambios_controller import cambios_bp
+from controllers.busqueda_controller import busqueda_bp
+from controllers.personas_controller import personas_bp
+from controllers.estado_controller import estado_bp
+from controllers.archivo_controller import archivo_bp
+from services.auth_service import registrar_autenticacion
+from services.limite_service import registrar_limites
+from services.lecturas_service import instalar_mapa_identidad
+from services.condominio_service import registrar_condominios
+from services.conexion_service import registrar_calentamiento
+from services.deadline_service import registrar_deadlines
+from services.interruptor_service import registrar_interruptor
 
 # Inicializa la aplicación Flask
 app = Flask(__name__)
 
 # Configuración opcional
 app.config['DEBUG'] = True  # Activa el modo de depuración
+app.config['AUTH_REQUIRED'] = os.environ.get('AUTH_REQUIRED', '1') != '0'  # Exige token de Firebase en la API
+
+app.config['RATE_LIMIT_TASA'] = 20  # Fichas por segundo por cliente y ruta
+app.config['RATE_LIMIT_CAPACIDAD'] = 100  # Ráfaga máxima por cliente y ruta
+app.config['MAX_CONCURRENCIA'] = 64  # Solicitudes simultáneas antes de responder 503
+app.config['PROXIES_CONFIABLES'] = int(os.environ.get('PROXIES_CONFIABLES', '0'))  # Proxies delante de la app (X-Forwarded-For)
+
+app.config['MULTI_CONDOMINIO'] = os.environ.get('MULTI_CONDOMINIO', '0') == '1'  # Datos particionados por condominio
+app.config['DOMINIO_BASE'] = os.environ.get('DOMINIO_BASE')  # Condominio por subdominio: <id>.DOMINIO_BASE
+app.config['CONDOMINIOS_EN_MEMORIA'] = int(os.environ.get('CONDOMINIOS_EN_MEMORIA', '256'))  # Condominios con índices y feeds en memoria por worker
+
+app.config['DEADLINE_SOLICITUD'] = 10  # Segundos por solicitud antes de responder 504
+app.config['DEADLINE_MAXIMO'] = 60  # Máximo que un cliente puede pedir con X-Request-Timeout
+app.config['VIGENCIA_RESPALDO'] = 300  # Antigüedad máxima (s) de las lecturas servidas con el circuito abierto
+
+# Deadline de cada solicitud, aplicado a todas las llamadas a Firestore
+registrar_deadlines(app)
+
+# Verificación de tokens antes de cada solicitud (los tokens ya verificados quedan en caché)
+registrar_autenticacion(app)
+
+# Límite de tasa por usuario verificado y control de carga
+registrar_limites(app)
+
+# Cada documento se lee de Firestore a lo más una vez por solicitud
+instalar_mapa_identidad(app)
+
+# Condominio de la solicitud (después de la autenticación, que aporta el claim del token)
+registrar_condominios(app)
+
+# Con Firestore caído se falla rápido y las lecturas se responden desde el respaldo
+registrar_interruptor(app)
 
 # Registro de los controladores
 app.register_blueprint(cuota_bp, url_prefix='/api/cuota')
@@ -39,6 +87,15 @@ app.register_blueprint(queja_bp, url_prefix='/api/queja')
 app.register_blueprint(residente_bp, url_prefix='/api/residente')
 app.register_blueprint(solicitud_bp, url_prefix='/api/solicitud')
 app.register_blueprint(transaccion_bp, url_prefix='/api/transaccion')
+app.register_blueprint(importacion_bp, url_prefix='/api/importacion')
+app.register_blueprint(cambios_bp, url_prefix='/api/cambios')
+app.register_blueprint(busqueda_bp, url_prefix='/api/buscar')
+app.register_blueprint(personas_bp, url_prefix='/api/personas')
+app.register_blueprint(estado_bp, url_prefix='/api/estado')
+app.register_blueprint(archivo_bp, url_prefix='/api/archivo')
+
+# Abre las conexiones a Firestore en segundo plano con la primera solicitud de cada worker
+registrar_calentamiento(app)
 
 # Ruta de prueba para verificar que el servidor esté en funcionamiento
 @app.route('/')
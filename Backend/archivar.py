@@ -0,0 +1,45 @@
+# backend/archivar.py
+#
+# Job programado (por ejemplo con cron, una vez al mes): mueve al archivo los
+# historiales de pago, transacciones y notificaciones de los meses anteriores
+# al horizonte y deja un resumen por periodo.
+#   python archivar.py --meses 12 [--coleccion transaccion ...] [--condominio ID ...] [--simular]
+
+import argparse
+import json
+import sys
+
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
+from services.archivo_service import archivar, ARCHIVABLES, HORIZONTE_MESES
+from services.condominio_service import en_condominio
+
+
+def archivar_colecciones(colecciones, meses, simular):
+    return {coleccion: archivar(coleccion, meses=meses, simular=simular) for coleccion in colecciones}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Archiva los documentos de los periodos cerrados.')
+    parser.add_argument('--meses', type=int, default=HORIZONTE_MESES, help='Meses que se mantienen en las colecciones activas.')
+    parser.add_argument('--coleccion', action='append', choices=sorted(ARCHIVABLES), help='Colección a archivar (se puede repetir).')
+    parser.add_argument('--condominio', action='append', help='Condominio a procesar (se puede repetir).')
+    parser.add_argument('--simular', action='store_true', help='Cuenta los documentos sin mover nada.')
+    args = parser.parse_args()
+    if args.meses < 1:
+        parser.error('--meses debe ser al menos 1 (el mes en curso no se archiva).')
+
+    colecciones = args.coleccion or sorted(ARCHIVABLES)
+    if args.condominio:
+        resultado = {}
+        for condominio in args.condominio:
+            with en_condominio(condominio):
+                resultado[condominio] = archivar_colecciones(colecciones, args.meses, args.simular)
+    else:
+        resultado = archivar_colecciones(colecciones, args.meses, args.simular)
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# backend/benchmarks/asignacion.py
+#
+# Mide el motor de asignación en memoria con datos sintéticos.
+# Uso (desde Backend/): python -m benchmarks.asignacion --solicitudes 100000
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from models import PERSONAL_CARGO, SOLICITUD_TIPO, SOLICITUD_PRIORIDAD
+from services.asignacion_service import MotorAsignacion
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--solicitudes', type=int, default=100000)
+    parser.add_argument('--personal', type=int, default=500)
+    parser.add_argument('--mantenimientos', type=int, default=5000)
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    azar = random.Random(args.semilla)
+    ahora = datetime(2024, 1, 1, 12)
+    motor = MotorAsignacion(ahora)
+
+    inicio = time.perf_counter()
+    for i in range(args.personal):
+        motor.agregar_personal(f'personal/{i}', azar.choice(PERSONAL_CARGO))
+    for _ in range(args.mantenimientos):
+        desde = ahora + timedelta(hours=azar.randint(-48, 48))
+        motor.agregar_mantenimiento(f'personal/{azar.randrange(args.personal)}', desde, desde + timedelta(hours=azar.randint(1, 8)))
+    for i in range(args.solicitudes):
+        motor.agregar_solicitud(
+            f'solicitud/{i}',
+            azar.choice(SOLICITUD_TIPO),
+            azar.choice(SOLICITUD_PRIORIDAD),
+            ahora - timedelta(minutes=azar.randint(0, 100000))
+        )
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    asignaciones, sin_asignar = motor.asignar()
+    asignacion = time.perf_counter() - inicio
+
+    print(f'carga: {carga:.3f} s')
+    print(f'asignación: {asignacion:.3f} s para {len(asignaciones)} solicitudes '
+          f'({asignacion / max(len(asignaciones), 1) * 1e6:.1f} µs/solicitud), {len(sin_asignar)} sin asignar')
+
+
+if __name__ == '__main__':
+    main()
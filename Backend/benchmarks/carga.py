@@ -0,0 +1,333 @@
+# backend/benchmarks/carga.py
+#
+# Generador de carga con perfiles de tráfico de un condominio:
+#   recepción        búsqueda de personas y fichas de residentes y departamentos
+#   residentes       consulta de la cuota y registro del pago
+#   administradores  tablero de solicitudes (sondeo del listado) y cambios de estado
+# Reporta solicitudes por segundo, percentiles de latencia y errores por ruta.
+#
+# Uso (desde Backend/):
+#   python -m benchmarks.carga --duracion 60 --recepcion 10 --residentes 50 --administradores 5
+#   python -m benchmarks.carga --url http://localhost:5000 ...
+# Sin --url se levanta la API en un proceso aparte con el almacén en memoria
+# (FIRESTORE_BACKEND=memoria, sin autenticación) y se cargan datos sintéticos.
+
+import argparse
+import http.client
+import json
+import os
+import queue
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, quote
+
+APELLIDOS = ['González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva', 'Martínez', 'Sepúlveda',
+             'Morales', 'Rodríguez', 'López', 'Fuentes', 'Hernández', 'Torres', 'Araya', 'Flores', 'Espinoza', 'Valenzuela']
+NOMBRES = ['María', 'José', 'Ana', 'Juan', 'Carolina', 'Luis', 'Francisca', 'Diego', 'Camila', 'Pedro']
+SOLICITUD_TIPO = ['Mantenimiento', 'Reparación', 'Servicio General', 'Otro']
+SOLICITUD_PRIORIDAD = ['Baja', 'Media', 'Alta']
+METODOS_PAGO = ['Transferencia', 'Tarjeta', 'Efectivo']
+
+
+# El límite de tasa de la API es por usuario o, sin autenticación, por dirección
+# de origen. Contra una API local cada usuario virtual se conecta desde su propia
+# dirección de loopback (127.0.x.y), como si fuera otro dispositivo.
+def direccion_origen(url, numero):
+    if not urlsplit(url).hostname.startswith('127.'):
+        return None
+    return f'127.0.{1 + numero // 250}.{1 + numero % 250}'
+
+
+class Cliente:
+    def __init__(self, url, registro, origen=None, timeout=30):
+        partes = urlsplit(url)
+        self._conexion = http.client.HTTPConnection(
+            partes.hostname, partes.port or 80, timeout=timeout, source_address=(origen, 0) if origen else None
+        )
+        self._encabezados = {'Content-Type': 'application/json'}
+        self._registro = registro
+
+    # Devuelve (status, cuerpo JSON); status 0 si falló la conexión
+    def solicitar(self, metodo, ruta, nombre, cuerpo=None, encabezados=None):
+        datos = json.dumps(cuerpo).encode() if cuerpo is not None else None
+        inicio = time.perf_counter()
+        try:
+            self._conexion.request(metodo, ruta, body=datos, headers=dict(self._encabezados, **(encabezados or {})))
+            respuesta = self._conexion.getresponse()
+            contenido = respuesta.read()
+            status = respuesta.status
+        except (OSError, http.client.HTTPException):
+            self._conexion.close()
+            contenido, status = b'', 0
+        if self._registro is not None:
+            self._registro.agregar(nombre, status, time.perf_counter() - inicio)
+        try:
+            return status, json.loads(contenido) if contenido else None
+        except ValueError:
+            return status, None
+
+
+class Registro:
+    def __init__(self):
+        self._muestras = {}
+        self._lock = threading.Lock()
+
+    def agregar(self, nombre, status, segundos):
+        with self._lock:
+            self._muestras.setdefault(nombre, []).append((status, segundos))
+
+    def muestras(self):
+        with self._lock:
+            return {nombre: list(muestras) for nombre, muestras in self._muestras.items()}
+
+
+# Datos del condominio compartidos por los usuarios virtuales
+class Datos:
+    def __init__(self):
+        self.departamentos = []
+        self.residentes = []
+        self.apellidos = []
+        self.solicitudes = []
+        self.cuotas_pendientes = queue.Queue()
+
+
+# La preparación sale de una sola dirección: ante el límite de tasa se espera y se reintenta
+def _crear(cliente, ruta, cuerpo, reintentos=30):
+    status, respuesta = cliente.solicitar('POST', ruta, 'preparación', cuerpo)
+    while status in (429, 503) and reintentos:
+        time.sleep(1)
+        reintentos -= 1
+        status, respuesta = cliente.solicitar('POST', ruta, 'preparación', cuerpo)
+    if status != 201:
+        raise RuntimeError(f'POST {ruta} respondió {status}: {respuesta}')
+    return respuesta['data']
+
+
+def preparar(url, azar, departamentos, solicitudes):
+    cliente = Cliente(url, None)
+    datos = Datos()
+    vencimiento = (datetime.now(timezone.utc) + timedelta(days=10)).isoformat()
+    for i in range(departamentos):
+        departamento = _crear(cliente, '/api/departamento/', {
+            'numero': f'{100 + i}', 'piso': 1 + i // 8, 'tipo': azar.choice(['Propietario', 'Arriendo']),
+            'superficie': azar.randint(40, 120), 'estado': 'Ocupado',
+        })
+        datos.departamentos.append(departamento)
+        for _ in range(azar.randint(1, 2)):
+            apellido = azar.choice(APELLIDOS)
+            residente = _crear(cliente, '/api/residente/', {
+                'departamento': departamento['key'], 'nombre': azar.choice(NOMBRES), 'apepat': apellido,
+                'apemat': azar.choice(APELLIDOS), 'rut': f'{azar.randint(10000000, 25000000)}-{azar.randint(0, 9)}',
+                'telefono': f'+569{azar.randint(10000000, 99999999)}', 'email': f'residente{len(datos.residentes)}@condominio.cl',
+            })
+            datos.residentes.append(residente)
+            datos.apellidos.append(apellido)
+        for mes in range(1, 4):
+            cuota = _crear(cliente, '/api/cuota/', {
+                'departamento': departamento['key'], 'monto': 85000, 'periodo': f'2024-{mes:02d}',
+                'fecha_vencimiento': vencimiento, 'estado': 'Pendiente',
+            })
+            datos.cuotas_pendientes.put(cuota)
+    for _ in range(solicitudes):
+        solicitud = _crear(cliente, '/api/solicitud/', {
+            'residente': azar.choice(datos.residentes)['key'], 'tipo': azar.choice(SOLICITUD_TIPO),
+            'descripcion': 'Filtración en el baño del departamento', 'fecha_creacion': datetime.now(timezone.utc).isoformat(),
+            'estado': 'Pendiente', 'prioridad': azar.choice(SOLICITUD_PRIORIDAD),
+        })
+        datos.solicitudes.append(solicitud)
+    return datos
+
+
+# --- Perfiles de usuario ------------------------------------------------------
+# Cada perfil ejecuta una tarea y devuelve el tiempo de espera (s) antes de la siguiente
+
+def recepcion(cliente, datos, azar):
+    tarea = azar.random()
+    if tarea < 0.6:
+        prefijo = azar.choice(datos.apellidos)[:azar.randint(3, 5)]
+        cliente.solicitar('GET', f'/api/personas/?q={quote(prefijo)}&limite=10', 'GET /api/personas/?q=')
+    elif tarea < 0.9:
+        residente = azar.choice(datos.residentes)
+        cliente.solicitar('GET', f'/api/residente/{residente["id_residente"]}/', 'GET /api/residente/<id>/')
+    else:
+        departamento = azar.choice(datos.departamentos)
+        cliente.solicitar('GET', f'/api/departamento/{departamento["id_departamento"]}/', 'GET /api/departamento/<id>/')
+    return azar.uniform(1, 3)
+
+
+def residente(cliente, datos, azar):
+    try:
+        cuota = datos.cuotas_pendientes.get_nowait()
+    except queue.Empty:
+        cuota = None
+    pago = {
+        'monto': 85000, 'fecha_pago': datetime.now(timezone.utc).isoformat(),
+        'metodo_pago': azar.choice(METODOS_PAGO),
+    }
+    if cuota is not None:
+        cliente.solicitar('GET', f'/api/cuota/{cuota["id_cuota"]}/', 'GET /api/cuota/<id>/')
+        pago.update(departamento=cuota['departamento'], cuota=cuota['id_cuota'], periodo=cuota['periodo'])
+    else:
+        pago.update(departamento=azar.choice(datos.departamentos)['id_departamento'], periodo='2024-04')
+    cliente.solicitar('POST', '/api/pago/registrar/', 'POST /api/pago/registrar/', pago,
+                      {'Idempotency-Key': str(uuid.UUID(int=azar.getrandbits(128)))})
+    return azar.uniform(5, 15)
+
+
+def administrador(cliente, datos, azar):
+    cliente.solicitar('GET', '/api/solicitud/', 'GET /api/solicitud/')
+    if azar.random() < 0.3:
+        solicitud = azar.choice(datos.solicitudes)
+        ruta = f'/api/solicitud/{solicitud["id_solicitud"]}/'
+        cliente.solicitar('GET', ruta, 'GET /api/solicitud/<id>/')
+        cliente.solicitar('PATCH', ruta, 'PATCH /api/solicitud/<id>/', {'estado': azar.choice(['En Proceso', 'Completada'])})
+    return 5.0
+
+
+PERFILES = {'recepcion': recepcion, 'residentes': residente, 'administradores': administrador}
+
+
+def usuario_virtual(perfil, indice, numero, url, datos, registro, semilla, espera, fin):
+    azar = random.Random(f'{semilla}-{perfil}-{indice}')
+    cliente = Cliente(url, registro, direccion_origen(url, numero))
+    while time.monotonic() < fin:
+        pausa = PERFILES[perfil](cliente, datos, azar) * espera
+        time.sleep(max(0.0, min(pausa, fin - time.monotonic())))
+
+
+# --- API local ----------------------------------------------------------------
+
+_SERVIDOR = """
+import sys
+from werkzeug.serving import run_simple
+import app
+run_simple('127.0.0.1', int(sys.argv[1]), app.app, threaded=True)
+"""
+
+
+def levantar_api(puerto, latencia_ms, tasa_fallas):
+    entorno = dict(os.environ, FIRESTORE_BACKEND='memoria', AUTH_REQUIRED='0', NOTIFICACIONES_TRANSPORTE='falso',
+                   MEMORIA_LATENCIA_MS=str(latencia_ms), MEMORIA_TASA_FALLAS=str(tasa_fallas))
+    directorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    proceso = subprocess.Popen([sys.executable, '-c', _SERVIDOR, str(puerto)], cwd=directorio, env=entorno)
+    url = f'http://127.0.0.1:{puerto}'
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError('La API terminó al iniciar.')
+        try:
+            conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=1)
+            conexion.request('GET', '/')
+            if conexion.getresponse().status == 200:
+                return proceso, url
+        except OSError:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError('La API no respondió en 30 s.')
+
+
+# --- Reporte ------------------------------------------------------------------
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    return valores[min(len(valores) - 1, max(0, int(round(p / 100 * len(valores) + 0.5)) - 1))]
+
+
+def resumir(muestras, duracion):
+    filas = []
+    for nombre, resultados in sorted(muestras.items()):
+        tiempos = sorted(segundos for _, segundos in resultados)
+        filas.append({
+            'ruta': nombre,
+            'solicitudes': len(resultados),
+            'rps': len(resultados) / duracion,
+            'p50_ms': percentil(tiempos, 50) * 1000,
+            'p90_ms': percentil(tiempos, 90) * 1000,
+            'p99_ms': percentil(tiempos, 99) * 1000,
+            'max_ms': tiempos[-1] * 1000,
+            'errores_4xx': sum(1 for status, _ in resultados if 400 <= status < 500),
+            'errores_5xx': sum(1 for status, _ in resultados if status >= 500 or status == 0),
+            'limitadas': sum(1 for status, _ in resultados if status in (429, 503)),
+        })
+    return filas
+
+
+def imprimir(filas, duracion):
+    print(f'{"ruta":<32} {"n":>7} {"rps":>8} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} {"max ms":>8} {"4xx":>6} {"5xx":>6}')
+    for fila in filas:
+        print(f'{fila["ruta"]:<32} {fila["solicitudes"]:>7} {fila["rps"]:>8.1f} {fila["p50_ms"]:>8.1f} '
+              f'{fila["p90_ms"]:>8.1f} {fila["p99_ms"]:>8.1f} {fila["max_ms"]:>8.1f} {fila["errores_4xx"]:>6} {fila["errores_5xx"]:>6}')
+    total = sum(fila['solicitudes'] for fila in filas)
+    errores = sum(fila['errores_5xx'] for fila in filas)
+    limitadas = sum(fila['limitadas'] for fila in filas)
+    print(f'total: {total} solicitudes en {duracion:.1f} s ({total / duracion:.1f} rps), '
+          f'errores 5xx: {errores} ({errores / max(total, 1):.2%}), rechazadas por límite o carga: {limitadas}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='API ya levantada; sin esto se levanta una local con el almacén en memoria')
+    parser.add_argument('--puerto', type=int, default=5055)
+    parser.add_argument('--duracion', type=float, default=60)
+    parser.add_argument('--rampa', type=float, default=10, help='segundos en que se van sumando los usuarios')
+    parser.add_argument('--recepcion', type=int, default=10)
+    parser.add_argument('--residentes', type=int, default=50)
+    parser.add_argument('--administradores', type=int, default=5)
+    parser.add_argument('--espera', type=float, default=1.0, help='factor de los tiempos de espera entre tareas (0: sin pausas)')
+    parser.add_argument('--departamentos', type=int, default=100)
+    parser.add_argument('--solicitudes', type=int, default=300)
+    parser.add_argument('--latencia-ms', type=float, default=0, help='latencia simulada del almacén en memoria')
+    parser.add_argument('--tasa-fallas', type=float, default=0, help='fracción de llamadas al almacén en memoria que fallan')
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--json', help='guarda el resumen en este archivo')
+    args = parser.parse_args()
+
+    proceso = None
+    url = args.url
+    if url is None:
+        proceso, url = levantar_api(args.puerto, args.latencia_ms, args.tasa_fallas)
+    try:
+        inicio = time.perf_counter()
+        datos = preparar(url, random.Random(args.semilla), args.departamentos, args.solicitudes)
+        print(f'preparación: {len(datos.departamentos)} departamentos, {len(datos.residentes)} residentes, '
+              f'{datos.cuotas_pendientes.qsize()} cuotas, {len(datos.solicitudes)} solicitudes '
+              f'en {time.perf_counter() - inicio:.1f} s')
+
+        registro = Registro()
+        usuarios = [(perfil, i) for perfil in PERFILES for i in range(getattr(args, perfil))]
+        random.Random(args.semilla).shuffle(usuarios)
+        fin = time.monotonic() + args.duracion
+        hilos = []
+        inicio = time.perf_counter()
+        for n, (perfil, i) in enumerate(usuarios):
+            hilo = threading.Thread(
+                target=usuario_virtual,
+                args=(perfil, i, n, url, datos, registro, args.semilla, args.espera, fin),
+                daemon=True,
+            )
+            hilo.start()
+            hilos.append(hilo)
+            time.sleep(args.rampa / max(len(usuarios), 1) if n < len(usuarios) - 1 else 0)
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        filas = resumir(registro.muestras(), duracion)
+        imprimir(filas, duracion)
+        if args.json:
+            with open(args.json, 'w') as archivo:
+                json.dump({'duracion': duracion, 'usuarios': len(usuarios), 'rutas': filas}, archivo, indent=2)
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == '__main__':
+    main()
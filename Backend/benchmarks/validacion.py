@@ -0,0 +1,99 @@
+# backend/benchmarks/validacion.py
+#
+# Compara la validación con esquemas compilados contra la validación
+# interpretada campo por campo (como la hacían los controladores).
+# Uso (desde Backend/): python -m benchmarks.validacion --solicitudes 100000
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from models import Solicitud, SOLICITUD_TIPO, SOLICITUD_ESTADO, SOLICITUD_PRIORIDAD
+from services.esquema_service import Esquema, ErrorValidacion
+
+
+# Validación sin compilar: recorre los atributos de FireO en cada solicitud y
+# decide el tipo por el nombre de la clase del campo
+def validar_interpretado(modelo, datos):
+    errores = []
+    for nombre, campo in modelo._meta.field_list.items():
+        atributos = campo.raw_attributes
+        valor = datos.get(nombre)
+        if valor in (None, ''):
+            if atributos.get('required'):
+                errores.append(f'El campo {nombre} es requerido.')
+            continue
+        tipo = type(campo).__name__
+        if tipo in ('TextField', 'ReferenceField') and not isinstance(valor, str):
+            errores.append(f'El campo {nombre} debe ser texto.')
+            continue
+        if tipo == 'DateTime':
+            try:
+                valor = datetime.fromisoformat(valor)
+            except (TypeError, ValueError):
+                errores.append(f'El campo {nombre} debe ser una fecha ISO 8601.')
+            continue
+        if atributos.get('choices') and valor not in atributos['choices']:
+            errores.append(f'El campo {nombre} debe ser uno de: {", ".join(atributos["choices"])}.')
+        for validador in atributos.get('validators') or ():
+            try:
+                validador(valor)
+            except ValueError as e:
+                errores.append(str(e))
+    if errores:
+        raise ErrorValidacion(errores)
+    return {nombre: valor for nombre, valor in datos.items() if nombre in modelo._meta.field_list}
+
+
+def generar(azar, cantidad, fraccion_invalidas):
+    solicitudes = []
+    for i in range(cantidad):
+        datos = {
+            'residente': f'residente/{i}',
+            'tipo': azar.choice(SOLICITUD_TIPO),
+            'descripcion': 'Solicitud sintética',
+            'fecha_creacion': '2024-01-01T12:00:00',
+            'estado': azar.choice(SOLICITUD_ESTADO),
+            'prioridad': azar.choice(SOLICITUD_PRIORIDAD),
+        }
+        if azar.random() < fraccion_invalidas:
+            datos[azar.choice(['tipo', 'estado', 'prioridad'])] = 'Otro valor'
+        solicitudes.append(datos)
+    return solicitudes
+
+
+def medir(validar, solicitudes):
+    rechazadas = 0
+    inicio = time.perf_counter()
+    for datos in solicitudes:
+        try:
+            validar(datos)
+        except ErrorValidacion:
+            rechazadas += 1
+    return time.perf_counter() - inicio, rechazadas
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--solicitudes', type=int, default=100000)
+    parser.add_argument('--invalidas', type=float, default=0.1)
+    parser.add_argument('--semilla', type=int, default=1)
+    args = parser.parse_args()
+
+    solicitudes = generar(random.Random(args.semilla), args.solicitudes, args.invalidas)
+
+    inicio = time.perf_counter()
+    esquema = Esquema(Solicitud)
+    compilacion = time.perf_counter() - inicio
+
+    interpretado, rechazadas_i = medir(lambda datos: validar_interpretado(Solicitud, datos), solicitudes)
+    compilado, rechazadas_c = medir(esquema.validar, solicitudes)
+
+    print(f'compilación del esquema: {compilacion * 1e6:.1f} µs')
+    for nombre, segundos, rechazadas in (('interpretado', interpretado, rechazadas_i), ('compilado', compilado, rechazadas_c)):
+        print(f'{nombre}: {segundos:.3f} s ({args.solicitudes / segundos:,.0f} solicitudes/s), {rechazadas} rechazadas')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# backend/condominios.py
+#
+# Registra condominios (documento condominios/{id}); con MULTI_CONDOMINIO=1 la
+# API solo atiende condominios registrados:
+#   python condominios.py registrar ID [--nombre NOMBRE]
+#   python condominios.py listar
+
+import argparse
+import json
+import sys
+
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
+from services.condominio_service import registrar_condominio, listar_condominios, CondominioInvalido
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Registro de condominios.')
+    comandos = parser.add_subparsers(dest='comando', required=True)
+    registrar = comandos.add_parser('registrar', help='Registra un condominio.')
+    registrar.add_argument('condominio')
+    registrar.add_argument('--nombre', help='Nombre del condominio (por defecto, su id).')
+    comandos.add_parser('listar', help='Lista los condominios registrados.')
+    args = parser.parse_args()
+
+    if args.comando == 'listar':
+        print(json.dumps(listar_condominios(), ensure_ascii=False, indent=2, default=str))
+        return 0
+
+    try:
+        registrado = registrar_condominio(args.condominio, args.nombre)
+    except CondominioInvalido as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    print(json.dumps({'condominio': args.condominio, 'registrado': registrado}, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,52 @@
+# backend/controllers/archivo_controller.py
+
+from flask import Blueprint, request, jsonify
+from services.archivo_service import listar_periodos, leer_periodo, obtener_archivado, ErrorArchivo, TAMANO_PAGINA
+from services.interruptor_service import ENDPOINTS_RESPALDO
+
+archivo_bp = Blueprint('archivo_bp', __name__)
+
+# Lectura de los documentos archivados de historialpago, transaccion y notificacion.
+# Las colecciones activas solo conservan los periodos recientes.
+
+# Ruta: Resúmenes de los periodos archivados (opcionalmente de una colección)
+# Ejemplo: /api/archivo/?coleccion=transaccion
+@archivo_bp.route('/', methods=['GET'])
+def get_periodos():
+    try:
+        return jsonify({'status': 'success', 'data': listar_periodos(request.args.get('coleccion'))}), 200
+    except ErrorArchivo as e:
+        return jsonify({'status': 'error', 'message': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Ruta: Documentos archivados de una colección en un periodo (AAAA-MM), paginados
+# Ejemplo: /api/archivo/transaccion/2024-03/?limite=50&cursor=<id del último documento>
+@archivo_bp.route('/<coleccion>/<periodo>/', methods=['GET'])
+def get_periodo(coleccion, periodo):
+    try:
+        limite = min(int(request.args.get('limite', TAMANO_PAGINA)), 200)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser numérico.'}), 400
+    if limite <= 0:
+        return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser positivo.'}), 400
+    try:
+        pagina, siguiente = leer_periodo(coleccion, periodo, limite, request.args.get('cursor'))
+        return jsonify({'status': 'success', 'data': pagina, 'siguiente': siguiente}), 200
+    except ErrorArchivo as e:
+        return jsonify({'status': 'error', 'message': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Ruta: Un documento archivado
+@archivo_bp.route('/<coleccion>/<periodo>/<id_documento>/', methods=['GET'])
+def get_archivado(coleccion, periodo, id_documento):
+    try:
+        return jsonify({'status': 'success', 'data': obtener_archivado(coleccion, periodo, id_documento)}), 200
+    except ErrorArchivo as e:
+        return jsonify({'status': 'error', 'message': str(e)}), e.status
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# El archivo no cambia salvo al archivar: sus lecturas se pueden servir desde el respaldo
+ENDPOINTS_RESPALDO.update({'archivo_bp.get_periodos', 'archivo_bp.get_periodo', 'archivo_bp.get_archivado'})
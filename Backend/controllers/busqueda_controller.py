@@ -0,0 +1,42 @@
+# backend/controllers/busqueda_controller.py
+
+from flask import Blueprint, request, jsonify
+from services.busqueda_service import buscador, FUENTES, IndiceNoDisponible
+
+busqueda_bp = Blueprint('busqueda_bp', __name__)
+
+# Ruta: Buscar texto en quejas, feedback y solicitudes, ordenado por relevancia
+# Ejemplo: /api/buscar/?q=filtración ascensor&colecciones=queja,solicitud&limite=20
+@busqueda_bp.route('/', methods=['GET'])
+def buscar():
+    try:
+        consulta = request.args.get('q', '').strip()
+        if not consulta:
+            return jsonify({'status': 'error', 'message': 'El parámetro q es requerido.'}), 400
+
+        colecciones = [c for c in request.args.get('colecciones', '').split(',') if c]
+        desconocidas = set(colecciones) - set(FUENTES)
+        if desconocidas:
+            return jsonify({'status': 'error', 'message': f'Colecciones no soportadas: {", ".join(sorted(desconocidas))}.'}), 400
+
+        try:
+            limite = min(int(request.args.get('limite', 20)), 100)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser numérico.'}), 400
+
+        resultados = buscador.buscar(consulta, colecciones or None, limite)
+
+        return jsonify({'status': 'success', 'data': resultados}), 200
+    except IndiceNoDisponible as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503, {'Retry-After': '5'}
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Ruta: Reconstruir el índice de búsqueda desde Firestore
+@busqueda_bp.route('/reconstruir/', methods=['POST'])
+def reconstruir_indice():
+    try:
+        indice = buscador.reconstruir()
+        return jsonify({'status': 'success', 'data': {'documentos': len(indice)}}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
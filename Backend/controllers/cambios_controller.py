@@ -0,0 +1,30 @@
+# backend/controllers/cambios_controller.py
+
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from services.auth_service import ENDPOINTS_TOKEN_URL, PARAMETRO_TOKEN
+from services.cambios_service import obtener_feed, eventos_sse
+
+cambios_bp = Blueprint('cambios_bp', __name__)
+
+# Ruta: Suscribirse a los cambios de solicitudes, quejas y notificaciones (Server-Sent Events)
+# Ejemplo: /api/cambios/?colecciones=solicitud,queja&estado=Pendiente&personal=<id_personal>
+# EventSource no envía encabezados: el token puede ir en ?token= (emitido hace menos de 5 minutos)
+@cambios_bp.route('/', methods=['GET'])
+def stream_cambios():
+    try:
+        colecciones = [c for c in request.args.get('colecciones', '').split(',') if c]
+        filtros = {k: v for k, v in request.args.items() if k not in ('colecciones', PARAMETRO_TOKEN)}
+
+        feed = obtener_feed()
+        suscripcion = feed.suscribir(colecciones, filtros)
+
+        respuesta = Response(stream_with_context(eventos_sse(feed, suscripcion)), mimetype='text/event-stream')
+        respuesta.headers['Cache-Control'] = 'no-cache'
+        respuesta.headers['X-Accel-Buffering'] = 'no'
+        return respuesta
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+ENDPOINTS_TOKEN_URL.add('cambios_bp.stream_cambios')
@@ -1,102 +1,47 @@
-# controllers/departamento_controller.py
+# backend/controllers/departamento_controller.py
 
 from flask import Blueprint, request, jsonify
 from models import Departamento
-from fireo.errors import DoesNotExist, Duplicate, NotFound
-from fireo.query import Q
+from services.interruptor_service import ENDPOINTS_RESPALDO
+from services.recurso_service import Recurso
+from services.resumen_service import (
+    resumen_departamento, reconstruir_resumenes, listar_departamentos, CAMPOS_RESUMEN, TAMANO_PAGINA
+)
 
 departamento_bp = Blueprint('departamento_bp', __name__)
 
-# Ruta: Obtener todos los departamentos
-@departamento_bp.route('/', methods=['GET'])
-def get_departamentos():
-    try:
-        departamentos = Departamento.collection.all()
-        departamentos_list = [dept.to_dict() for dept in departamentos]
-        return jsonify({'status': 'success', 'data': departamentos_list}), 200
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+# Rutas: listar, obtener, crear, actualizar y eliminar los departamentos
+recurso = Recurso(
+    Departamento,
+    'Departamento',
+    duplicado='El número de departamento ya existe.',
+    resumen=resumen_departamento,
+    solo_lectura=CAMPOS_RESUMEN
+).registrar(departamento_bp, 'departamento', 'departamentos')
 
-# Ruta: Obtener un departamento por ID
-@departamento_bp.route('/<id_departamento>/', methods=['GET'])
-def get_departamento(id_departamento):
+# Ruta: Listado paginado de departamentos con su resumen (residentes, propietario, saldo y solicitudes)
+# Ejemplo: /api/departamento/resumen/?limite=50&cursor=0412/<id del departamento>
+@departamento_bp.route('/resumen/', methods=['GET'])
+def get_resumenes():
     try:
-        departamento = Departamento.collection.get(id_departamento)
-        if departamento:
-            return jsonify({'status': 'success', 'data': departamento.to_dict()}), 200
-        else:
-            return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# Ruta: Crear un nuevo departamento
-@departamento_bp.route('/', methods=['POST'])
-def create_departamento():
+        limite = min(int(request.args.get('limite', TAMANO_PAGINA)), 200)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser numérico.'}), 400
+    if limite <= 0:
+        return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser positivo.'}), 400
     try:
-        data = request.get_json()
-        
-        # Validación básica de los campos requeridos
-        required_fields = ['numero', 'piso', 'tipo', 'superficie', 'estado']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'status': 'error', 'message': f'El campo {field} es requerido.'}), 400
-        
-        # Crear una instancia de Departamento
-        departamento = Departamento(
-            numero=data['numero'],
-            piso=data['piso'],
-            tipo=data['tipo'],
-            superficie=data['superficie'],
-            estado=data['estado']
-        )
-        
-        # Guardar en Firestore
-        departamento.save()
-        
-        return jsonify({'status': 'success', 'data': departamento.to_dict()}), 201
-    except Duplicate:
-        return jsonify({'status': 'error', 'message': 'El número de departamento ya existe.'}), 409
+        documentos, siguiente = listar_departamentos(limite, request.args.get('cursor'))
+        pagina = [recurso.serializar_snapshot(snapshot) for snapshot in documentos]
+        return jsonify({'status': 'success', 'data': pagina, 'siguiente': siguiente}), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-# Ruta: Actualizar un departamento existente
-@departamento_bp.route('/<id_departamento>/', methods=['PUT'])
-def update_departamento(id_departamento):
-    try:
-        data = request.get_json()
-        departamento = Departamento.collection.get(id_departamento)
-        if not departamento:
-            return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-        
-        # Actualizar los campos proporcionados
-        for key, value in data.items():
-            if hasattr(departamento, key):
-                setattr(departamento, key, value)
-        
-        # Guardar cambios
-        departamento.save()
-        
-        return jsonify({'status': 'success', 'data': departamento.to_dict()}), 200
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+ENDPOINTS_RESPALDO.add('departamento_bp.get_resumenes')
 
-# Ruta: Eliminar un departamento
-@departamento_bp.route('/<id_departamento>/', methods=['DELETE'])
-def delete_departamento(id_departamento):
+# Ruta: Recalcular el resumen de todos los departamentos desde Firestore
+@departamento_bp.route('/resumen/reconstruir/', methods=['POST'])
+def reconstruir_resumen():
     try:
-        departamento = Departamento.collection.get(id_departamento)
-        if not departamento:
-            return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-        
-        # Eliminar el departamento
-        departamento.delete()
-        
-        return jsonify({'status': 'success', 'message': 'Departamento eliminado correctamente.'}), 200
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
+        return jsonify({'status': 'success', 'data': {'departamentos': reconstruir_resumenes()}}), 200
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
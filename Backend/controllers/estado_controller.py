@@ -0,0 +1,21 @@
+# backend/controllers/estado_controller.py
+
+from flask import Blueprint, jsonify
+from services.conexion_service import metricas_conexiones
+from services.interruptor_service import interruptor
+from services.limite_service import limitador
+
+estado_bp = Blueprint('estado_bp', __name__)
+
+# Ruta: Estado del proceso (pool de canales de Firestore, circuito y solicitudes en curso)
+@estado_bp.route('/', methods=['GET'])
+def get_estado():
+    try:
+        estado = {
+            'solicitudes_en_curso': limitador.en_curso(),
+            'firestore': metricas_conexiones(),
+            'circuito': interruptor.metricas(),
+        }
+        return jsonify({'status': 'success', 'data': estado}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -0,0 +1,26 @@
+# backend/controllers/importacion_controller.py
+
+from flask import Blueprint, request, jsonify
+from services.importacion_service import importar, ImportacionError, ENTIDADES
+
+importacion_bp = Blueprint('importacion_bp', __name__)
+
+# Ruta: Importar un archivo CSV o XLSX de departamentos, propietarios o residentes
+@importacion_bp.route('/<entidad>/', methods=['POST'])
+def importar_archivo(entidad):
+    try:
+        if entidad not in ENTIDADES:
+            return jsonify({'status': 'error', 'message': f'Entidad {entidad} no soportada.'}), 404
+
+        archivo = request.files.get('archivo')
+        if not archivo:
+            return jsonify({'status': 'error', 'message': 'El archivo es requerido.'}), 400
+
+        validar_solo = request.args.get('validar_solo', '').lower() in ('1', 'true', 'si')
+        resultado = importar(entidad, archivo.stream, archivo.filename, validar_solo=validar_solo)
+
+        return jsonify({'status': 'success', 'data': resultado}), 200
+    except ImportacionError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -1,113 +1,26 @@
 # backend/controllers/pago_controller.py
 
 from flask import Blueprint, request, jsonify
-from models import Pago, Departamento
-from fireo.errors import DoesNotExist, Duplicate, NotFound
-from fireo.query import Q
+from models import Pago
+from services.idempotencia_service import idempotente
+from services.pago_service import registrar_pago, RegistroPagoError
+from services.recurso_service import Recurso
+from services.resumen_service import resumen_pago
 
 pago_bp = Blueprint('pago_bp', __name__)
 
-# Ruta: Obtener todos los pagos
-@pago_bp.route('/', methods=['GET'])
-def get_pagos():
-    try:
-        pagos = Pago.collection.all()
-        pagos_list = [pago.to_dict() for pago in pagos]
-        return jsonify({'status': 'success', 'data': pagos_list}), 200
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# Ruta: Obtener un pago por ID
-@pago_bp.route('/<id_pago>/', methods=['GET'])
-def get_pago(id_pago):
-    try:
-        pago = Pago.collection.get(id_pago)
-        if pago:
-            return jsonify({'status': 'success', 'data': pago.to_dict()}), 200
-        else:
-            return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# Ruta: Crear un nuevo pago
-@pago_bp.route('/', methods=['POST'])
-def create_pago():
-    try:
-        data = request.get_json()
-        
-        # Validación básica de los campos requeridos
-        required_fields = ['departamento', 'monto', 'fecha_pago', 'periodo', 'estado']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({'status': 'error', 'message': f'El campo {field} es requerido.'}), 400
-        
-        # Verificar que el departamento existe
-        departamento = Departamento.collection.get(data['departamento'])
-        if not departamento:
-            return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-        
-        # Crear una instancia de Pago
-        pago = Pago(
-            departamento=data['departamento'],
-            monto=data['monto'],
-            fecha_pago=data['fecha_pago'],
-            periodo=data['periodo'],
-            estado=data['estado']
-        )
-        
-        # Guardar en Firestore
-        pago.save()
-        
-        return jsonify({'status': 'success', 'data': pago.to_dict()}), 201
-    except Duplicate:
-        return jsonify({'status': 'error', 'message': 'El pago ya existe.'}), 409
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+# Rutas: listar, obtener, crear, actualizar y eliminar los pagos
+recurso = Recurso(Pago, 'Pago', crear_idempotente=True, resumen=resumen_pago).registrar(pago_bp, 'pago', 'pagos')
 
-# Ruta: Actualizar un pago existente
-@pago_bp.route('/<id_pago>/', methods=['PUT'])
-def update_pago(id_pago):
+# Ruta: Registrar un pago completo (pago, historial, transacción, cuota y morosidad) en una transacción
+@pago_bp.route('/registrar/', methods=['POST'])
+@idempotente
+def registrar_pago_completo():
     try:
         data = request.get_json()
-        pago = Pago.collection.get(id_pago)
-        if not pago:
-            return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
-        
-        # Si se está actualizando el departamento, verificar que exista
-        if 'departamento' in data:
-            departamento = Departamento.collection.get(data['departamento'])
-            if not departamento:
-                return jsonify({'status': 'error', 'message': 'Departamento no encontrado.'}), 404
-        
-        # Actualizar los campos proporcionados
-        for key, value in data.items():
-            if hasattr(pago, key):
-                setattr(pago, key, value)
-        
-        # Guardar cambios
-        pago.save()
-        
-        return jsonify({'status': 'success', 'data': pago.to_dict()}), 200
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# Ruta: Eliminar un pago
-@pago_bp.route('/<id_pago>/', methods=['DELETE'])
-def delete_pago(id_pago):
-    try:
-        pago = Pago.collection.get(id_pago)
-        if not pago:
-            return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
-        
-        # Eliminar el pago
-        pago.delete()
-        
-        return jsonify({'status': 'success', 'message': 'Pago eliminado correctamente.'}), 200
-    except DoesNotExist:
-        return jsonify({'status': 'error', 'message': 'Pago no encontrado.'}), 404
+        resultado = registrar_pago(data or {})
+        return jsonify({'status': 'success', 'data': resultado}), 201
+    except RegistroPagoError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), e.status
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -0,0 +1,31 @@
+# backend/controllers/personas_controller.py
+
+from flask import Blueprint, request, jsonify
+from services.personas_service import buscador_personas, MODELOS
+
+personas_bp = Blueprint('personas_bp', __name__)
+
+# Ruta: Buscar residentes, propietarios y personal por nombre, apellido, RUT o teléfono
+# Ejemplo: /api/personas/?q=gonz 12.34&tipos=residente,propietario&limite=10
+@personas_bp.route('/', methods=['GET'])
+def buscar_personas():
+    try:
+        consulta = request.args.get('q', '').strip()
+        if not consulta:
+            return jsonify({'status': 'error', 'message': 'El parámetro q es requerido.'}), 400
+
+        tipos = [t for t in request.args.get('tipos', '').split(',') if t]
+        desconocidos = set(tipos) - set(MODELOS)
+        if desconocidos:
+            return jsonify({'status': 'error', 'message': f'Tipos no soportados: {", ".join(sorted(desconocidos))}.'}), 400
+
+        try:
+            limite = min(int(request.args.get('limite', 10)), 50)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'El parámetro limite debe ser numérico.'}), 400
+
+        resultados = buscador_personas.buscar(consulta, tipos or None, limite)
+
+        return jsonify({'status': 'success', 'data': resultados}), 200
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
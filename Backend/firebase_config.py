@@ -1,12 +1,47 @@
 # firebase_config.py
 
-import pyrebase
+import os
 
-# Configuración de Firebase
-firebaseConfig = {
+import firebase_admin
+import fireo
+from firebase_admin import auth, credentials, firestore
 
-}
+from services.conexion_service import instalar_pool
+from services.memoria_service import AlmacenMemoria, CanalMemoria, Inyeccion, crear_cliente_memoria
 
-# Inicializar Firebase
-firebase = pyrebase.initialize_app(firebaseConfig)
-db = firebase.database()
+# Configuración de Firebase (cuenta de servicio y proyecto desde el entorno)
+RUTA_CREDENCIALES = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
+PROJECT_ID = os.environ.get('FIREBASE_PROJECT_ID')
+
+# Backend de datos: 'firestore' (por defecto) o 'memoria' para pruebas y carga local
+BACKEND = os.environ.get('FIRESTORE_BACKEND', 'firestore')
+
+# Inicializar Firebase una sola vez por proceso
+def _inicializar_firebase():
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        cred = credentials.Certificate(RUTA_CREDENCIALES) if RUTA_CREDENCIALES else credentials.ApplicationDefault()
+        opciones = {'projectId': PROJECT_ID} if PROJECT_ID else None
+        return firebase_admin.initialize_app(cred, opciones)
+
+firebase = _inicializar_firebase()
+
+# Cliente único de Firestore, compartido por los servicios y por los modelos de FireO
+if BACKEND == 'memoria':
+    # Sin proyecto de Firebase: los datos viven en el proceso. Se puede simular
+    # latencia (ms), su variación y una tasa de fallas UNAVAILABLE.
+    almacen = AlmacenMemoria()
+    inyeccion = Inyeccion(
+        latencia=float(os.environ.get('MEMORIA_LATENCIA_MS', 0)) / 1000,
+        variacion=float(os.environ.get('MEMORIA_VARIACION_MS', 0)) / 1000,
+        tasa_fallas=float(os.environ.get('MEMORIA_TASA_FALLAS', 0)),
+        semilla=int(os.environ.get('MEMORIA_SEMILLA', 1)),
+    )
+    db = crear_cliente_memoria(PROJECT_ID or 'local')
+    instalar_pool(db, crear_canal=lambda: CanalMemoria(almacen, inyeccion))
+else:
+    db = firestore.client(app=firebase)
+    # Pool de canales gRPC con keep-alive y deadline por defecto (FIRESTORE_CANALES, FIRESTORE_DEADLINE, ...)
+    instalar_pool(db)
+fireo.connection(client=db)
@@ -0,0 +1,37 @@
+# backend/importar.py
+#
+# Uso: python importar.py <departamentos|propietarios|residentes> <archivo.csv|archivo.xlsx> [--validar-solo] [--condominio ID]
+
+import argparse
+import json
+import sys
+
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
+from services.condominio_service import en_condominio, registrar_condominio, CondominioInvalido
+from services.importacion_service import importar, ImportacionError, ENTIDADES
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importación masiva de datos desde CSV o XLSX.')
+    parser.add_argument('entidad', choices=sorted(ENTIDADES))
+    parser.add_argument('archivo')
+    parser.add_argument('--validar-solo', action='store_true', help='Valida el archivo sin escribir en Firestore.')
+    parser.add_argument('--condominio', help='Condominio en el que se importan los datos.')
+    args = parser.parse_args()
+
+    try:
+        # Importar en un condominio nuevo lo deja registrado
+        if args.condominio and not args.validar_solo:
+            registrar_condominio(args.condominio)
+        with open(args.archivo, 'rb') as archivo, en_condominio(args.condominio):
+            resultado = importar(args.entidad, archivo, args.archivo, validar_solo=args.validar_solo)
+    except (ImportacionError, CondominioInvalido) as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return 0 if resultado['con_errores'] == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,31 @@
+from fireo import fields
 from fireo.models import Model
-from fireo.fields import (
-    IDField, TextField, NumberField, BooleanField,
-    ReferenceField, ListField, datetime_field
-)
+from fireo.fields import BooleanField, ListField
 
-# Usar DateTimeField desde FireO
-DateTimeField = datetime_field.DateTimeField
+# Atributos de los campos que FireO no conoce: choices y validators los aplica
+# services/esquema_service.py al validar las solicitudes; primary_key, unique y
+# reverse_delete describen el modelo. FireO 2.2 rechaza al guardar cualquier
+# atributo que el campo no declare, así que se declaran sin modificar el valor.
+ATRIBUTOS_ESQUEMA = ['choices', 'validators', 'primary_key', 'unique', 'reverse_delete']
+
+
+def _sin_cambios(self, atributo, valor):
+    return valor
+
+
+def _campo_con_esquema(campo):
+    metodos = {f'attr_{atributo}': _sin_cambios for atributo in ATRIBUTOS_ESQUEMA}
+    return type(campo.__name__, (campo,), dict(
+        metodos,
+        allowed_attributes=list(campo.allowed_attributes) + ATRIBUTOS_ESQUEMA,
+    ))
+
+
+IDField = _campo_con_esquema(fields.IDField)
+TextField = _campo_con_esquema(fields.TextField)
+NumberField = _campo_con_esquema(fields.NumberField)
+ReferenceField = _campo_con_esquema(fields.ReferenceField)
+DateTimeField = _campo_con_esquema(fields.DateTime)
 
 import re
 
@@ -23,7 +43,7 @@ GASTO_COMUN_TIPO = ['Agua', 'Gas', 'Luz', 'Internet', 'Remuneraciones', 'Insumos
 PAGO_ESTADO = ['Pagado', 'Pendiente', 'Atrasado']
 MOROSIDAD_ESTADO = ['Activo', 'Cancelado']
 NOTIFICACION_TIPO = ['Recordatorio', 'Penalización', 'Aviso de Mantención', 'Emergencia']
-NOTIFICACION_ESTADO = ['Enviado', 'Leído', 'Fallido']
+NOTIFICACION_ESTADO = ['Pendiente', 'Enviado', 'Leído', 'Fallido']
 PENALIZACION_ESTADO = ['Aplicada', 'Revertida']
 HISTORIAL_PAGO_ESTADO = ['Completado', 'Parcial', 'Fallido']
 SOLICITUD_TIPO = ['Mantenimiento', 'Reparación', 'Servicio General', 'Otro']
@@ -38,6 +58,20 @@ def validate_rut(value):
     if not rut_pattern.match(value):
         raise ValueError('El RUT no tiene un formato válido.')
 
+# Entidad: Propietario
+class Propietario(Model):
+    id_propietario = IDField(primary_key=True)
+    nombre = TextField(required=True)
+    apepat = TextField(required=True)
+    apemat = TextField(required=True)
+    rut = TextField(required=True, unique=True, validators=[validate_rut])
+    telefono = TextField(required=True)
+    email = TextField(required=True, validators=[validate_email])
+    direccion = TextField(required=True)
+
+    def __str__(self):
+        return f'{self.nombre} {self.apepat} {self.apemat}'
+
 # Entidad: Departamento
 class Departamento(Model):
     id_departamento = IDField(primary_key=True)
@@ -46,6 +80,14 @@ class Departamento(Model):
     tipo = TextField(choices=DEPARTAMENTO_TIPO, required=True)
     superficie = NumberField(required=True)
     estado = TextField(choices=DEPARTAMENTO_ESTADO, required=True)
+    propietario = ReferenceField(Propietario, required=False)
+    # Resumen para los listados; lo mantiene services/resumen_service.py
+    propietario_nombre = TextField(required=False)
+    residentes_actuales = NumberField(default=0)
+    saldo_pendiente = NumberField(default=0)
+    cuotas_pendientes = NumberField(default=0)
+    solicitudes_abiertas = NumberField(default=0)
+    total_pagado = NumberField(default=0)
 
     def __str__(self):
         return f'Departamento {self.numero} - Piso {self.piso}'
@@ -58,24 +100,12 @@ class Cuota(Model):
     periodo = TextField(required=True)
     fecha_vencimiento = DateTimeField(required=True)
     estado = TextField(choices=['Pagada', 'Pendiente', 'Atrasada'], required=True)
+    # Suma de los pagos parciales; lo mantiene services/pago_service.py
+    monto_pagado = NumberField(default=0)
 
     def __str__(self):
         return f'Cuota {self.id_cuota} - Departamento {self.departamento.numero} - {self.periodo}'
 
-# Entidad: Propietario
-class Propietario(Model):
-    id_propietario = IDField(primary_key=True)
-    nombre = TextField(required=True)
-    apepat = TextField(required=True)
-    apemat = TextField(required=True)
-    rut = TextField(required=True, unique=True, validators=[validate_rut])
-    telefono = TextField(required=True)
-    email = TextField(required=True, validators=[validate_email])
-    direccion = TextField(required=True)
-
-    def __str__(self):
-        return f'{self.nombre} {self.apepat} {self.apemat}'
-
 # Entidad: Residente
 class Residente(Model):
     id_residente = IDField(primary_key=True)
@@ -175,6 +205,7 @@ class Notificacion(Model):
     mensaje = TextField(required=True)
     fecha_envio = DateTimeField(required=True)
     estado = TextField(choices=NOTIFICACION_ESTADO, required=True)
+    encolada_por = TextField(required=False)  # Cola del proceso que la tiene en memoria
 
     def __str__(self):
         return f'Notificación {self.id_notificacion} - Residente {self.residente.id_residente} - {self.tipo}'
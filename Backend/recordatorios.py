@@ -0,0 +1,41 @@
+# backend/recordatorios.py
+#
+# Job programado (por ejemplo con cron, una vez al día):
+#   python recordatorios.py --dias 3 [--condominio ID ...]
+# Necesita un transporte de notificaciones registrado (NOTIFICACIONES_TRANSPORTE=falso en desarrollo).
+
+import argparse
+import json
+import sys
+
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
+from services.condominio_service import en_condominio
+from services.notificacion_service import obtener_cola
+from services.recordatorio_service import enviar_recordatorios, DIAS_ANTICIPACION
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Envía recordatorios de cuotas próximas a vencer.')
+    parser.add_argument('--dias', type=int, default=DIAS_ANTICIPACION, help='Días de anticipación.')
+    parser.add_argument('--condominio', action='append', help='Condominio a procesar (se puede repetir).')
+    args = parser.parse_args()
+
+    cola = obtener_cola()
+    if args.condominio:
+        resultado = {}
+        for condominio in args.condominio:
+            with en_condominio(condominio):
+                resultado[condominio] = enviar_recordatorios(dias=args.dias, cola=cola)
+    else:
+        resultado = enviar_recordatorios(dias=args.dias, cola=cola)
+
+    # Esperar a que la cola termine de entregar antes de salir
+    cola.esperar_vacia()
+    resultado['estadisticas'] = dict(cola.estadisticas)
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,34 @@
+# backend/resumenes.py
+#
+# Recalcula el resumen de los departamentos (residentes, propietario, saldo,
+# solicitudes abiertas), por ejemplo después de cargar datos directo en Firestore:
+#   python resumenes.py [--condominio ID ...]
+
+import argparse
+import json
+import sys
+
+import firebase_config  # Inicializa Firebase y la conexión compartida de FireO
+from services.condominio_service import en_condominio
+from services.resumen_service import reconstruir_resumenes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reconstruye el resumen de los departamentos.')
+    parser.add_argument('--condominio', action='append', help='Condominio a procesar (se puede repetir).')
+    args = parser.parse_args()
+
+    if args.condominio:
+        resultado = {}
+        for condominio in args.condominio:
+            with en_condominio(condominio):
+                resultado[condominio] = {'departamentos': reconstruir_resumenes()}
+    else:
+        resultado = {'departamentos': reconstruir_resumenes()}
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,302 @@
+# backend/services/archivo_service.py
+
+import gzip
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud.firestore_v1 import Increment, SERVER_TIMESTAMP
+
+from firebase_config import db
+from models import HistorialPago, Transaccion, Notificacion
+from services.condominio_service import ruta_condominio
+from services.recurso_service import serializar_valor
+
+logger = logging.getLogger(__name__)
+
+# Colecciones que se archivan: campo de fecha que define el periodo, campo de
+# monto que se totaliza, campo por el que se agrupa el resumen y estados que
+# no se archivan (todavía pueden cambiar)
+ARCHIVABLES = {
+    'historialpago': {'modelo': HistorialPago, 'fecha': 'fecha_pago', 'monto': 'monto_pagado', 'grupo': 'estado'},
+    'transaccion': {'modelo': Transaccion, 'fecha': 'fecha', 'monto': 'monto', 'grupo': 'tipo'},
+    'notificacion': {'modelo': Notificacion, 'fecha': 'fecha_envio', 'grupo': 'estado', 'excluir': {'Pendiente'}},
+}
+
+# Se archivan los meses cerrados anteriores a este horizonte
+HORIZONTE_MESES = 12
+
+# Partes del archivo: documentos comprimidos (gzip de una lista JSON) por
+# colección y periodo, y un resumen consultable por periodo
+COLECCION_ARCHIVO = 'archivo'
+COLECCION_RESUMEN = 'archivo_resumen'
+
+# Cada parte se escribe en un solo lote con su resumen y el borrado de los
+# originales: Firestore admite como máximo 500 escrituras por lote
+DOCUMENTOS_POR_PARTE = 498
+MAX_BYTES_PARTE = 900 * 1024   # bajo el límite de 1 MiB por documento
+
+# Periodos descomprimidos que se mantienen en memoria para las lecturas
+MAX_PERIODOS_CACHE = 32
+
+# Documentos por página al leer un periodo archivado
+TAMANO_PAGINA = 50
+
+_PERIODO = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+class ErrorArchivo(Exception):
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.status = status
+
+
+def _coleccion(nombre):
+    raiz = ruta_condominio()
+    return db.collection(f'{raiz}/{nombre}' if raiz else nombre)
+
+
+def _config(coleccion):
+    config = ARCHIVABLES.get(coleccion)
+    if config is None:
+        raise ErrorArchivo(f'La colección {coleccion} no se archiva.', 404)
+    return config
+
+
+def validar_periodo(periodo):
+    if not periodo or not _PERIODO.match(periodo):
+        raise ErrorArchivo('El periodo debe tener el formato AAAA-MM.')
+    return periodo
+
+
+def periodo_de(fecha):
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc)
+    return f'{fecha.year:04d}-{fecha.month:02d}'
+
+
+# Primer instante del mes que está HORIZONTE_MESES antes del actual
+def fecha_corte(meses=HORIZONTE_MESES, ahora=None):
+    ahora = ahora or datetime.now(timezone.utc)
+    indice = ahora.year * 12 + ahora.month - 1 - meses
+    return datetime(indice // 12, indice % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _registro(config, snapshot):
+    datos = serializar_valor(snapshot.to_dict() or {})
+    datos[config['modelo']._meta.id[0]] = snapshot.id
+    datos['key'] = snapshot.reference.path
+    return datos
+
+
+def comprimir(registros):
+    return gzip.compress(json.dumps(registros, ensure_ascii=False, separators=(',', ':')).encode(), mtime=0)
+
+
+def descomprimir(datos):
+    return json.loads(gzip.decompress(datos))
+
+
+# Aporte de una parte al resumen del periodo
+def _resumen_parte(config, registros):
+    grupos = {}
+    monto = 0
+    for registro in registros:
+        grupo = grupos.setdefault(str(registro.get(config['grupo'])), {'documentos': 0})
+        grupo['documentos'] += 1
+        if 'monto' in config:
+            valor = registro.get(config['monto']) or 0
+            grupo['monto'] = grupo.get('monto', 0) + valor
+            monto += valor
+    resumen = {
+        'documentos': Increment(len(registros)),
+        'partes': Increment(1),
+        'grupos': {
+            grupo: {campo: Increment(valor) for campo, valor in totales.items()}
+            for grupo, totales in grupos.items()
+        },
+    }
+    if 'monto' in config:
+        resumen['monto_total'] = Increment(monto)
+    return resumen
+
+
+# Escribe una parte del archivo, suma su aporte al resumen y borra los
+# originales en un solo lote atómico. El borrado exige que el documento no
+# haya cambiado desde que se leyó; si cambió, el lote completo se descarta.
+def _archivar_parte(coleccion, config, periodo, snapshots):
+    registros = [_registro(config, snapshot) for snapshot in snapshots]
+    datos = comprimir(registros)
+    if len(datos) > MAX_BYTES_PARTE and len(snapshots) > 1:
+        mitad = len(snapshots) // 2
+        return (_archivar_parte(coleccion, config, periodo, snapshots[:mitad])
+                + _archivar_parte(coleccion, config, periodo, snapshots[mitad:]))
+
+    lote = db.batch()
+    lote.set(_coleccion(COLECCION_ARCHIVO).document(), {
+        'coleccion': coleccion,
+        'periodo': periodo,
+        'documentos': len(registros),
+        'datos': datos,
+        'archivado': SERVER_TIMESTAMP,
+    })
+    resumen = _resumen_parte(config, registros)
+    resumen.update(coleccion=coleccion, periodo=periodo, actualizado=SERVER_TIMESTAMP)
+    lote.set(_coleccion(COLECCION_RESUMEN).document(f'{coleccion}-{periodo}'), resumen, merge=True)
+    for snapshot in snapshots:
+        lote.delete(snapshot.reference, option=db.write_option(last_update_time=snapshot.update_time))
+    try:
+        lote.commit()
+    except FailedPrecondition:
+        logger.warning('Documentos de %s %s cambiaron al archivarlos; quedan para la próxima ejecución', coleccion, periodo)
+        return 0
+    return len(registros)
+
+
+# Mueve al archivo los documentos de la colección con fecha anterior al corte.
+# Se recorre en páginas ordenadas por fecha con cursor, así cada lote es
+# independiente y una ejecución interrumpida se puede repetir sin duplicar.
+def archivar(coleccion, meses=HORIZONTE_MESES, ahora=None, simular=False):
+    config = _config(coleccion)
+    # Con menos de un mes se archivaría el mes en curso, que todavía cambia
+    if meses < 1:
+        raise ErrorArchivo('meses debe ser al menos 1.')
+    campo_fecha = config['fecha']
+    excluir = config.get('excluir', set())
+    corte = fecha_corte(meses, ahora)
+
+    resultado = {'corte': corte.isoformat(), 'archivados': 0, 'omitidos': 0, 'periodos': {}}
+    ultimo = None
+    while True:
+        consulta = (
+            _coleccion(config['modelo'].collection_name)
+            .where(campo_fecha, '<', corte)
+            .order_by(campo_fecha)
+            .limit(DOCUMENTOS_POR_PARTE)
+        )
+        if ultimo is not None:
+            consulta = consulta.start_after(ultimo)
+        pagina = list(consulta.stream())
+        if not pagina:
+            break
+        ultimo = pagina[-1]
+
+        # La página está ordenada por fecha: cada periodo es un tramo contiguo
+        por_periodo = OrderedDict()
+        for snapshot in pagina:
+            if (snapshot.to_dict() or {}).get('estado') in excluir:
+                resultado['omitidos'] += 1
+                continue
+            por_periodo.setdefault(periodo_de(snapshot.get(campo_fecha)), []).append(snapshot)
+
+        for periodo, snapshots in por_periodo.items():
+            archivados = len(snapshots) if simular else _archivar_parte(coleccion, config, periodo, snapshots)
+            resultado['archivados'] += archivados
+            resultado['omitidos'] += len(snapshots) - archivados
+            resultado['periodos'][periodo] = resultado['periodos'].get(periodo, 0) + archivados
+
+        if len(pagina) < DOCUMENTOS_POR_PARTE:
+            break
+    return resultado
+
+
+# --- Lectura del archivo ------------------------------------------------------
+
+class CachePeriodos:
+    def __init__(self, maximo=MAX_PERIODOS_CACHE):
+        self._entradas = OrderedDict()
+        self._maximo = maximo
+        self._lock = threading.Lock()
+
+    def obtener(self, clave, version):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] != version:
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+
+    def guardar(self, clave, version, registros):
+        with self._lock:
+            self._entradas[clave] = (version, registros)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._maximo:
+                self._entradas.popitem(last=False)
+
+
+cache_periodos = CachePeriodos()
+
+
+def _serializar_resumen(snapshot):
+    datos = serializar_valor(snapshot.to_dict() or {})
+    datos['id'] = snapshot.id
+    return datos
+
+
+# Resúmenes de los periodos archivados, del más reciente al más antiguo
+def listar_periodos(coleccion=None):
+    if coleccion is not None:
+        _config(coleccion)
+    consulta = _coleccion(COLECCION_RESUMEN)
+    if coleccion is not None:
+        consulta = consulta.where('coleccion', '==', coleccion)
+    resumenes = [_serializar_resumen(snapshot) for snapshot in consulta.stream()]
+    return sorted(resumenes, key=lambda resumen: (resumen.get('periodo', ''), resumen.get('coleccion', '')), reverse=True)
+
+
+# Documentos archivados de un periodo, ordenados por fecha e ID, con la
+# posición de cada ID. El número de partes del resumen sirve de versión: si
+# se archivaron más documentos del periodo, se vuelve a leer.
+def _registros_periodo(coleccion, periodo):
+    _config(coleccion)
+    validar_periodo(periodo)
+    resumen = _coleccion(COLECCION_RESUMEN).document(f'{coleccion}-{periodo}').get()
+    if not resumen.exists:
+        raise ErrorArchivo('Periodo no archivado.', 404)
+
+    clave = (ruta_condominio(), coleccion, periodo)
+    version = resumen.get('partes')
+    cacheado = cache_periodos.obtener(clave, version)
+    if cacheado is None:
+        consulta = (
+            _coleccion(COLECCION_ARCHIVO)
+            .where('coleccion', '==', coleccion)
+            .where('periodo', '==', periodo)
+        )
+        registros = []
+        for parte in consulta.stream():
+            registros.extend(descomprimir(parte.get('datos')))
+        config = ARCHIVABLES[coleccion]
+        campo_id = config['modelo']._meta.id[0]
+        registros.sort(key=lambda registro: (registro.get(config['fecha']) or '', registro.get(campo_id) or ''))
+        posiciones = {registro.get(campo_id): posicion for posicion, registro in enumerate(registros)}
+        cacheado = (registros, posiciones)
+        cache_periodos.guardar(clave, version, cacheado)
+    return cacheado
+
+
+# Una página de los documentos archivados de un periodo. El cursor es el ID
+# del último documento de la página anterior; devuelve la página y el cursor
+# de la siguiente (None si no hay más).
+def leer_periodo(coleccion, periodo, limite=TAMANO_PAGINA, cursor=None):
+    registros, posiciones = _registros_periodo(coleccion, periodo)
+    inicio = 0
+    if cursor:
+        if cursor not in posiciones:
+            raise ErrorArchivo('Cursor inválido.')
+        inicio = posiciones[cursor] + 1
+    pagina = registros[inicio:inicio + limite]
+    campo_id = ARCHIVABLES[coleccion]['modelo']._meta.id[0]
+    siguiente = pagina[-1].get(campo_id) if inicio + limite < len(registros) else None
+    return pagina, siguiente
+
+
+def obtener_archivado(coleccion, periodo, id_documento):
+    registros, posiciones = _registros_periodo(coleccion, periodo)
+    if id_documento not in posiciones:
+        raise ErrorArchivo('Documento no encontrado en el archivo.', 404)
+    return registros[posiciones[id_documento]]
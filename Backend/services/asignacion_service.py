@@ -0,0 +1,196 @@
+# backend/services/asignacion_service.py
+
+import heapq
+import itertools
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from google.cloud import firestore
+
+from firebase_config import db
+from models import Solicitud, Personal, Mantenimiento
+
+# Firestore admite como máximo 500 escrituras por transacción
+TAMANO_LOTE = 500
+
+# Asignaciones por ejecución: las solicitudes restantes quedan para la siguiente
+MAX_ASIGNACIONES = 500
+
+# Orden de atención: primero la prioridad más alta
+PRIORIDAD_ORDEN = {'Alta': 0, 'Media': 1, 'Baja': 2}
+
+# Cargos calificados para atender cada tipo de solicitud
+CARGOS_POR_TIPO = {
+    'Mantenimiento': ['Mantenimiento'],
+    'Reparación': ['Mantenimiento', 'Instalaciones'],
+    'Servicio General': ['Conserje', 'Atención'],
+    'Otro': ['Atención', 'Conserje'],
+}
+
+
+def _key_referencia(valor):
+    return valor if isinstance(valor, str) else getattr(valor, 'key', None)
+
+
+# Índice de intervalos de una persona: sus mantenimientos ordenados por fecha de inicio.
+# Se asume que los trabajos de una misma persona no se solapan entre sí.
+class AgendaPersonal:
+    def __init__(self):
+        self._inicios = []
+        self._fines = []
+
+    def agregar(self, inicio, fin):
+        posicion = bisect_right(self._inicios, inicio)
+        self._inicios.insert(posicion, inicio)
+        self._fines.insert(posicion, fin)
+
+    def ocupado(self, instante):
+        posicion = bisect_right(self._inicios, instante)
+        return posicion > 0 and self._fines[posicion - 1] > instante
+
+    def __len__(self):
+        return len(self._inicios)
+
+
+# Motor de asignación: una cola de prioridad de solicitudes abiertas y, por
+# cargo, un heap de personal ordenado por carga. Las entradas del heap se
+# invalidan de forma perezosa cuando cambia la carga, así que cada asignación
+# cuesta O(log n).
+class MotorAsignacion:
+    def __init__(self, ahora=None):
+        self.ahora = ahora or datetime.now(timezone.utc)
+        self._solicitudes = []
+        self._cargas = {}
+        self._cargos = {}
+        self._por_cargo = defaultdict(list)
+        self._agendas = defaultdict(AgendaPersonal)
+        self._secuencia = itertools.count()
+
+    def agregar_personal(self, key, cargo, carga=0):
+        self._cargos[key] = cargo
+        self._cargas[key] = carga
+        heapq.heappush(self._por_cargo[cargo], (carga, next(self._secuencia), key))
+
+    def sumar_carga(self, key, cantidad=1):
+        if key not in self._cargas:
+            return
+        self._cargas[key] += cantidad
+        heapq.heappush(self._por_cargo[self._cargos[key]], (self._cargas[key], next(self._secuencia), key))
+
+    # Los mantenimientos vigentes o futuros cuentan como carga de la persona
+    def agregar_mantenimiento(self, personal_key, inicio, fin):
+        self._agendas[personal_key].agregar(inicio, fin)
+        if fin > self.ahora:
+            self.sumar_carga(personal_key)
+
+    def agregar_solicitud(self, key, tipo, prioridad, fecha_creacion=None):
+        orden = (PRIORIDAD_ORDEN.get(prioridad, len(PRIORIDAD_ORDEN)), fecha_creacion or self.ahora)
+        heapq.heappush(self._solicitudes, (orden, next(self._secuencia), key, tipo))
+
+    def pendientes(self):
+        return len(self._solicitudes)
+
+    # Persona con menor carga entre los cargos indicados que no esté ocupada ahora
+    def _menos_cargado(self, cargos):
+        mejor = None
+        for cargo in cargos:
+            heap = self._por_cargo.get(cargo)
+            while heap:
+                carga, _, key = heap[0]
+                if carga != self._cargas[key]:
+                    heapq.heappop(heap)
+                    continue
+                if self._agendas[key].ocupado(self.ahora):
+                    # Ocupada en un mantenimiento durante toda esta ejecución
+                    heapq.heappop(heap)
+                    continue
+                if mejor is None or carga < mejor[0]:
+                    mejor = (carga, key)
+                break
+        return mejor[1] if mejor else None
+
+    def asignar(self, limite=None):
+        asignaciones = []
+        sin_asignar = []
+        while self._solicitudes and (limite is None or len(asignaciones) < limite):
+            _, _, solicitud, tipo = heapq.heappop(self._solicitudes)
+            personal = self._menos_cargado(CARGOS_POR_TIPO.get(tipo, CARGOS_POR_TIPO['Otro']))
+            if personal is None:
+                sin_asignar.append(solicitud)
+                continue
+            self.sumar_carga(personal)
+            asignaciones.append((solicitud, personal))
+        return asignaciones, sin_asignar
+
+    def cargas(self):
+        return dict(self._cargas)
+
+
+# Construye el motor con el estado actual de Firestore: personal, mantenimientos
+# no terminados y solicitudes abiertas
+def cargar_motor(ahora=None):
+    motor = MotorAsignacion(ahora)
+
+    for personal in Personal.collection.fetch():
+        motor.agregar_personal(personal.key, personal.cargo)
+
+    for mantenimiento in Mantenimiento.collection.filter('fecha_fin', '>', motor.ahora).fetch():
+        personal = _key_referencia(mantenimiento.personal)
+        if personal and mantenimiento.estado != 'Completado':
+            motor.agregar_mantenimiento(personal, mantenimiento.fecha_inicio, mantenimiento.fecha_fin)
+
+    for solicitud in Solicitud.collection.filter('estado', 'in', ['Pendiente', 'En Proceso']).fetch():
+        personal = _key_referencia(solicitud.personal)
+        if personal:
+            motor.sumar_carga(personal)
+        elif solicitud.estado == 'Pendiente':
+            motor.agregar_solicitud(solicitud.key, solicitud.tipo, solicitud.prioridad, solicitud.fecha_creacion)
+
+    return motor
+
+
+# Una solicitud se puede asignar si sigue pendiente y sin personal
+def _asignable(snapshot):
+    datos = snapshot.to_dict() if snapshot.exists else None
+    return datos is not None and datos.get('estado') == 'Pendiente' and not datos.get('personal')
+
+
+# Guarda las asignaciones actualizando solo los campos personal y estado, en
+# transacciones de hasta TAMANO_LOTE solicitudes. Cada transacción vuelve a
+# leer las solicitudes: las que otra ejecución (u otro usuario) asignó o
+# cambió desde que se cargó el motor se descartan en vez de sobrescribirse.
+# Devuelve las asignaciones guardadas y las descartadas.
+def guardar_asignaciones(asignaciones):
+    guardadas = []
+    descartadas = []
+    for inicio in range(0, len(asignaciones), TAMANO_LOTE):
+        tramo = asignaciones[inicio:inicio + TAMANO_LOTE]
+
+        @firestore.transactional
+        def guardar(transaccion):
+            referencias = [db.document(solicitud) for solicitud, _ in tramo]
+            vigentes = {
+                snapshot.reference.path for snapshot in db.get_all(referencias, transaction=transaccion)
+                if _asignable(snapshot)
+            }
+            aplicadas = []
+            for (solicitud, personal), referencia in zip(tramo, referencias):
+                if referencia.path in vigentes:
+                    transaccion.update(referencia, {'personal': db.document(personal), 'estado': 'En Proceso'})
+                    aplicadas.append((solicitud, personal))
+            return aplicadas
+
+        aplicadas = guardar(db.transaction())
+        guardadas.extend(aplicadas)
+        asignadas = {solicitud for solicitud, _ in aplicadas}
+        descartadas.extend(solicitud for solicitud, _ in tramo if solicitud not in asignadas)
+    return guardadas, descartadas
+
+
+# Devuelve además cuántas solicitudes pendientes quedaron sin revisar por el límite
+def asignar_solicitudes(limite=MAX_ASIGNACIONES, ahora=None):
+    motor = cargar_motor(ahora)
+    asignaciones, sin_asignar = motor.asignar(min(limite or MAX_ASIGNACIONES, MAX_ASIGNACIONES))
+    asignaciones, descartadas = guardar_asignaciones(asignaciones)
+    return asignaciones, sin_asignar, descartadas, motor.pendientes()
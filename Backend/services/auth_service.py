@@ -0,0 +1,232 @@
+# backend/services/auth_service.py
+
+import json
+import logging
+import re
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+
+import jwt
+from cryptography.x509 import load_pem_x509_certificate
+from flask import request, jsonify, g
+
+logger = logging.getLogger(__name__)
+
+# Certificados públicos con los que Firebase firma los ID tokens
+URL_CLAVES = 'https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com'
+
+# Rutas que no requieren autenticación
+RUTAS_PUBLICAS = {'/'}
+
+# Tiempo de vida de las claves cuando la respuesta no trae Cache-Control
+VIGENCIA_CLAVES = 3600
+
+# Holgura permitida entre relojes al validar exp/iat
+TOLERANCIA_RELOJ = 10
+
+# Mínimo de segundos entre descargas de claves forzadas por un kid desconocido;
+# entre medio los kids desconocidos se rechazan sin consultar a Google
+INTERVALO_REFRESCO_FORZADO = 60
+
+# Endpoints de streaming (EventSource no puede enviar encabezados): aceptan el
+# token en el parámetro ?token=, solo si se emitió hace menos de VIGENCIA_TOKEN_URL
+# segundos, porque las URLs quedan en logs y proxies. Los controladores agregan los suyos.
+ENDPOINTS_TOKEN_URL = set()
+PARAMETRO_TOKEN = 'token'
+VIGENCIA_TOKEN_URL = 300
+
+
+class TokenInvalido(Exception):
+    pass
+
+
+class ClavesNoDisponibles(Exception):
+    pass
+
+
+# Descarga las claves de Google y devuelve ({kid: clave_publica}, segundos_de_vigencia)
+def obtener_claves_google():
+    with urllib.request.urlopen(URL_CLAVES, timeout=10) as respuesta:
+        certificados = json.loads(respuesta.read().decode('utf-8'))
+        cache_control = respuesta.headers.get('Cache-Control', '')
+
+    coincidencia = re.search(r'max-age=(\d+)', cache_control)
+    vigencia = int(coincidencia.group(1)) if coincidencia else VIGENCIA_CLAVES
+    claves = {
+        kid: load_pem_x509_certificate(pem.encode('utf-8')).public_key()
+        for kid, pem in certificados.items()
+    }
+    return claves, vigencia
+
+
+# Verifica ID tokens de Firebase de forma local. Las claves públicas se guardan
+# en caché según su Cache-Control y los tokens ya verificados en un LRU hasta su expiración.
+class VerificadorTokens:
+    def __init__(self, project_id, obtener_claves=obtener_claves_google, tamano_cache=10000, reloj=time.time):
+        # Sin proyecto ningún token tendría la audiencia correcta
+        if not project_id:
+            raise ValueError('Falta el id del proyecto de Firebase (FIREBASE_PROJECT_ID) para verificar tokens.')
+        self.project_id = project_id
+        self.emisor = f'https://securetoken.google.com/{project_id}'
+        self._obtener_claves = obtener_claves
+        self._tamano_cache = tamano_cache
+        self._reloj = reloj
+        self._claves = {}
+        self._claves_expiran = 0
+        self._ultima_descarga = None
+        self._tokens = OrderedDict()
+        self._lock = threading.Lock()
+        self._lock_claves = threading.Lock()
+
+    def _cargar_claves(self, forzar=False):
+        if not forzar and self._reloj() < self._claves_expiran:
+            return self._claves
+        with self._lock_claves:
+            # Otro hilo pudo refrescar las claves mientras esperábamos el lock
+            if not forzar and self._reloj() < self._claves_expiran:
+                return self._claves
+            # Un token con kid inventado no puede provocar una descarga por solicitud
+            if (forzar and self._ultima_descarga is not None
+                    and self._reloj() - self._ultima_descarga < INTERVALO_REFRESCO_FORZADO):
+                return self._claves
+            try:
+                claves, vigencia = self._obtener_claves()
+            except (OSError, ValueError) as e:
+                if not self._claves:
+                    raise ClavesNoDisponibles('No se pudieron obtener las claves para verificar el token.') from e
+                # Se siguen usando las claves anteriores y se reintenta más tarde
+                logger.warning('No se pudieron renovar las claves de Google: %s', e)
+                self._ultima_descarga = self._reloj()
+                self._claves_expiran = self._ultima_descarga + INTERVALO_REFRESCO_FORZADO
+                return self._claves
+            self._ultima_descarga = self._reloj()
+            self._claves = claves
+            self._claves_expiran = self._ultima_descarga + vigencia
+            return claves
+
+    def _clave_para(self, kid):
+        clave = self._cargar_claves().get(kid)
+        if clave is None:
+            # Kid desconocido: Google pudo rotar las claves antes de que expirara la caché
+            clave = self._cargar_claves(forzar=True).get(kid)
+        if clave is None:
+            raise TokenInvalido('El token fue firmado con una clave desconocida.')
+        return clave
+
+    def _desde_cache(self, token):
+        with self._lock:
+            entrada = self._tokens.get(token)
+            if entrada is None:
+                return None
+            if entrada['exp'] <= self._reloj():
+                del self._tokens[token]
+                return None
+            self._tokens.move_to_end(token)
+            return entrada
+
+    def _guardar(self, token, claims):
+        with self._lock:
+            self._tokens[token] = claims
+            self._tokens.move_to_end(token)
+            while len(self._tokens) > self._tamano_cache:
+                self._tokens.popitem(last=False)
+
+    def verificar(self, token):
+        claims = self._desde_cache(token)
+        if claims is not None:
+            return claims
+
+        try:
+            encabezado = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            raise TokenInvalido('El token no tiene un formato válido.')
+        if encabezado.get('alg') != 'RS256':
+            raise TokenInvalido('El token debe estar firmado con RS256.')
+
+        try:
+            claims = jwt.decode(
+                token,
+                self._clave_para(encabezado.get('kid')),
+                algorithms=['RS256'],
+                audience=self.project_id,
+                issuer=self.emisor,
+                leeway=TOLERANCIA_RELOJ,
+                options={'require': ['exp', 'iat', 'sub']},
+            )
+        except jwt.ExpiredSignatureError:
+            raise TokenInvalido('El token ha expirado.')
+        except jwt.PyJWTError as e:
+            raise TokenInvalido(f'El token no es válido: {e}')
+
+        if not claims.get('sub'):
+            raise TokenInvalido('El token no identifica a un usuario.')
+
+        claims['uid'] = claims['sub']
+        self._guardar(token, claims)
+        return claims
+
+    # Segundos desde que se emitió el token (claim iat)
+    def antiguedad(self, claims):
+        return self._reloj() - claims.get('iat', 0)
+
+    def limpiar_cache(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+_verificador = None
+_lock_verificador = threading.Lock()
+
+# Verificador compartido por el proceso, configurado con el proyecto de Firebase
+def obtener_verificador():
+    global _verificador
+    if _verificador is None:
+        with _lock_verificador:
+            if _verificador is None:
+                from firebase_config import firebase
+                _verificador = VerificadorTokens(firebase.project_id)
+    return _verificador
+
+
+# Devuelve (token, viene_en_la_url)
+def _token_de_la_solicitud():
+    encabezado = request.headers.get('Authorization', '')
+    tipo, _, token = encabezado.partition(' ')
+    if tipo.lower() == 'bearer' and token.strip():
+        return token.strip(), False
+    if request.endpoint in ENDPOINTS_TOKEN_URL and request.args.get(PARAMETRO_TOKEN):
+        return request.args[PARAMETRO_TOKEN], True
+    return None, False
+
+
+# Registra la verificación de tokens antes de cada solicitud a la API. Con
+# autenticación, el verificador se crea al registrar: sin proyecto de Firebase
+# la aplicación no arranca.
+def registrar_autenticacion(app, verificador=None):
+    if verificador is None and app.config.get('AUTH_REQUIRED', True):
+        obtener_verificador()
+
+    @app.before_request
+    def verificar_autenticacion():
+        if not app.config.get('AUTH_REQUIRED', True):
+            return None
+        if request.method == 'OPTIONS' or request.path in RUTAS_PUBLICAS:
+            return None
+
+        token, en_url = _token_de_la_solicitud()
+        if not token:
+            return jsonify({'status': 'error', 'message': 'Se requiere un token de autenticación.'}), 401
+
+        verificador_actual = verificador or obtener_verificador()
+        try:
+            usuario = verificador_actual.verificar(token)
+        except TokenInvalido as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 401
+        except ClavesNoDisponibles as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 503, {'Retry-After': str(INTERVALO_REFRESCO_FORZADO)}
+        if en_url and verificador_actual.antiguedad(usuario) > VIGENCIA_TOKEN_URL:
+            return jsonify({'status': 'error', 'message': 'El token en la URL debe ser reciente; obtenga uno nuevo.'}), 401
+        g.usuario = usuario
+        return None
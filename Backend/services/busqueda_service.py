@@ -0,0 +1,420 @@
+# backend/services/busqueda_service.py
+
+import heapq
+import json
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: un solo proceso, sin bloqueo entre procesos
+    fcntl = None
+
+from firebase_config import db
+from models import Queja, Feedback, Solicitud
+from services.condominio_service import PorCondominio, ruta_condominio
+
+logger = logging.getLogger(__name__)
+
+# Directorio donde se persiste el índice (snapshot + registro de cambios)
+DIRECTORIO_INDICE = os.environ.get(
+    'INDICE_BUSQUEDA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'busqueda')
+)
+
+# Cambios acumulados en el registro antes de compactarlo en un snapshot
+MAX_REGISTRO = 10000
+
+# Segundos entre lecturas de los cambios que registraron otros procesos
+INTERVALO_RECARGA = 1.0
+
+# Largo del extracto guardado para mostrar en los resultados
+LARGO_EXTRACTO = 200
+
+# Parámetros de BM25
+K1 = 1.2
+B = 0.75
+
+# Colección -> (modelo, campo de texto indexado)
+FUENTES = {
+    Queja.collection_name: (Queja, 'descripcion'),
+    Feedback.collection_name: (Feedback, 'comentarios'),
+    Solicitud.collection_name: (Solicitud, 'descripcion'),
+}
+
+STOPWORDS = {
+    'a', 'al', 'algo', 'ante', 'con', 'como', 'contra', 'cual', 'de', 'del', 'desde', 'donde', 'el', 'ella',
+    'en', 'entre', 'era', 'es', 'esta', 'este', 'esto', 'fue', 'ha', 'hay', 'la', 'las', 'le', 'les', 'lo',
+    'los', 'mas', 'me', 'mi', 'muy', 'nada', 'ni', 'no', 'nos', 'o', 'para', 'pero', 'por', 'que', 'se',
+    'sin', 'sobre', 'su', 'sus', 'tambien', 'te', 'un', 'una', 'uno', 'unos', 'unas', 'y', 'ya', 'yo',
+}
+
+_PALABRA = re.compile(r'[a-z0-9]+')
+
+
+# Quita tildes y diéresis: "filtración" -> "filtracion"
+def plegar_acentos(texto):
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+# Stemmer liviano para español: elimina plurales y la vocal temática final
+def raiz(palabra):
+    if len(palabra) > 5 and palabra.endswith('es'):
+        palabra = palabra[:-2]
+    elif len(palabra) > 3 and palabra.endswith('s'):
+        palabra = palabra[:-1]
+    if len(palabra) > 4 and palabra[-1] in 'aeo':
+        palabra = palabra[:-1]
+    return palabra
+
+
+def terminos(texto):
+    palabras = _PALABRA.findall(plegar_acentos(str(texto or '').lower()))
+    return [raiz(p) for p in palabras if p not in STOPWORDS]
+
+
+# Nombre de la colección de una key ('queja/abc' o 'condominios/x/queja/abc')
+def _coleccion(key):
+    return key.rsplit('/', 2)[-2]
+
+
+# Índice invertido con ranking BM25. Cada término guarda {key: frecuencia};
+# cada documento guarda su largo y sus términos para poder retirarlo al actualizar.
+class IndiceInvertido:
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.documentos = {}
+        self.largo_total = 0
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def agregar(self, key, texto):
+        self.eliminar(key)
+        frecuencias = defaultdict(int)
+        lista = terminos(texto)
+        for termino in lista:
+            frecuencias[termino] += 1
+        for termino, frecuencia in frecuencias.items():
+            self.postings[termino][key] = frecuencia
+        self.documentos[key] = (len(lista), tuple(frecuencias), str(texto or '')[:LARGO_EXTRACTO])
+        self.largo_total += len(lista)
+
+    def eliminar(self, key):
+        documento = self.documentos.pop(key, None)
+        if documento is None:
+            return
+        largo, lista, _ = documento
+        self.largo_total -= largo
+        for termino in lista:
+            posting = self.postings.get(termino)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self.postings[termino]
+
+    def buscar(self, consulta, colecciones=None, limite=20):
+        n = len(self.documentos)
+        if not n:
+            return []
+        promedio = self.largo_total / n or 1
+        colecciones = set(colecciones) if colecciones else None
+
+        puntajes = defaultdict(float)
+        for termino in set(terminos(consulta)):
+            posting = self.postings.get(termino)
+            if not posting:
+                continue
+            idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            documentos = self.documentos
+            for key, frecuencia in posting.items():
+                largo = documentos[key][0]
+                puntajes[key] += idf * frecuencia * (K1 + 1) / (frecuencia + K1 * (1 - B + B * largo / promedio))
+
+        if colecciones:
+            candidatos = ((p, k) for k, p in puntajes.items() if _coleccion(k) in colecciones)
+        else:
+            candidatos = ((p, k) for k, p in puntajes.items())
+
+        return [
+            {'key': key, 'coleccion': _coleccion(key), 'puntaje': round(puntaje, 4), 'extracto': self.documentos[key][2]}
+            for puntaje, key in heapq.nlargest(limite, candidatos)
+        ]
+
+
+class IndiceNoDisponible(Exception):
+    pass
+
+
+# Índice persistido en disco, compartido por los procesos (workers) que usan el
+# mismo directorio: un snapshot (pickle) más un registro de cambios en JSON
+# lines por generación. Cada proceso agrega sus cambios al registro bajo un
+# bloqueo de archivo y lee los de los demás desde la posición donde quedó.
+# Compactar escribe el snapshot de la generación siguiente y empieza un
+# registro nuevo en vez de truncar el actual, así ningún proceso pierde cambios.
+# Cargar el snapshot o reconstruirlo desde Firestore se hace en un hilo aparte:
+# mientras tanto se sigue usando el índice anterior (o, si no hay, la búsqueda
+# responde IndiceNoDisponible) y los hooks solo agregan su cambio al registro.
+class BuscadorTextos:
+    def __init__(self, directorio=DIRECTORIO_INDICE, intervalo_recarga=INTERVALO_RECARGA, condominio=None):
+        self.directorio = directorio
+        self.intervalo_recarga = intervalo_recarga
+        self.condominio = condominio
+        self._snapshot = os.path.join(directorio, 'indice.pickle')
+        self._archivo_generacion = os.path.join(directorio, 'generacion')
+        self._archivo_bloqueo = os.path.join(directorio, 'indice.lock')
+        self._indice = None
+        self._generacion = 0
+        self._posicion = 0
+        self._cambios = 0
+        self._revisado = 0.0
+        self._compactando = False
+        self._carga = None
+        self._lock = threading.RLock()
+
+    def _registro(self, generacion):
+        return os.path.join(self.directorio, f'cambios.{generacion}.jsonl')
+
+    # Bloqueo exclusivo entre procesos; se toma siempre después de self._lock
+    @contextmanager
+    def _bloqueo(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self._archivo_bloqueo, 'a') as archivo:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(archivo, fcntl.LOCK_UN)
+
+    def _leer_generacion(self):
+        try:
+            with open(self._archivo_generacion, encoding='utf-8') as archivo:
+                return int(archivo.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @staticmethod
+    def _aplicar(indice, cambio):
+        if cambio['op'] == 'agregar':
+            indice.agregar(cambio['key'], cambio['texto'])
+        else:
+            indice.eliminar(cambio['key'])
+
+    # Aplica las líneas del registro desde la posición dada y devuelve la nueva
+    # posición y las líneas leídas. Una línea sin salto final puede ser una
+    # escritura en curso de otro proceso; con el bloqueo tomado solo puede ser
+    # una escritura interrumpida, y se salta.
+    def _leer_registro(self, indice, generacion, posicion, bloqueado=False):
+        leidas = 0
+        try:
+            archivo = open(self._registro(generacion), 'rb')
+        except FileNotFoundError:
+            return posicion, leidas
+        with archivo:
+            archivo.seek(posicion)
+            for linea in archivo:
+                if not linea.endswith(b'\n') and not bloqueado:
+                    break
+                posicion += len(linea)
+                leidas += 1
+                try:
+                    cambio = json.loads(linea)
+                except ValueError:
+                    continue
+                self._aplicar(indice, cambio)
+        return posicion, leidas
+
+    # Lee el snapshot y su registro (con el bloqueo tomado); None si no hay
+    # generación (directorio vacío o de una versión anterior)
+    def _leer_snapshot(self):
+        generacion = self._leer_generacion()
+        if generacion is None or not os.path.exists(self._snapshot):
+            return None
+        with open(self._snapshot, 'rb') as archivo:
+            indice = pickle.load(archivo)
+        posicion, cambios = self._leer_registro(indice, generacion, 0, bloqueado=True)
+        return indice, generacion, posicion, cambios
+
+    # Reemplaza el índice en uso; los cambios registrados después de la
+    # posición se aplican en la próxima búsqueda
+    def _instalar(self, indice, generacion, posicion, cambios):
+        with self._lock:
+            self._indice = indice
+            self._generacion = generacion
+            self._posicion = posicion
+            self._cambios = cambios
+            self._revisado = 0.0
+
+    def _cargar(self, reconstruir=False):
+        try:
+            cargado = None
+            if not reconstruir:
+                with self._bloqueo():
+                    cargado = self._leer_snapshot()
+            self._instalar(*(cargado or self._reconstruir()))
+        except Exception:
+            logger.exception('No se pudo cargar el índice de búsqueda de %s.', self.directorio)
+        finally:
+            with self._lock:
+                self._carga = None
+
+    # Inicia la carga (o la reconstrucción) en segundo plano si no hay una en curso
+    def cargar_en_segundo_plano(self, reconstruir=False):
+        with self._lock:
+            if self._carga is None:
+                self._carga = threading.Thread(
+                    target=self._cargar, args=(reconstruir,), name='indice-busqueda', daemon=True
+                )
+                self._carga.start()
+            return self._carga
+
+    # Aplica los cambios que otros procesos agregaron desde la última lectura.
+    # Si compactaron a la generación siguiente, se termina el registro anterior
+    # y se sigue con el nuevo; si el salto es mayor (se reconstruyó) el
+    # snapshot nuevo se carga en segundo plano y se sigue con el índice actual.
+    def _ponerse_al_dia(self, bloqueado=False):
+        generacion = self._leer_generacion()
+        if generacion is not None and generacion not in (self._generacion, self._generacion + 1):
+            self.cargar_en_segundo_plano()
+            self._revisado = time.monotonic()
+            return False
+        self._posicion, leidas = self._leer_registro(self._indice, self._generacion, self._posicion, bloqueado)
+        self._cambios += leidas
+        if generacion is not None and generacion != self._generacion:
+            self._generacion = generacion
+            self._posicion, self._cambios = self._leer_registro(self._indice, generacion, 0, bloqueado)
+        self._revisado = time.monotonic()
+        return True
+
+    def _actualizado(self):
+        if self._indice is None:
+            self.cargar_en_segundo_plano()
+            raise IndiceNoDisponible('El índice de búsqueda se está cargando, intente nuevamente.')
+        if time.monotonic() - self._revisado >= self.intervalo_recarga:
+            self._ponerse_al_dia()
+        return self._indice
+
+    # Agrega el cambio al registro de la generación en disco. Con el índice
+    # cargado y al día también se aplica en memoria; si no, lo incorpora la
+    # carga en segundo plano.
+    def _escribir(self, cambio):
+        linea = (json.dumps(cambio, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock:
+            with self._bloqueo():
+                al_dia = self._indice is not None and self._ponerse_al_dia(bloqueado=True)
+                generacion = self._generacion if al_dia else (self._leer_generacion() or 0)
+                with open(self._registro(generacion), 'ab') as archivo:
+                    archivo.write(linea)
+                    posicion = archivo.tell()
+                if al_dia:
+                    self._aplicar(self._indice, cambio)
+                    self._posicion = posicion
+                    self._cambios += 1
+            compactar = al_dia and self._cambios >= MAX_REGISTRO and not self._compactando
+            if compactar:
+                self._compactando = True
+        # La compactación escribe el snapshot completo: se hace fuera de la solicitud
+        if compactar:
+            threading.Thread(target=self.compactar, args=(MAX_REGISTRO,), daemon=True).start()
+
+    # Escribe el snapshot de la generación dada y borra los registros que ya
+    # ningún proceso al día necesita (los anteriores a la generación previa)
+    def _guardar_snapshot(self, indice, generacion):
+        temporal = self._snapshot + '.tmp'
+        with open(temporal, 'wb') as archivo:
+            pickle.dump(indice, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, self._snapshot)
+        temporal = self._archivo_generacion + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(str(generacion))
+        os.replace(temporal, self._archivo_generacion)
+        for nombre in os.listdir(self.directorio):
+            partes = nombre.split('.')
+            if len(partes) == 3 and partes[0] == 'cambios' and partes[1].isdigit() and int(partes[1]) < generacion - 1:
+                os.remove(os.path.join(self.directorio, nombre))
+
+    # Con minimo, no se compacta si otro proceso acaba de hacerlo
+    def compactar(self, minimo=0):
+        with self._lock:
+            try:
+                if self._indice is None:
+                    return
+                with self._bloqueo():
+                    if self._ponerse_al_dia(bloqueado=True) and self._cambios >= minimo:
+                        self._guardar_snapshot(self._indice, self._generacion + 1)
+                        self._generacion += 1
+                        self._posicion = 0
+                        self._cambios = 0
+            finally:
+                self._compactando = False
+
+    # Lee las colecciones indexadas sin bloquear y después, con el bloqueo,
+    # aplica los cambios que se registraron mientras tanto. Se salta una
+    # generación para que los demás procesos recarguen el snapshot.
+    def _reconstruir(self):
+        with self._bloqueo():
+            generacion = self._leer_generacion() or 0
+            try:
+                inicio = os.path.getsize(self._registro(generacion))
+            except FileNotFoundError:
+                inicio = 0
+
+        indice = IndiceInvertido()
+        raiz = ruta_condominio(self.condominio)
+        for coleccion, (_, campo) in FUENTES.items():
+            ruta = f'{raiz}/{coleccion}' if raiz else coleccion
+            for snapshot in db.collection(ruta).select([campo]).stream():
+                indice.agregar(snapshot.reference.path, (snapshot.to_dict() or {}).get(campo) or '')
+
+        with self._bloqueo():
+            actual = self._leer_generacion() or 0
+            self._leer_registro(indice, generacion, inicio, bloqueado=True)
+            if actual == generacion + 1:
+                self._leer_registro(indice, actual, 0, bloqueado=True)
+            nueva = max(actual, generacion) + 2
+            self._guardar_snapshot(indice, nueva)
+        return indice, nueva, 0, 0
+
+    # Reconstruye el índice completo leyendo las colecciones indexadas
+    def reconstruir(self):
+        cargado = self._reconstruir()
+        self._instalar(*cargado)
+        return cargado[0]
+
+    # Un cambio que no se pudo registrar: se reconstruye desde Firestore
+    def invalidar(self):
+        self.cargar_en_segundo_plano(reconstruir=True)
+
+    def indexar(self, documento):
+        fuente = FUENTES.get(documento.collection_name)
+        if fuente is None:
+            return
+        texto = str(getattr(documento, fuente[1], '') or '')
+        self._escribir({'op': 'agregar', 'key': documento.key, 'texto': texto})
+
+    def retirar(self, key):
+        self._escribir({'op': 'eliminar', 'key': key})
+
+    def buscar(self, consulta, colecciones=None, limite=20):
+        with self._lock:
+            return self._actualizado().buscar(consulta, colecciones, limite)
+
+
+# Un índice por condominio, cada uno en su propio directorio
+buscador = PorCondominio(
+    lambda condominio: BuscadorTextos(
+        os.path.join(DIRECTORIO_INDICE, condominio) if condominio else DIRECTORIO_INDICE,
+        condominio=condominio
+    )
+)
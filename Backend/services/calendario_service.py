@@ -0,0 +1,204 @@
+# backend/services/calendario_service.py
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from models import Mantenimiento
+from services.condominio_service import PorCondominio
+from services.recurso_service import serializar_valor
+
+# Segundos tras los cuales el índice se reconstruye desde Firestore, para
+# incorporar cambios hechos por otros procesos
+VIGENCIA_INDICE = 300
+
+
+# Las fechas de Firestore llegan con zona horaria; las fechas sin zona se asumen UTC
+def normalizar_fecha(fecha):
+    if isinstance(fecha, str):
+        fecha = datetime.fromisoformat(fecha.replace('Z', '+00:00'))
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return fecha
+
+
+class _Nodo:
+    __slots__ = ('inicio', 'fin', 'key', 'datos', 'prioridad', 'max_fin', 'izquierdo', 'derecho')
+
+    def __init__(self, inicio, fin, key, datos):
+        self.inicio = inicio
+        self.fin = fin
+        self.key = key
+        self.datos = datos
+        self.prioridad = random.random()
+        self.max_fin = fin
+        self.izquierdo = None
+        self.derecho = None
+
+    def recalcular(self):
+        self.max_fin = self.fin
+        if self.izquierdo and self.izquierdo.max_fin > self.max_fin:
+            self.max_fin = self.izquierdo.max_fin
+        if self.derecho and self.derecho.max_fin > self.max_fin:
+            self.max_fin = self.derecho.max_fin
+
+
+# Árbol de intervalos (treap ordenado por inicio y aumentado con el fin máximo
+# de cada subárbol). Inserción y borrado en O(log n) esperado; la consulta de
+# solapamientos descarta subárboles completos y cuesta O(log n + k).
+class ArbolIntervalos:
+    def __init__(self):
+        self._raiz = None
+        self._nodos = {}
+
+    def __len__(self):
+        return len(self._nodos)
+
+    def __contains__(self, key):
+        return key in self._nodos
+
+    def agregar(self, key, inicio, fin, datos=None):
+        if key in self._nodos:
+            self.eliminar(key)
+        nodo = _Nodo(inicio, fin, key, datos)
+        self._nodos[key] = nodo
+        self._raiz = self._insertar(self._raiz, nodo)
+
+    def eliminar(self, key):
+        nodo = self._nodos.pop(key, None)
+        if nodo is not None:
+            self._raiz = self._borrar(self._raiz, (nodo.inicio, nodo.key))
+
+    # Intervalos que se solapan con [desde, hasta)
+    def solapados(self, desde, hasta):
+        resultado = []
+        pendientes = [self._raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            if nodo is None or nodo.max_fin <= desde:
+                continue
+            pendientes.append(nodo.izquierdo)
+            if nodo.inicio < hasta:
+                if nodo.fin > desde:
+                    resultado.append(nodo)
+                pendientes.append(nodo.derecho)
+        resultado.sort(key=lambda n: (n.inicio, n.key))
+        return resultado
+
+    @staticmethod
+    def _rotar_derecha(nodo):
+        hijo = nodo.izquierdo
+        nodo.izquierdo = hijo.derecho
+        hijo.derecho = nodo
+        nodo.recalcular()
+        hijo.recalcular()
+        return hijo
+
+    @staticmethod
+    def _rotar_izquierda(nodo):
+        hijo = nodo.derecho
+        nodo.derecho = hijo.izquierdo
+        hijo.izquierdo = nodo
+        nodo.recalcular()
+        hijo.recalcular()
+        return hijo
+
+    def _insertar(self, raiz, nodo):
+        if raiz is None:
+            return nodo
+        if (nodo.inicio, nodo.key) < (raiz.inicio, raiz.key):
+            raiz.izquierdo = self._insertar(raiz.izquierdo, nodo)
+            if raiz.izquierdo.prioridad > raiz.prioridad:
+                return self._rotar_derecha(raiz)
+        else:
+            raiz.derecho = self._insertar(raiz.derecho, nodo)
+            if raiz.derecho.prioridad > raiz.prioridad:
+                return self._rotar_izquierda(raiz)
+        raiz.recalcular()
+        return raiz
+
+    def _borrar(self, raiz, clave):
+        if raiz is None:
+            return None
+        actual = (raiz.inicio, raiz.key)
+        if clave < actual:
+            raiz.izquierdo = self._borrar(raiz.izquierdo, clave)
+        elif clave > actual:
+            raiz.derecho = self._borrar(raiz.derecho, clave)
+        else:
+            if raiz.izquierdo is None:
+                return raiz.derecho
+            if raiz.derecho is None:
+                return raiz.izquierdo
+            # Se rota hacia abajo el nodo a borrar hasta que quede con un solo hijo
+            if raiz.izquierdo.prioridad > raiz.derecho.prioridad:
+                raiz = self._rotar_derecha(raiz)
+                raiz.derecho = self._borrar(raiz.derecho, clave)
+            else:
+                raiz = self._rotar_izquierda(raiz)
+                raiz.izquierdo = self._borrar(raiz.izquierdo, clave)
+        raiz.recalcular()
+        return raiz
+
+
+def _key_referencia(valor):
+    return valor if isinstance(valor, str) else getattr(valor, 'key', None)
+
+
+# Calendario de mantenimientos del proceso: se construye perezosamente desde
+# Firestore y se mantiene al día con los create/update/delete del controlador.
+class CalendarioMantenimientos:
+    def __init__(self, vigencia=VIGENCIA_INDICE):
+        self._vigencia = vigencia
+        self._arbol = None
+        self._construido = 0
+        self._lock = threading.Lock()
+
+    def _asegurar(self):
+        if self._arbol is None or time.monotonic() - self._construido > self._vigencia:
+            arbol = ArbolIntervalos()
+            for mantenimiento in Mantenimiento.collection.fetch():
+                self._agregar_en(arbol, mantenimiento)
+            self._arbol = arbol
+            self._construido = time.monotonic()
+        return self._arbol
+
+    @staticmethod
+    def _agregar_en(arbol, mantenimiento):
+        if not mantenimiento.fecha_inicio or not mantenimiento.fecha_fin:
+            return
+        arbol.agregar(
+            mantenimiento.key,
+            normalizar_fecha(mantenimiento.fecha_inicio),
+            normalizar_fecha(mantenimiento.fecha_fin),
+            # Serializado: el modelo leído de Firestore trae personal como DocumentReference
+            dict(serializar_valor(mantenimiento.to_dict()), key=mantenimiento.key)
+        )
+
+    def registrar(self, mantenimiento):
+        with self._lock:
+            if self._arbol is not None:
+                self._agregar_en(self._arbol, mantenimiento)
+
+    def eliminar(self, key):
+        with self._lock:
+            if self._arbol is not None:
+                self._arbol.eliminar(key)
+
+    def invalidar(self):
+        with self._lock:
+            self._arbol = None
+
+    def consultar(self, desde, hasta):
+        with self._lock:
+            nodos = self._asegurar().solapados(normalizar_fecha(desde), normalizar_fecha(hasta))
+        mantenimientos = [nodo.datos for nodo in nodos]
+        ocupados = sorted({
+            _key_referencia(datos.get('personal')) for datos in mantenimientos
+            if datos.get('personal') and datos.get('estado') != 'Completado'
+        })
+        return mantenimientos, ocupados
+
+
+calendario = PorCondominio(lambda condominio: CalendarioMantenimientos())
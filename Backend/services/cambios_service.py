@@ -0,0 +1,245 @@
+# backend/services/cambios_service.py
+
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from google.cloud.firestore_v1 import DocumentReference
+
+from firebase_config import db
+from models import Solicitud, Queja, Notificacion
+from services.condominio_service import PorCondominio, ruta_condominio
+
+logger = logging.getLogger(__name__)
+
+# Colecciones publicadas en el feed de cambios
+COLECCIONES = {
+    'solicitud': Solicitud.collection_name,
+    'queja': Queja.collection_name,
+    'notificacion': Notificacion.collection_name,
+}
+
+# Eventos pendientes por cliente antes de considerarlo demasiado lento
+TAMANO_COLA_CLIENTE = 1000
+
+TIPOS_CAMBIO = {'ADDED': 'creado', 'MODIFIED': 'actualizado', 'REMOVED': 'eliminado'}
+
+# Segundos mínimos entre dos intentos de reabrir el listener de una colección
+# (si Firestore sigue sin responder, el listener nuevo vuelve a caer)
+INTERVALO_REINICIO = 5
+
+
+def _serializar(valor):
+    if isinstance(valor, DocumentReference):
+        return valor.path
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, dict):
+        return {k: _serializar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_serializar(v) for v in valor]
+    return valor
+
+
+# Un filtro por referencia acepta tanto la ruta completa como solo el ID del documento
+def _coincide(valor, esperado):
+    if isinstance(valor, str) and '/' in valor and '/' not in esperado:
+        return valor.rsplit('/', 1)[-1] == esperado
+    return str(valor) == esperado
+
+
+class Suscripcion:
+    def __init__(self, colecciones, filtros):
+        self.colecciones = set(colecciones)
+        self.filtros = dict(filtros)
+        self.eventos = queue.Queue(maxsize=TAMANO_COLA_CLIENTE)
+        self.activa = True
+
+    def _cumple(self, datos):
+        if datos is None:
+            return False
+        for campo, esperado in self.filtros.items():
+            if campo not in datos or not _coincide(datos[campo], esperado):
+                return False
+        return True
+
+    # Evento que recibe este cliente, o None. Los filtros se evalúan sobre el
+    # estado anterior y el nuevo: un documento que deja de cumplirlos (por
+    # ejemplo, una solicitud que pasa de Pendiente a En Proceso con el filtro
+    # estado=Pendiente) se publica como eliminado para que el cliente lo quite.
+    def evento_para(self, evento, anterior=None):
+        if evento['coleccion'] not in self.colecciones:
+            return None
+        if evento['tipo'] == 'eliminado':
+            return evento if self._cumple(evento['data']) or self._cumple(anterior) else None
+        if self._cumple(evento['data']):
+            return evento
+        if self._cumple(anterior):
+            return dict(evento, tipo='eliminado')
+        return None
+
+
+# Feed de cambios del proceso: un único listener de Firestore por colección
+# que reparte los cambios a todos los clientes conectados según sus filtros.
+# Se guarda el último estado conocido de cada documento para evaluar los
+# filtros sobre el estado anterior y para publicar, al reabrir un listener
+# caído, lo que cambió mientras estuvo cerrado.
+class FeedCambios:
+    def __init__(self, cliente=db, colecciones=COLECCIONES, raiz=None, reloj=time.monotonic):
+        self._cliente = cliente
+        self._raiz = raiz
+        self._colecciones = colecciones
+        self._reloj = reloj
+        self._suscripciones = set()
+        self._listeners = {}
+        self._intentos = {}
+        self._estado = {}
+        self._resincronizar = set()
+        self._lock = threading.Lock()
+
+    def _abrir(self, nombre):
+        coleccion = self._colecciones[nombre]
+        ruta = f'{self._raiz}/{coleccion}' if self._raiz else coleccion
+        self._intentos[nombre] = self._reloj()
+        self._listeners[nombre] = self._cliente.collection(ruta).on_snapshot(self._callback(nombre))
+
+    def _iniciar(self):
+        for nombre in self._colecciones:
+            if nombre not in self._listeners:
+                self._abrir(nombre)
+
+    # Reabre los listeners que se cerraron por un error del stream (por
+    # ejemplo, con el interruptor de Firestore abierto). La primera entrega
+    # del listener nuevo se compara con el último estado conocido.
+    def revisar(self):
+        with self._lock:
+            if not self._suscripciones:
+                return
+            for nombre, listener in list(self._listeners.items()):
+                if getattr(listener, 'is_active', True):
+                    continue
+                if self._reloj() - self._intentos.get(nombre, 0) < INTERVALO_REINICIO:
+                    continue
+                logger.warning('Listener de %s cerrado; se vuelve a abrir.', nombre)
+                try:
+                    listener.unsubscribe()
+                except Exception:
+                    pass
+                self._resincronizar.add(nombre)
+                try:
+                    self._abrir(nombre)
+                except Exception as e:
+                    logger.warning('No se pudo reabrir el listener de %s: %s', nombre, e)
+
+    def _callback(self, nombre):
+        def on_snapshot(documentos, cambios, read_time):
+            estado = self._estado.get(nombre)
+            # La primera entrega del listener trae la colección completa: los
+            # clientes ya la cargan con el GET normal, así que solo se publican deltas
+            if estado is None:
+                self._resincronizar.discard(nombre)
+                self._estado[nombre] = {d.id: _serializar(d.to_dict() or {}) for d in documentos}
+                return
+            if nombre in self._resincronizar:
+                self._resincronizar.discard(nombre)
+                self._publicar_diferencias(nombre, estado, documentos)
+                return
+            for cambio in cambios:
+                documento = cambio.document
+                datos = _serializar(documento.to_dict() or {})
+                tipo = TIPOS_CAMBIO.get(cambio.type.name, cambio.type.name.lower())
+                if tipo == 'eliminado':
+                    anterior = estado.pop(documento.id, None)
+                else:
+                    anterior = estado.get(documento.id)
+                    estado[documento.id] = datos
+                self.publicar({'coleccion': nombre, 'tipo': tipo, 'id': documento.id, 'data': datos}, anterior)
+        return on_snapshot
+
+    # Compara la colección completa con el último estado conocido
+    def _publicar_diferencias(self, nombre, estado, documentos):
+        actuales = {d.id: _serializar(d.to_dict() or {}) for d in documentos}
+        for id_documento, datos in actuales.items():
+            anterior = estado.get(id_documento)
+            if datos != anterior:
+                tipo = 'creado' if anterior is None else 'actualizado'
+                self.publicar({'coleccion': nombre, 'tipo': tipo, 'id': id_documento, 'data': datos}, anterior)
+        for id_documento in set(estado) - set(actuales):
+            anterior = estado[id_documento]
+            self.publicar({'coleccion': nombre, 'tipo': 'eliminado', 'id': id_documento, 'data': anterior}, anterior)
+        self._estado[nombre] = actuales
+
+    def publicar(self, evento, anterior=None):
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            entrega = suscripcion.evento_para(evento, anterior)
+            if entrega is None:
+                continue
+            try:
+                suscripcion.eventos.put_nowait(entrega)
+            except queue.Full:
+                # Cliente demasiado lento: se desconecta para no acumular memoria
+                logger.warning('Suscripción descartada por exceso de eventos pendientes.')
+                suscripcion.activa = False
+                self.cancelar(suscripcion)
+
+    def suscribir(self, colecciones=None, filtros=None):
+        colecciones = colecciones or list(self._colecciones)
+        desconocidas = set(colecciones) - set(self._colecciones)
+        if desconocidas:
+            raise ValueError(f'Colecciones no soportadas: {", ".join(sorted(desconocidas))}.')
+        suscripcion = Suscripcion(colecciones, filtros or {})
+        with self._lock:
+            self._iniciar()
+            self._suscripciones.add(suscripcion)
+        self.revisar()
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def clientes(self):
+        with self._lock:
+            return len(self._suscripciones)
+
+    # Al descartar el feed se cierran sus listeners y se terminan los streams;
+    # los clientes SSE se reconectan solos y obtienen un feed nuevo
+    def cerrar(self):
+        with self._lock:
+            listeners, self._listeners = self._listeners, {}
+            suscripciones, self._suscripciones = self._suscripciones, set()
+        for listener in listeners.values():
+            listener.unsubscribe()
+        for suscripcion in suscripciones:
+            suscripcion.activa = False
+
+
+# Un feed por condominio; los listeners se abren con el primer cliente
+_feeds = PorCondominio(lambda condominio: FeedCambios(raiz=ruta_condominio(condominio)))
+
+
+def obtener_feed():
+    return _feeds.instancia()
+
+
+# Genera el stream Server-Sent Events de una suscripción, con latidos periódicos
+def eventos_sse(feed, suscripcion, latido=15):
+    try:
+        yield 'retry: 5000\n\n'
+        while suscripcion.activa:
+            try:
+                evento = suscripcion.eventos.get(timeout=latido)
+            except queue.Empty:
+                # Cada latido revisa que los listeners del feed sigan abiertos
+                feed.revisar()
+                yield ': latido\n\n'
+                continue
+            datos = json.dumps(evento, ensure_ascii=False)
+            yield f'event: {evento["coleccion"]}\ndata: {datos}\n\n'
+    finally:
+        feed.cancelar(suscripcion)
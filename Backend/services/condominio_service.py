@@ -0,0 +1,325 @@
+# backend/services/condominio_service.py
+
+import contextvars
+import functools
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask import request, jsonify, g
+from fireo.fields import ReferenceField
+from fireo.managers.managers import Manager, ManagerDescriptor
+from fireo.models import Model
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import firestore
+
+# Los datos de cada condominio viven en subcolecciones: condominios/{id}/pago, ...
+COLECCION_CONDOMINIOS = 'condominios'
+
+ENCABEZADO = 'X-Condominio'
+
+RUTAS_PUBLICAS = {'/'}
+
+_ID_VALIDO = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+# Condominios con servicios en memoria (índices, calendario, feeds) por proceso;
+# al superar el máximo se descarta el usado hace más tiempo. Tiene que cubrir a
+# los condominios activos de un worker: si no, las instancias se descartan y se
+# reconstruyen en cada vuelta. Se configura con CONDOMINIOS_EN_MEMORIA.
+MAX_INSTANCIAS = 256
+
+# Segundos que se recuerda si un condominio existe (documento condominios/{id})
+VIGENCIA_EXISTENCIA = 300
+MAX_EXISTENCIA = 1024
+
+_actual = contextvars.ContextVar('condominio', default=None)
+
+logger = logging.getLogger(__name__)
+
+
+class CondominioInvalido(Exception):
+    pass
+
+
+def condominio_actual():
+    return _actual.get()
+
+
+def ruta_condominio(condominio=None):
+    condominio = condominio or condominio_actual()
+    return f'{COLECCION_CONDOMINIOS}/{condominio}' if condominio else None
+
+
+def validar_condominio(condominio):
+    if not condominio or not _ID_VALIDO.match(condominio):
+        raise CondominioInvalido('Identificador de condominio inválido.')
+    return condominio
+
+
+# Para scripts y jobs: ejecuta el bloque dentro de un condominio
+@contextmanager
+def en_condominio(condominio):
+    if condominio:
+        validar_condominio(condominio)
+        instalar_particion()
+    token = _actual.set(condominio or None)
+    try:
+        yield
+    finally:
+        _actual.reset(token)
+
+
+# Las keys que envían los clientes son relativas al condominio ('departamento/abc');
+# también se aceptan keys completas del mismo condominio. Una key de otro
+# condominio queda anidada bajo el actual y por lo tanto no existe.
+def key_en_condominio(key):
+    raiz = ruta_condominio()
+    if not raiz or not isinstance(key, str) or '/' not in key or key.startswith(raiz + '/'):
+        return key
+    return f'{raiz}/{key}'
+
+
+# Instancias separadas por condominio de un servicio con estado en memoria
+# (índices, calendario, feeds). Fuera de un condominio se usa una instancia global.
+# Se guardan en un LRU: la instancia descartada se cierra si tiene cerrar().
+# Sin máximo propio se usa MAX_INSTANCIAS (configurable al registrar la app).
+class PorCondominio:
+    def __init__(self, fabrica, maximo=None):
+        self._fabrica = fabrica
+        self._maximo = maximo
+        self._instancias = OrderedDict()
+        self._lock = threading.Lock()
+
+    def instancia(self):
+        condominio = condominio_actual()
+        descartadas = []
+        with self._lock:
+            instancia = self._instancias.get(condominio)
+            if instancia is None:
+                instancia = self._instancias[condominio] = self._fabrica(condominio)
+            self._instancias.move_to_end(condominio)
+            maximo = self._maximo or MAX_INSTANCIAS
+            while len(self._instancias) > maximo:
+                descartadas.append(self._instancias.popitem(last=False))
+        for condominio_descartado, descartada in descartadas:
+            logger.warning('Condominio %s descartado de memoria (máximo %d); considere subir CONDOMINIOS_EN_MEMORIA',
+                           condominio_descartado, maximo)
+            cerrar = getattr(descartada, 'cerrar', None)
+            if cerrar is not None:
+                cerrar()
+        return instancia
+
+    # Los métodos se resuelven al llamarlos, así que se pueden guardar (por ejemplo como hooks)
+    def __getattr__(self, nombre):
+        atributo = getattr(self.instancia(), nombre)
+        if not callable(atributo):
+            return atributo
+
+        @functools.wraps(atributo)
+        def metodo(*args, **kwargs):
+            return getattr(self.instancia(), nombre)(*args, **kwargs)
+        return metodo
+
+
+def _envolver_descriptor(get_original):
+    @functools.wraps(get_original)
+    def __get__(self, instance, owner):
+        manager = get_original(self, instance, owner)
+        raiz = ruta_condominio()
+        # Copia por acceso: el manager de la clase es compartido entre hilos
+        return manager.copy(parent_key=raiz) if raiz else manager
+    return __get__
+
+
+def _envolver_init(init_original):
+    @functools.wraps(init_original)
+    def __init__(self, *args, parent='', **kwargs):
+        init_original(self, *args, parent=parent or ruta_condominio() or '', **kwargs)
+    return __init__
+
+
+def _envolver_por_key(metodo_original):
+    @functools.wraps(metodo_original)
+    def metodo(self, *args, **kwargs):
+        if 'key' in kwargs:
+            kwargs['key'] = key_en_condominio(kwargs['key'])
+        elif args:
+            args = (key_en_condominio(args[0]),) + args[1:]
+        return metodo_original(self, *args, **kwargs)
+    return metodo
+
+
+def _envolver_por_keys(metodo_original):
+    @functools.wraps(metodo_original)
+    def metodo(self, *args, **kwargs):
+        if 'key_list' in kwargs:
+            kwargs['key_list'] = [key_en_condominio(key) for key in kwargs['key_list']]
+        elif args:
+            args = ([key_en_condominio(key) for key in args[0]],) + args[1:]
+        return metodo_original(self, *args, **kwargs)
+    return metodo
+
+
+def _envolver_referencia(db_value_original):
+    @functools.wraps(db_value_original)
+    def db_value(self, model):
+        return db_value_original(self, key_en_condominio(model) if isinstance(model, str) else model)
+    return db_value
+
+
+_instalado = False
+_lock_instalacion = threading.Lock()
+
+
+# Enruta los modelos de FireO a las subcolecciones del condominio actual:
+# consultas y lecturas por id usan el condominio como parent, los modelos
+# nuevos se guardan bajo él y las keys y referencias recibidas se resuelven
+# relativas a él. Sin condominio activo el comportamiento no cambia.
+def instalar_particion():
+    global _instalado
+    with _lock_instalacion:
+        if _instalado:
+            return
+        ManagerDescriptor.__get__ = _envolver_descriptor(ManagerDescriptor.__get__)
+        Model.__init__ = _envolver_init(Model.__init__)
+        for metodo in ('get', 'update', 'delete'):
+            setattr(Manager, metodo, _envolver_por_key(getattr(Manager, metodo)))
+        for metodo in ('get_all', 'delete_all'):
+            setattr(Manager, metodo, _envolver_por_keys(getattr(Manager, metodo)))
+        ReferenceField.db_value = _envolver_referencia(ReferenceField.db_value)
+        _instalado = True
+
+
+# Recuerda por un tiempo qué condominios existen, para no leer Firestore en
+# cada solicitud. La consulta es inyectable para las pruebas.
+class RegistroCondominios:
+    def __init__(self, consultar=None, vigencia=VIGENCIA_EXISTENCIA, maximo=MAX_EXISTENCIA, reloj=time.monotonic):
+        self._consultar = consultar or _existe_en_firestore
+        self._vigencia = vigencia
+        self._maximo = maximo
+        self._reloj = reloj
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def existe(self, condominio):
+        ahora = self._reloj()
+        with self._lock:
+            entrada = self._entradas.get(condominio)
+            if entrada is not None and entrada[1] > ahora:
+                self._entradas.move_to_end(condominio)
+                return entrada[0]
+        existe = self._consultar(condominio)
+        with self._lock:
+            self._entradas[condominio] = (existe, ahora + self._vigencia)
+            self._entradas.move_to_end(condominio)
+            while len(self._entradas) > self._maximo:
+                self._entradas.popitem(last=False)
+        return existe
+
+    def olvidar(self, condominio=None):
+        with self._lock:
+            if condominio is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(condominio, None)
+
+
+def _existe_en_firestore(condominio):
+    from firebase_config import db
+    return db.collection(COLECCION_CONDOMINIOS).document(condominio).get().exists
+
+
+registro_condominios = RegistroCondominios()
+
+
+# Crea el documento condominios/{id} que habilita al condominio con
+# MULTI_CONDOMINIO=1. Devuelve False si ya estaba registrado.
+def registrar_condominio(condominio, nombre=None):
+    from firebase_config import db
+
+    validar_condominio(condominio)
+    try:
+        db.collection(COLECCION_CONDOMINIOS).document(condominio).create({
+            'nombre': nombre or condominio,
+            'fecha_registro': firestore.SERVER_TIMESTAMP,
+        })
+        registrado = True
+    except AlreadyExists:
+        registrado = False
+    registro_condominios.olvidar(condominio)
+    return registrado
+
+
+def listar_condominios():
+    from firebase_config import db
+    return [
+        dict(snapshot.to_dict() or {}, id=snapshot.id)
+        for snapshot in db.collection(COLECCION_CONDOMINIOS).stream()
+    ]
+
+
+# Condominios a los que da acceso un token: el claim 'condominio' o la lista 'condominios'
+def condominios_del_usuario(usuario):
+    condominios = set(usuario.get('condominios') or [])
+    if usuario.get('condominio'):
+        condominios.add(usuario['condominio'])
+    return condominios
+
+
+# El condominio viene en el encabezado X-Condominio o, si se configura
+# DOMINIO_BASE, en el subdominio (torre-norte.midominio.cl)
+def resolver_condominio(app):
+    condominio = request.headers.get(ENCABEZADO)
+    dominio = app.config.get('DOMINIO_BASE')
+    if not condominio and dominio:
+        host = request.host.split(':', 1)[0].lower()
+        if host.endswith('.' + dominio):
+            condominio = host[:-len(dominio) - 1].split('.')[-1]
+    return condominio
+
+
+def registrar_condominios(app):
+    global MAX_INSTANCIAS
+    MAX_INSTANCIAS = app.config.get('CONDOMINIOS_EN_MEMORIA', MAX_INSTANCIAS)
+
+    # Los parches de FireO se instalan solo si se usan condominios
+    if app.config.get('MULTI_CONDOMINIO', False):
+        instalar_particion()
+
+    @app.before_request
+    def asignar_condominio():
+        if not app.config.get('MULTI_CONDOMINIO', False):
+            return None
+        if not _instalado:
+            instalar_particion()
+        if request.method == 'OPTIONS' or request.path in RUTAS_PUBLICAS:
+            return None
+
+        try:
+            condominio = validar_condominio(resolver_condominio(app))
+        except CondominioInvalido:
+            return jsonify({'status': 'error', 'message': f'Se requiere el encabezado {ENCABEZADO} o un subdominio válido.'}), 400
+
+        # El token tiene que dar acceso al condominio (claim 'condominio' o
+        # 'condominios'); un token sin condominios no da acceso a ninguno.
+        # Sin autenticación (AUTH_REQUIRED=0) no hay usuario que revisar.
+        usuario = g.get('usuario')
+        if usuario is not None and condominio not in condominios_del_usuario(usuario):
+            return jsonify({'status': 'error', 'message': 'No tiene acceso a este condominio.'}), 403
+
+        # Solo se atienden condominios registrados: evita crear servicios en
+        # memoria para identificadores arbitrarios
+        if not registro_condominios.existe(condominio):
+            return jsonify({'status': 'error', 'message': 'Condominio no encontrado.'}), 404
+
+        g.condominio_token = _actual.set(condominio)
+        return None
+
+    @app.teardown_request
+    def liberar_condominio(error=None):
+        token = g.pop('condominio_token', None)
+        if token is not None:
+            _actual.reset(token)
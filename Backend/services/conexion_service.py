@@ -0,0 +1,348 @@
+# backend/services/conexion_service.py
+
+import logging
+import os
+import threading
+import time
+
+import grpc
+from google.cloud import firestore_v1
+from google.cloud.firestore_v1.services.firestore import client as firestore_client
+from google.cloud.firestore_v1.services.firestore.transports.grpc import FirestoreGrpcTransport
+
+from services.interruptor_service import interruptor
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto (se pueden cambiar con variables de entorno)
+TAMANO_POOL = 4                 # canales gRPC por proceso
+KEEPALIVE_MS = 30000            # ping de keep-alive en conexiones inactivas
+KEEPALIVE_TIMEOUT_MS = 10000    # espera de la respuesta al ping antes de cerrar la conexión
+DEADLINE_POR_DEFECTO = 30.0     # segundos por llamada a Firestore si el llamador no indica otro
+ESPERA_CALENTAMIENTO = 10.0     # segundos máximos para conectar los canales (en paralelo)
+
+# El cliente de Firestore no permite pasarle un transporte: el pool se instala
+# reemplazando atributos internos del cliente, así que solo se hace en las
+# versiones de google-cloud-firestore probadas (requirements.txt)
+VERSIONES_FIRESTORE = ('2.11.',)
+
+# Estados de conectividad en texto para las métricas
+_ESTADOS = {
+    grpc.ChannelConnectivity.IDLE: 'inactivo',
+    grpc.ChannelConnectivity.CONNECTING: 'conectando',
+    grpc.ChannelConnectivity.READY: 'listo',
+    grpc.ChannelConnectivity.TRANSIENT_FAILURE: 'falla_transitoria',
+    grpc.ChannelConnectivity.SHUTDOWN: 'cerrado',
+}
+
+
+def _entero(nombre, defecto):
+    valor = os.environ.get(nombre)
+    return int(valor) if valor else defecto
+
+
+def _decimal(nombre, defecto):
+    valor = os.environ.get(nombre)
+    return float(valor) if valor else defecto
+
+
+def opciones_canal(keepalive_ms=KEEPALIVE_MS, keepalive_timeout_ms=KEEPALIVE_TIMEOUT_MS):
+    return [
+        ('grpc.keepalive_time_ms', keepalive_ms),
+        ('grpc.keepalive_timeout_ms', keepalive_timeout_ms),
+        # Mantiene vivas las conexiones entre ráfagas aunque no haya llamadas en curso
+        ('grpc.keepalive_permit_without_calls', 1),
+        ('grpc.http2.max_pings_without_data', 0),
+        # Cada canal abre su propia conexión en vez de compartir el subcanal global
+        ('grpc.use_local_subchannel_pool', 1),
+    ]
+
+
+# Métricas y conectividad de un canal del pool
+class _Canal:
+    def __init__(self, canal):
+        self.canal = canal
+        self.en_curso = 0
+        self.pico = 0
+        self.llamadas = 0
+        self.errores = 0
+        self.reconexiones = 0
+        self.estado = grpc.ChannelConnectivity.IDLE
+        self._conectado_antes = False
+        # Multicallables de cada método creados sobre este canal: se descartan
+        # con él cuando el pool recrea sus canales
+        self.multicallables = {}
+        canal.subscribe(self._cambio_estado)
+
+    def _cambio_estado(self, estado):
+        if estado == grpc.ChannelConnectivity.READY:
+            if self._conectado_antes:
+                self.reconexiones += 1
+                logger.info('Canal de Firestore reconectado')
+            self._conectado_antes = True
+        self.estado = estado
+
+    def metricas(self):
+        return {
+            'estado': _ESTADOS.get(self.estado, str(self.estado)),
+            'en_curso': self.en_curso,
+            'pico': self.pico,
+            'llamadas': self.llamadas,
+            'errores': self.errores,
+            'reconexiones': self.reconexiones,
+        }
+
+
+# Método RPC del pool: en cada llamada elige el canal menos ocupado y aplica
+# el deadline por defecto cuando el llamador no indicó uno
+class _Metodo:
+    def __init__(self, pool, tipo, metodo, kwargs, con_deadline):
+        self._pool = pool
+        self._tipo = tipo
+        self._metodo = metodo
+        self._kwargs = kwargs
+        self._con_deadline = con_deadline
+
+    def _multicallable(self, canal):
+        clave = (self._tipo, self._metodo)
+        multicallable = canal.multicallables.get(clave)
+        if multicallable is None:
+            # Dos hilos pueden crearlo a la vez: setdefault conserva uno solo
+            multicallable = canal.multicallables.setdefault(
+                clave, getattr(canal.canal, self._tipo)(self._metodo, **self._kwargs)
+            )
+        return multicallable
+
+    def __call__(self, *args, timeout=None, **kwargs):
+        if self._con_deadline:
+            timeout = self._pool.deadline(timeout)
+        interruptor = self._pool.interruptor
+        sondeo = interruptor.permitir(sondear=self._con_deadline) if interruptor is not None else False
+        canal = self._pool._tomar()
+        inicio = time.monotonic()
+        try:
+            respuesta = self._multicallable(canal)(*args, timeout=timeout, **kwargs)
+        except grpc.RpcError as e:
+            self._pool._soltar(canal, error=True)
+            if interruptor is not None:
+                interruptor.registrar(sondeo, time.monotonic() - inicio, e.code() if hasattr(e, 'code') else grpc.StatusCode.UNKNOWN)
+            raise
+        except BaseException:
+            self._pool._soltar(canal)
+            if sondeo:
+                interruptor.cancelar_sondeo()
+            raise
+
+        # Las respuestas en streaming siguen ocupando el canal hasta que terminan;
+        # los streams largos (listeners) no se miden en el interruptor
+        if self._tipo.endswith('_stream') and hasattr(respuesta, 'add_callback'):
+            def terminar():
+                codigo = respuesta.code()
+                self._pool._soltar(canal, error=codigo != grpc.StatusCode.OK)
+                if interruptor is not None and (self._con_deadline or sondeo):
+                    duracion = 0.0 if codigo == grpc.StatusCode.OK else time.monotonic() - inicio
+                    interruptor.registrar(sondeo, duracion, None if codigo == grpc.StatusCode.OK else codigo)
+            if not respuesta.add_callback(terminar):
+                terminar()
+        else:
+            self._pool._soltar(canal)
+            if interruptor is not None:
+                interruptor.registrar(sondeo, time.monotonic() - inicio)
+        return respuesta
+
+    def __getattr__(self, nombre):
+        # with_call, future: se delegan al canal menos ocupado sin contabilizar
+        return getattr(self._multicallable(self._pool._tomar(contar=False)), nombre)
+
+
+# Varios canales gRPC presentados como uno solo al transporte de Firestore.
+# Reparte las llamadas entre conexiones HTTP/2 (cada una admite un número
+# limitado de streams concurrentes) y registra su uso.
+class PoolCanales(grpc.Channel):
+    def __init__(self, crear_canal, tamano=TAMANO_POOL, deadline=DEADLINE_POR_DEFECTO, interruptor=None):
+        self._crear_canal = crear_canal
+        self.tamano = max(1, tamano)
+        self.deadline_por_defecto = deadline
+        self.interruptor = interruptor
+        self._lock = threading.Lock()
+        self._siguiente = 0
+        self._canales = [_Canal(crear_canal()) for _ in range(self.tamano)]
+        self._ajustes_deadline = []
+
+    # Permite a otros servicios acotar el deadline (por ejemplo, el de la solicitud HTTP)
+    def agregar_ajuste_deadline(self, ajuste):
+        self._ajustes_deadline.append(ajuste)
+
+    def deadline(self, timeout=None):
+        if timeout is None:
+            timeout = self.deadline_por_defecto
+        for ajuste in self._ajustes_deadline:
+            timeout = ajuste(timeout)
+        return timeout
+
+    def _tomar(self, contar=True):
+        with self._lock:
+            # Menos llamadas en curso; en empate, el siguiente en turno
+            inicio = self._siguiente
+            self._siguiente = (inicio + 1) % self.tamano
+            elegido = None
+            for i in range(self.tamano):
+                canal = self._canales[(inicio + i) % self.tamano]
+                if elegido is None or canal.en_curso < elegido.en_curso:
+                    elegido = canal
+            if contar:
+                elegido.en_curso += 1
+                elegido.llamadas += 1
+                elegido.pico = max(elegido.pico, elegido.en_curso)
+            return elegido
+
+    def _soltar(self, canal, error=False):
+        with self._lock:
+            canal.en_curso -= 1
+            if error:
+                canal.errores += 1
+
+    def unary_unary(self, metodo, **kwargs):
+        return _Metodo(self, 'unary_unary', metodo, kwargs, True)
+
+    def unary_stream(self, metodo, **kwargs):
+        return _Metodo(self, 'unary_stream', metodo, kwargs, True)
+
+    # Los streams bidireccionales (listeners, escritura) son de larga duración: sin deadline
+    def stream_unary(self, metodo, **kwargs):
+        return _Metodo(self, 'stream_unary', metodo, kwargs, False)
+
+    def stream_stream(self, metodo, **kwargs):
+        return _Metodo(self, 'stream_stream', metodo, kwargs, False)
+
+    def subscribe(self, callback, try_to_connect=False):
+        self._canales[0].canal.subscribe(callback, try_to_connect)
+
+    def unsubscribe(self, callback):
+        self._canales[0].canal.unsubscribe(callback)
+
+    def close(self):
+        for canal in self._canales:
+            canal.canal.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    # Abre todas las conexiones (TLS y HTTP/2) a la vez: la espera total es
+    # la del canal más lento, no la suma de todos
+    def calentar(self, espera=ESPERA_CALENTAMIENTO):
+        with self._lock:
+            canales = list(self._canales)
+        futuros = [grpc.channel_ready_future(canal.canal) for canal in canales]
+        limite = time.monotonic() + espera
+        listos = 0
+        for futuro in futuros:
+            try:
+                futuro.result(timeout=max(0.0, limite - time.monotonic()))
+                listos += 1
+            except grpc.FutureTimeoutError:
+                futuro.cancel()
+        if listos < len(canales):
+            logger.warning('%d canales de Firestore no conectaron en %.1f s', len(canales) - listos, espera)
+        logger.info('Canales de Firestore listos: %d de %d', listos, len(canales))
+        return listos
+
+    # Después de un fork los canales del proceso padre no se pueden usar; sus
+    # multicallables se van con ellos
+    def reiniciar(self):
+        with self._lock:
+            self._canales = [_Canal(self._crear_canal()) for _ in range(self.tamano)]
+
+    def metricas(self):
+        with self._lock:
+            canales = [canal.metricas() for canal in self._canales]
+        return {
+            'tamano': self.tamano,
+            'deadline_por_defecto': self.deadline_por_defecto,
+            'en_curso': sum(canal['en_curso'] for canal in canales),
+            'llamadas': sum(canal['llamadas'] for canal in canales),
+            'canales': canales,
+        }
+
+
+pool = None
+
+
+# Reemplaza el canal que el cliente de Firestore crearía al primer uso por un
+# pool de canales configurado. crear_canal permite otro backend (por ejemplo,
+# el almacén en memoria); con el emulador se deja el canal por defecto.
+def instalar_pool(cliente, crear_canal=None):
+    global pool
+    if crear_canal is None and cliente._emulator_host is not None:
+        return None
+    if not firestore_v1.__version__.startswith(VERSIONES_FIRESTORE):
+        if crear_canal is not None:
+            raise RuntimeError(f'google-cloud-firestore {firestore_v1.__version__} no es compatible con el pool de canales.')
+        logger.warning('google-cloud-firestore %s no está probada con el pool de canales; se usa el canal por defecto',
+                       firestore_v1.__version__)
+        return None
+
+    if crear_canal is None:
+        keepalive = _entero('FIRESTORE_KEEPALIVE_MS', KEEPALIVE_MS)
+        keepalive_timeout = _entero('FIRESTORE_KEEPALIVE_TIMEOUT_MS', KEEPALIVE_TIMEOUT_MS)
+        opciones = opciones_canal(keepalive, keepalive_timeout)
+
+        def crear_canal():
+            return FirestoreGrpcTransport.create_channel(cliente._target, credentials=cliente._credentials, options=opciones)
+
+    pool = PoolCanales(
+        crear_canal,
+        tamano=_entero('FIRESTORE_CANALES', TAMANO_POOL),
+        deadline=_decimal('FIRESTORE_DEADLINE', DEADLINE_POR_DEFECTO),
+        interruptor=interruptor,
+    )
+    # Lo mismo que hace el cliente al crear su transporte, salvo el client_info:
+    # va al transporte de este cliente y no a la variable global del módulo
+    transporte = FirestoreGrpcTransport(host=cliente._target, channel=pool, client_info=cliente._client_info)
+    cliente._transport = transporte
+    cliente._firestore_api_internal = firestore_client.FirestoreClient(
+        transport=transporte, client_options=cliente._client_options
+    )
+
+    # Con gunicorn --preload el pool se crea en el maestro; cada worker abre los suyos
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=_reiniciar_en_hijo)
+    return pool
+
+
+# Proceso en el que ya se lanzó el calentamiento de los canales
+_pid_calentado = None
+_lock_calentamiento = threading.Lock()
+
+
+def _reiniciar_en_hijo():
+    global _lock_calentamiento
+    _lock_calentamiento = threading.Lock()
+    pool.reiniciar()
+
+
+# Conecta los canales en un hilo aparte, una vez por proceso. No se hace al
+# importar: con --preload eso abriría conexiones gRPC en el maestro antes del
+# fork (los workers no pueden usarlas) y retrasaría el arranque.
+def calentar_conexiones():
+    global _pid_calentado
+    if pool is None or os.environ.get('FIRESTORE_CALENTAR', '1') == '0' or _pid_calentado == os.getpid():
+        return
+    with _lock_calentamiento:
+        if _pid_calentado == os.getpid():
+            return
+        _pid_calentado = os.getpid()
+    threading.Thread(target=pool.calentar, daemon=True).start()
+
+
+# El calentamiento empieza con la primera solicitud que atiende cada worker
+def registrar_calentamiento(app):
+    app.before_request(calentar_conexiones)
+
+
+def metricas_conexiones():
+    return pool.metricas() if pool is not None else None
@@ -0,0 +1,104 @@
+# backend/services/deadline_service.py
+
+import contextvars
+import time
+
+from flask import request, jsonify, g
+
+from services import conexion_service
+from services.limite_service import ENDPOINTS_STREAMING, RUTAS_EXENTAS
+
+ENCABEZADO = 'X-Request-Timeout'   # segundos, los define el cliente (hasta DEADLINE_MAXIMO)
+
+# Valores por defecto (se pueden cambiar en app.config)
+DEADLINE_POR_DEFECTO = 10.0
+DEADLINE_MAXIMO = 60.0
+
+# Deadlines específicos por endpoint; tienen prioridad sobre el por defecto
+DEADLINES = {
+    'importacion_bp.importar_archivo': 120.0,
+    'busqueda_bp.reconstruir_indice': 120.0,
+    'departamento_bp.reconstruir_resumen': 120.0,
+    'solicitud_bp.asignar_solicitudes_pendientes': 60.0,
+    'historialpago_bp.get_historiales_pagos': 30.0,
+    'transaccion_bp.get_transacciones': 30.0,
+    'notificacion_bp.get_notificaciones': 30.0,
+    'archivo_bp.get_periodo': 30.0,
+}
+
+# Instante (time.monotonic) en que vence la solicitud actual
+_vence = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExcedido(Exception):
+    pass
+
+
+def tiempo_restante():
+    vence = _vence.get()
+    return None if vence is None else vence - time.monotonic()
+
+
+# Acota el timeout de cada llamada a Firestore al tiempo que le queda a la
+# solicitud. Con el plazo vencido no se inicia la llamada: la excepción no es
+# de google.api_core, así que tampoco la reintenta el Retry del cliente.
+def acotar_timeout(timeout):
+    restante = tiempo_restante()
+    if restante is None:
+        return timeout
+    if restante <= 0:
+        raise DeadlineExcedido('Se agotó el tiempo de la solicitud.')
+    return restante if timeout is None else min(timeout, restante)
+
+
+def _deadline_solicitud(app):
+    maximo = app.config.get('DEADLINE_MAXIMO', DEADLINE_MAXIMO)
+    valor = request.headers.get(ENCABEZADO)
+    if valor:
+        segundos = float(valor)
+        if not 0 < segundos <= maximo:
+            raise ValueError
+        return segundos
+    return DEADLINES.get(request.endpoint, app.config.get('DEADLINE_SOLICITUD', DEADLINE_POR_DEFECTO))
+
+
+def _respuesta_vencida():
+    respuesta = jsonify({'status': 'error', 'message': 'Se agotó el tiempo de la solicitud.'})
+    respuesta.status_code = 504
+    return respuesta
+
+
+def registrar_deadlines(app):
+    if conexion_service.pool is not None:
+        conexion_service.pool.agregar_ajuste_deadline(acotar_timeout)
+
+    @app.before_request
+    def asignar_deadline():
+        if request.path in RUTAS_EXENTAS or request.method == 'OPTIONS' or request.endpoint in ENDPOINTS_STREAMING:
+            return None
+        try:
+            segundos = _deadline_solicitud(app)
+        except ValueError:
+            maximo = app.config.get('DEADLINE_MAXIMO', DEADLINE_MAXIMO)
+            return jsonify({'status': 'error', 'message': f'{ENCABEZADO} debe ser un número de segundos entre 0 y {maximo:g}.'}), 400
+        g.deadline_token = _vence.set(time.monotonic() + segundos)
+        return None
+
+    # Los handlers convierten cualquier excepción en 500; si la solicitud ya
+    # venció, el error se debe al deadline y se responde 504
+    @app.after_request
+    def responder_vencida(respuesta):
+        restante = tiempo_restante()
+        if respuesta.status_code >= 500 and restante is not None and restante <= 0:
+            return _respuesta_vencida()
+        return respuesta
+
+    @app.errorhandler(DeadlineExcedido)
+    def deadline_excedido(error):
+        return _respuesta_vencida()
+
+    @app.teardown_request
+    def liberar_deadline(error=None):
+        token = g.pop('deadline_token', None)
+        if token is not None:
+            _vence.reset(token)
@@ -0,0 +1,139 @@
+# backend/services/esquema_service.py
+
+from datetime import datetime, timezone
+
+from fireo.fields import IDField, TextField, NumberField, BooleanField, ReferenceField, ListField, DateTime
+
+
+class ErrorValidacion(Exception):
+    def __init__(self, errores):
+        super().__init__(' '.join(errores))
+        self.errores = errores
+
+
+def _validador_tipo(nombre, campo):
+    if isinstance(campo, ReferenceField):
+        def validar(valor):
+            if not isinstance(valor, str) or not valor:
+                raise ValueError(f'El campo {nombre} debe ser un id o una key.')
+            return valor
+    elif isinstance(campo, TextField):
+        def validar(valor):
+            if not isinstance(valor, str):
+                raise ValueError(f'El campo {nombre} debe ser texto.')
+            return valor
+    elif isinstance(campo, BooleanField):
+        def validar(valor):
+            if not isinstance(valor, bool):
+                raise ValueError(f'El campo {nombre} debe ser verdadero o falso.')
+            return valor
+    elif isinstance(campo, NumberField):
+        def validar(valor):
+            if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+                raise ValueError(f'El campo {nombre} debe ser un número.')
+            return valor
+    elif isinstance(campo, ListField):
+        def validar(valor):
+            if not isinstance(valor, list):
+                raise ValueError(f'El campo {nombre} debe ser una lista.')
+            return valor
+    elif isinstance(campo, DateTime):
+        # Se aceptan fechas ISO 8601; sin zona horaria se asume UTC
+        def validar(valor):
+            if isinstance(valor, str):
+                try:
+                    valor = datetime.fromisoformat(valor)
+                except ValueError:
+                    raise ValueError(f'El campo {nombre} debe ser una fecha ISO 8601.') from None
+            elif not isinstance(valor, datetime):
+                raise ValueError(f'El campo {nombre} debe ser una fecha ISO 8601.')
+            return valor if valor.tzinfo else valor.replace(tzinfo=timezone.utc)
+    else:
+        def validar(valor):
+            return valor
+    return validar
+
+
+# Compila un campo de FireO en una sola función: tipo, choices y validators
+# del modelo se resuelven una vez y no en cada solicitud
+def compilar_campo(nombre, campo):
+    atributos = campo.raw_attributes
+    tipo = _validador_tipo(nombre, campo)
+    opciones = frozenset(atributos['choices']) if atributos.get('choices') else None
+    validadores = tuple(atributos.get('validators') or ())
+
+    if opciones is None and not validadores:
+        return tipo
+
+    mensaje_opciones = f'El campo {nombre} debe ser uno de: {", ".join(atributos["choices"])}.' if opciones else None
+
+    # Un TextField con choices queda en una sola búsqueda en el frozenset
+    if opciones is not None and not validadores and isinstance(campo, TextField):
+        def validar_opcion(valor):
+            try:
+                if valor in opciones:
+                    return valor
+            except TypeError:
+                pass
+            raise ValueError(mensaje_opciones)
+        return validar_opcion
+
+    def validar(valor):
+        valor = tipo(valor)
+        if opciones is not None and valor not in opciones:
+            raise ValueError(mensaje_opciones)
+        for validador in validadores:
+            validador(valor)
+        return valor
+    return validar
+
+
+# Esquema de solicitud generado desde la definición del modelo de FireO.
+# validar() no hace I/O: devuelve los datos normalizados (fechas como
+# datetime) o lanza ErrorValidacion con todos los errores encontrados.
+# excluidos: campos del modelo que no se aceptan en las solicitudes (calculados)
+class Esquema:
+    def __init__(self, modelo, requeridos=None, excluidos=()):
+        campos = {
+            nombre: campo for nombre, campo in modelo._meta.field_list.items()
+            if not isinstance(campo, IDField) and nombre not in excluidos
+        }
+        if requeridos is None:
+            requeridos = [nombre for nombre, campo in campos.items() if campo.raw_attributes.get('required')]
+        self.modelo = modelo
+        self.requeridos = tuple(requeridos)
+        self._requeridos = frozenset(requeridos)
+        self.validadores = {nombre: compilar_campo(nombre, campo) for nombre, campo in campos.items()}
+
+    # parcial: solo se validan los campos presentes (PUT/PATCH)
+    # estricto: los campos que no son del modelo son un error en vez de ignorarse
+    def validar(self, datos, parcial=False, estricto=False):
+        errores = []
+        if not parcial:
+            for campo in self.requeridos:
+                if datos.get(campo) in (None, ''):
+                    errores.append(f'El campo {campo} es requerido.')
+
+        resultado = {}
+        validadores = self.validadores
+        for campo, valor in datos.items():
+            validador = validadores.get(campo)
+            if validador is None:
+                if estricto:
+                    errores.append(f'El campo {campo} no es válido.')
+                continue
+            if valor is None or valor == '':
+                if campo in self._requeridos:
+                    if parcial:
+                        errores.append(f'El campo {campo} es requerido.')
+                    continue
+                resultado[campo] = None
+                continue
+            try:
+                resultado[campo] = validador(valor)
+            except ValueError as e:
+                errores.append(str(e))
+
+        if errores:
+            raise ErrorValidacion(errores)
+        return resultado
@@ -1,20 +1,33 @@
 from firebase_config import db, auth
+from services.auth_service import obtener_verificador, TokenInvalido
+
+# Tamaño de página por defecto al listar usuarios
+TAMANO_PAGINA = 100
 
 def create_user(user_data):
     try:
-        db.child("users").push(user_data)
+        db.collection("users").add(user_data)
         return True
     except Exception as e:
         print(f"Error: {e}")
         return False
 
-def get_users():
-    return db.child("users").get().val()
+# Devuelve una página de usuarios y el cursor para pedir la siguiente (None si no hay más)
+def get_users(limite=TAMANO_PAGINA, cursor=None):
+    usuarios = db.collection("users")
+    consulta = usuarios.order_by("__name__").limit(limite)
+    if cursor:
+        consulta = consulta.start_after({"__name__": usuarios.document(cursor)})
+
+    documentos = list(consulta.stream())
+    pagina = [{"id": doc.id, **doc.to_dict()} for doc in documentos]
+    siguiente = documentos[-1].id if len(documentos) == limite else None
+    return pagina, siguiente
 
-def authenticate_user(email, password):
+# Verifica un ID token de Firebase localmente contra las claves públicas en caché
+def authenticate_user(id_token):
     try:
-        user = auth.sign_in_with_email_and_password(email, password)
-        return user
-    except Exception as e:
+        return obtener_verificador().verificar(id_token)
+    except TokenInvalido as e:
         print(f"Error: {e}")
         return None
@@ -0,0 +1,208 @@
+# backend/services/idempotencia_service.py
+
+import functools
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import request, jsonify, make_response, g
+
+from services.condominio_service import condominio_actual
+
+ENCABEZADO = 'Idempotency-Key'
+
+# Tiempo durante el que se puede reproducir una respuesta guardada
+VIGENCIA_RESPUESTA = 24 * 3600
+
+# Tiempo máximo que una clave queda reservada mientras el handler se ejecuta;
+# si el proceso muere, la reserva expira y otro reintento puede ejecutarse
+VIGENCIA_RESERVA = 60
+
+# Tiempo que un duplicado concurrente espera a que termine la primera solicitud
+ESPERA_DUPLICADO = 10
+INTERVALO_SONDEO = 0.1
+
+MAX_LARGO_CLAVE = 255
+
+
+# Almacén en memoria del proceso (un solo nodo o desarrollo)
+class AlmacenLocal:
+    def __init__(self, reloj=time.time):
+        self._registros = {}
+        self._reloj = reloj
+        self._lock = threading.Lock()
+
+    def reclamar(self, clave, huella):
+        with self._lock:
+            registro = self._registros.get(clave)
+            if registro is None or registro['expira'] <= self._reloj():
+                self._registros[clave] = {
+                    'huella': huella, 'estado': 'en_proceso', 'expira': self._reloj() + VIGENCIA_RESERVA
+                }
+                return None
+            return dict(registro)
+
+    def completar(self, clave, respuesta):
+        with self._lock:
+            self._registros[clave] = dict(respuesta, estado='completado', expira=self._reloj() + VIGENCIA_RESPUESTA)
+
+    def liberar(self, clave):
+        with self._lock:
+            self._registros.pop(clave, None)
+
+    def obtener(self, clave):
+        with self._lock:
+            registro = self._registros.get(clave)
+            if registro is None or registro['expira'] <= self._reloj():
+                return None
+            return dict(registro)
+
+
+# Almacén en Firestore, compartido entre procesos y nodos. La reserva usa
+# create(), que falla si el documento ya existe, así que dos duplicados
+# concurrentes nunca ejecutan el handler a la vez; una reserva vencida se
+# reemplaza en una transacción, que también falla si otro la tomó primero.
+# Conviene configurar una política TTL de Firestore sobre el campo 'expira'
+# para borrar los registros vencidos.
+class AlmacenFirestore:
+    def __init__(self, cliente=None, coleccion='idempotencia'):
+        self._cliente = cliente
+        self._coleccion = coleccion
+
+    def _documento(self, clave):
+        if self._cliente is None:
+            from firebase_config import db
+            self._cliente = db
+        return self._cliente.collection(self._coleccion).document(clave)
+
+    @staticmethod
+    def _vencido(datos):
+        return datos['expira'] <= datetime.now(timezone.utc)
+
+    @staticmethod
+    def _reserva(huella):
+        return {
+            'huella': huella,
+            'estado': 'en_proceso',
+            'expira': datetime.now(timezone.utc) + timedelta(seconds=VIGENCIA_RESERVA),
+        }
+
+    def reclamar(self, clave, huella):
+        from google.api_core.exceptions import AlreadyExists
+        from google.cloud import firestore
+
+        documento = self._documento(clave)
+        try:
+            documento.create(self._reserva(huella))
+            return None
+        except AlreadyExists:
+            pass
+
+        # Existe un registro: si venció (o se borró entre medio) se reemplaza.
+        # Si otro duplicado lo reemplaza a la vez, la transacción se reintenta
+        # y esta solicitud ve la reserva del otro.
+        @firestore.transactional
+        def reemplazar_vencido(transaccion):
+            datos = documento.get(transaction=transaccion).to_dict()
+            if datos is not None and not self._vencido(datos):
+                return datos
+            transaccion.set(documento, self._reserva(huella))
+            return None
+
+        return reemplazar_vencido(self._cliente.transaction())
+
+    # Con merge: si la reserva ya no existe (TTL o liberada) la respuesta igual se guarda
+    def completar(self, clave, respuesta):
+        self._documento(clave).set(dict(
+            respuesta,
+            estado='completado',
+            expira=datetime.now(timezone.utc) + timedelta(seconds=VIGENCIA_RESPUESTA),
+        ), merge=True)
+
+    def liberar(self, clave):
+        self._documento(clave).delete()
+
+    def obtener(self, clave):
+        datos = self._documento(clave).get().to_dict()
+        if datos is None or self._vencido(datos):
+            return None
+        return datos
+
+
+def _crear_almacen():
+    if os.environ.get('IDEMPOTENCIA_BACKEND', 'firestore') == 'local':
+        return AlmacenLocal()
+    return AlmacenFirestore()
+
+
+almacen = _crear_almacen()
+
+
+def _clave_almacen(clave):
+    # Se separan las claves por condominio, usuario y ruta para que no colisionen entre clientes
+    usuario = getattr(g, 'usuario', None) or {}
+    base = f'{condominio_actual() or ""}:{usuario.get("uid", "")}:{request.method}:{request.path}:{clave}'
+    return hashlib.sha256(base.encode('utf-8')).hexdigest()
+
+
+def _huella_solicitud():
+    return hashlib.sha256(request.get_data()).hexdigest()
+
+
+def _reproducir(registro):
+    respuesta = make_response(registro['cuerpo'], registro['status'])
+    respuesta.mimetype = registro.get('mimetype', 'application/json')
+    respuesta.headers['Idempotent-Replayed'] = 'true'
+    return respuesta
+
+
+# Decorador para handlers POST: la primera respuesta para un Idempotency-Key se
+# guarda y los reintentos la reciben sin volver a ejecutar el handler.
+def idempotente(handler):
+    @functools.wraps(handler)
+    def envoltura(*args, **kwargs):
+        clave = request.headers.get(ENCABEZADO)
+        if not clave:
+            return handler(*args, **kwargs)
+        if len(clave) > MAX_LARGO_CLAVE:
+            return jsonify({'status': 'error', 'message': f'El encabezado {ENCABEZADO} es demasiado largo.'}), 400
+
+        clave = _clave_almacen(clave)
+        huella = _huella_solicitud()
+
+        registro = almacen.reclamar(clave, huella)
+        limite = time.monotonic() + ESPERA_DUPLICADO
+        while registro is not None:
+            if registro['huella'] != huella:
+                return jsonify({'status': 'error', 'message': f'El {ENCABEZADO} ya se usó con otro contenido.'}), 422
+            if registro['estado'] == 'completado':
+                return _reproducir(registro)
+            # Duplicado concurrente: se espera a que la primera solicitud termine
+            if time.monotonic() >= limite:
+                return jsonify({'status': 'error', 'message': 'La solicitud original aún está en proceso.'}), 409
+            time.sleep(INTERVALO_SONDEO)
+            registro = almacen.obtener(clave)
+            if registro is None:
+                registro = almacen.reclamar(clave, huella)
+
+        try:
+            respuesta = make_response(handler(*args, **kwargs))
+        except Exception:
+            almacen.liberar(clave)
+            raise
+
+        # Los errores del servidor no se guardan para que el cliente pueda reintentar
+        if respuesta.status_code >= 500:
+            almacen.liberar(clave)
+        else:
+            almacen.completar(clave, {
+                'huella': huella,
+                'status': respuesta.status_code,
+                'cuerpo': respuesta.get_data(as_text=True),
+                'mimetype': respuesta.mimetype,
+            })
+        return respuesta
+
+    return envoltura
@@ -0,0 +1,254 @@
+# backend/services/importacion_service.py
+
+import csv
+import io
+
+import fireo
+from models import (
+    Departamento, Propietario, Residente,
+    DEPARTAMENTO_TIPO, DEPARTAMENTO_ESTADO,
+    validate_rut, validate_email
+)
+from services.personas_service import buscador_personas, MODELOS as MODELOS_PERSONAS
+from services.resumen_service import sumar, aplicar
+
+# Firestore admite como máximo 500 escrituras por lote
+TAMANO_LOTE = 500
+
+# Límite de errores de fila que se devuelven en el reporte
+MAX_ERRORES = 1000
+
+# Definición de las entidades importables: modelo, campos requeridos,
+# campos numéricos, campos de elección y campo único
+ENTIDADES = {
+    'departamentos': {
+        'modelo': Departamento,
+        'campos': ['numero', 'piso', 'tipo', 'superficie', 'estado'],
+        'numericos': ['piso', 'superficie'],
+        'opciones': {'tipo': DEPARTAMENTO_TIPO, 'estado': DEPARTAMENTO_ESTADO},
+        'unico': 'numero',
+    },
+    'propietarios': {
+        'modelo': Propietario,
+        'campos': ['nombre', 'apepat', 'apemat', 'rut', 'telefono', 'email', 'direccion'],
+        'numericos': [],
+        'opciones': {},
+        'unico': 'rut',
+    },
+    'residentes': {
+        'modelo': Residente,
+        'campos': ['departamento', 'nombre', 'apepat', 'apemat', 'rut', 'telefono', 'email'],
+        'numericos': [],
+        'opciones': {},
+        'unico': 'rut',
+    },
+}
+
+
+class ImportacionError(Exception):
+    pass
+
+
+# Normaliza un RUT: quita puntos y espacios y deja el dígito verificador en mayúscula
+def normalizar_rut(rut):
+    rut = str(rut).replace('.', '').replace(' ', '').upper()
+    if '-' not in rut and len(rut) > 1:
+        rut = f'{rut[:-1]}-{rut[-1]}'
+    return rut
+
+
+# Calcula el dígito verificador (módulo 11) de un RUT chileno
+def digito_verificador(cuerpo):
+    suma = 0
+    factor = 2
+    for digito in reversed(cuerpo):
+        suma += int(digito) * factor
+        factor = 2 if factor == 7 else factor + 1
+    resto = 11 - (suma % 11)
+    if resto == 11:
+        return '0'
+    if resto == 10:
+        return 'K'
+    return str(resto)
+
+
+def validar_rut_completo(rut):
+    validate_rut(rut)
+    cuerpo, dv = rut.split('-')
+    if digito_verificador(cuerpo) != dv:
+        raise ValueError('El dígito verificador del RUT no es válido.')
+
+
+# Lee las filas de un archivo CSV o XLSX como diccionarios, sin cargarlo completo en memoria
+def leer_filas(archivo, nombre_archivo):
+    nombre = (nombre_archivo or '').lower()
+    if nombre.endswith('.xlsx'):
+        yield from _leer_xlsx(archivo)
+    elif nombre.endswith('.csv'):
+        yield from _leer_csv(archivo)
+    else:
+        raise ImportacionError('Formato de archivo no soportado, use CSV o XLSX.')
+
+
+def _leer_csv(archivo):
+    texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+    for fila in csv.DictReader(texto, dialect=dialecto):
+        yield {(k or '').strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in fila.items()}
+
+
+def _leer_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportacionError('Se requiere openpyxl para importar archivos XLSX.')
+
+    # El modo read_only recorre la hoja de forma incremental
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            return
+        columnas = [str(c or '').strip().lower() for c in encabezado]
+        for valores in filas:
+            if valores is None or all(v is None for v in valores):
+                continue
+            yield {
+                col: (v.strip() if isinstance(v, str) else v)
+                for col, v in zip(columnas, valores) if col
+            }
+    finally:
+        libro.close()
+
+
+# Índice en memoria de departamentos: número e ID -> key de Firestore
+def construir_indice_departamentos():
+    indice = {}
+    for departamento in Departamento.collection.fetch():
+        indice[str(departamento.numero)] = departamento.key
+        indice[departamento.id_departamento] = departamento.key
+        indice[departamento.key] = departamento.key
+    return indice
+
+
+# Valores ya existentes del campo único de la entidad, leídos una sola vez por importación
+def valores_existentes(entidad):
+    config = ENTIDADES[entidad]
+    campo = config['unico']
+    return {str(getattr(doc, campo)) for doc in config['modelo'].collection.fetch()}
+
+
+def validar_fila(entidad, fila, indice_departamentos, vistos):
+    config = ENTIDADES[entidad]
+    errores = []
+    datos = {}
+
+    for campo in config['campos']:
+        valor = fila.get(campo)
+        if valor is None or valor == '':
+            errores.append(f'El campo {campo} es requerido.')
+            continue
+        datos[campo] = valor
+
+    if errores:
+        return None, errores
+
+    for campo in config['numericos']:
+        try:
+            numero = float(datos[campo])
+            datos[campo] = int(numero) if numero.is_integer() else numero
+        except (TypeError, ValueError):
+            errores.append(f'El campo {campo} debe ser numérico.')
+
+    for campo, opciones in config['opciones'].items():
+        if datos[campo] not in opciones:
+            errores.append(f'El valor de {campo} debe ser uno de: {", ".join(opciones)}.')
+
+    if 'rut' in datos:
+        datos['rut'] = normalizar_rut(datos['rut'])
+        try:
+            validar_rut_completo(datos['rut'])
+        except ValueError as e:
+            errores.append(str(e))
+
+    if 'email' in datos:
+        try:
+            validate_email(str(datos['email']))
+        except ValueError as e:
+            errores.append(str(e))
+
+    for campo in ('numero', 'telefono'):
+        if campo in datos:
+            datos[campo] = str(datos[campo])
+
+    if 'departamento' in datos:
+        key = indice_departamentos.get(str(datos['departamento']))
+        if not key:
+            errores.append(f'Departamento {datos["departamento"]} no encontrado.')
+        else:
+            datos['departamento'] = key
+
+    unico = str(datos.get(config['unico']))
+    if unico in vistos:
+        errores.append(f'El valor {unico} del campo {config["unico"]} ya existe.')
+
+    if errores:
+        return None, errores
+
+    vistos.add(unico)
+    return datos, []
+
+
+# Importa un archivo completo: valida por lotes y escribe cada lote válido con una escritura en lote
+def importar(entidad, archivo, nombre_archivo, validar_solo=False, tamano_lote=TAMANO_LOTE):
+    if entidad not in ENTIDADES:
+        raise ImportacionError(f'Entidad {entidad} no soportada.')
+
+    modelo = ENTIDADES[entidad]['modelo']
+    indice_departamentos = construir_indice_departamentos() if entidad == 'residentes' else {}
+    vistos = valores_existentes(entidad)
+
+    resultado = {'procesadas': 0, 'importadas': 0, 'con_errores': 0, 'errores': []}
+    pendientes = []
+    # Los residentes suman al resumen de su departamento en el mismo lote
+    resumen = {}
+
+    def escribir(pendientes):
+        if validar_solo or not pendientes:
+            return
+        lote = fireo.batch()
+        for datos in pendientes:
+            modelo(**datos).save(batch=lote)
+        aplicar(lote, resumen)
+        lote.commit()
+        resultado['importadas'] += len(pendientes)
+
+    # La fila 1 corresponde al encabezado
+    for numero_fila, fila in enumerate(leer_filas(archivo, nombre_archivo), start=2):
+        resultado['procesadas'] += 1
+        datos, errores = validar_fila(entidad, fila, indice_departamentos, vistos)
+        if errores:
+            resultado['con_errores'] += 1
+            if len(resultado['errores']) < MAX_ERRORES:
+                resultado['errores'].append({'fila': numero_fila, 'errores': errores})
+            continue
+
+        pendientes.append(datos)
+        if entidad == 'residentes':
+            sumar(resumen, datos['departamento'], 'residentes_actuales', 1)
+        if len(pendientes) + len(resumen) >= tamano_lote:
+            escribir(pendientes)
+            pendientes = []
+            resumen.clear()
+
+    escribir(pendientes)
+    # Las escrituras en lote no pasan por Recurso: el índice de personas se reconstruye
+    if resultado['importadas'] and modelo.collection_name in MODELOS_PERSONAS:
+        buscador_personas.invalidar()
+    return resultado
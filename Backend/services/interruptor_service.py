@@ -0,0 +1,248 @@
+# backend/services/interruptor_service.py
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+import grpc
+from flask import request, jsonify, make_response, g, has_request_context
+
+from services.condominio_service import condominio_actual
+
+logger = logging.getLogger(__name__)
+
+# Valores por defecto del interruptor
+VENTANA = 50              # últimas llamadas consideradas
+MINIMO_LLAMADAS = 20      # llamadas mínimas en la ventana antes de evaluar
+UMBRAL_FALLAS = 0.5       # fracción de fallas (errores o lentas) que abre el circuito
+UMBRAL_LENTA = 2.0        # segundos desde los que una llamada cuenta como lenta
+ESPERA_ABIERTO = 10.0     # segundos con el circuito abierto antes de sondear
+SONDEOS = 3               # llamadas de prueba en semiabierto; si todas salen bien se cierra
+
+# Códigos que indican un problema de Firestore y no de la solicitud
+CODIGOS_FALLA = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+}
+
+# Respaldo de respuestas de lectura
+VIGENCIA_RESPALDO = 300   # antigüedad máxima (s) de una respuesta servida con el circuito abierto
+MAX_RESPALDOS = 1000
+MAX_BYTES_RESPALDO = 1024 * 1024          # por respuesta
+MAX_BYTES_RESPALDOS = 64 * 1024 * 1024   # entre todas las respuestas del proceso
+
+# Endpoints de lectura con respaldo; Recurso agrega los suyos al registrarse
+ENDPOINTS_RESPALDO = set()
+
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+SEMIABIERTO = 'semiabierto'
+
+
+class CircuitoAbierto(Exception):
+    pass
+
+
+# Interruptor de circuito sobre las llamadas a Firestore. Se abre cuando en
+# la ventana de llamadas recientes hay demasiados errores o llamadas lentas;
+# mientras está abierto las llamadas fallan de inmediato, y después de
+# ESPERA_ABIERTO deja pasar unas pocas de prueba para decidir si se cierra.
+class Interruptor:
+    def __init__(self, ventana=VENTANA, minimo=MINIMO_LLAMADAS, umbral=UMBRAL_FALLAS,
+                 lenta=UMBRAL_LENTA, espera=ESPERA_ABIERTO, sondeos=SONDEOS, reloj=time.monotonic):
+        self.minimo = minimo
+        self.umbral = umbral
+        self.lenta = lenta
+        self.espera = espera
+        self.sondeos = sondeos
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._resultados = deque(maxlen=ventana)
+        self._fallas = 0
+        self.estado = CERRADO
+        self._abierto_desde = 0.0
+        self._sondeos_en_curso = 0
+        self._sondeos_exitosos = 0
+        self.aperturas = 0
+        self.rechazadas = 0
+
+    def _abrir(self):
+        self.estado = ABIERTO
+        self._abierto_desde = self._reloj()
+        self._sondeos_en_curso = 0
+        self._sondeos_exitosos = 0
+        self.aperturas += 1
+        logger.warning('Circuito de Firestore abierto')
+
+    def _cerrar(self):
+        self.estado = CERRADO
+        self._resultados.clear()
+        self._fallas = 0
+        logger.info('Circuito de Firestore cerrado')
+
+    def reintentar_en(self):
+        if self.estado != ABIERTO:
+            return 0
+        return max(0.0, self._abierto_desde + self.espera - self._reloj())
+
+    # Antes de cada llamada: devuelve si es un sondeo o lanza CircuitoAbierto.
+    # Los streams de larga duración (listeners) no pueden ser sondeos: no
+    # terminan a tiempo para decidir, así que se rechazan hasta que se cierre.
+    def permitir(self, sondear=True):
+        with self._lock:
+            if self.estado == CERRADO:
+                return False
+            if self.estado == ABIERTO and self._reloj() - self._abierto_desde >= self.espera:
+                self.estado = SEMIABIERTO
+            if (sondear and self.estado == SEMIABIERTO
+                    and self._sondeos_en_curso < self.sondeos - self._sondeos_exitosos):
+                self._sondeos_en_curso += 1
+                return True
+            self.rechazadas += 1
+        # Los handlers convierten la excepción en un 500; after_request lo
+        # reconoce por esta marca y responde 503
+        if has_request_context():
+            g.circuito_abierto = True
+        raise CircuitoAbierto('Firestore no está disponible, intente nuevamente.')
+
+    def registrar(self, sondeo, duracion, codigo=None):
+        if codigo is None or codigo == grpc.StatusCode.DEADLINE_EXCEEDED:
+            # Un deadline corto pedido por el cliente no es una señal de falla
+            falla = duracion >= self.lenta
+        else:
+            falla = codigo in CODIGOS_FALLA
+        with self._lock:
+            if sondeo:
+                self._sondeos_en_curso -= 1
+                if self.estado != SEMIABIERTO:
+                    return
+                if falla:
+                    self._abrir()
+                else:
+                    self._sondeos_exitosos += 1
+                    if self._sondeos_exitosos >= self.sondeos:
+                        self._cerrar()
+                return
+
+            if self.estado != CERRADO:
+                return
+            if len(self._resultados) == self._resultados.maxlen:
+                self._fallas -= self._resultados[0]
+            self._resultados.append(falla)
+            self._fallas += falla
+            if len(self._resultados) >= self.minimo and self._fallas >= self.umbral * len(self._resultados):
+                self._abrir()
+
+    # Un sondeo que falló antes de llegar a Firestore no cuenta
+    def cancelar_sondeo(self):
+        with self._lock:
+            self._sondeos_en_curso -= 1
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'fallas_recientes': self._fallas,
+                'llamadas_recientes': len(self._resultados),
+                'aperturas': self.aperturas,
+                'rechazadas': self.rechazadas,
+                'reintentar_en': round(self.reintentar_en(), 1),
+            }
+
+
+interruptor = Interruptor()
+
+
+# Últimas respuestas exitosas de los endpoints de lectura, por condominio y URL,
+# acotadas en cantidad y en bytes totales; se descartan las menos recientes
+class CacheRespaldo:
+    def __init__(self, maximo=MAX_RESPALDOS, maximo_bytes=MAX_BYTES_RESPALDOS, reloj=time.monotonic):
+        self._entradas = OrderedDict()
+        self._maximo = maximo
+        self._maximo_bytes = maximo_bytes
+        self.bytes = 0
+        self._reloj = reloj
+        self._lock = threading.Lock()
+
+    def guardar(self, clave, status, cuerpo, mimetype):
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior[2])
+            self._entradas[clave] = (self._reloj(), status, cuerpo, mimetype)
+            self.bytes += len(cuerpo)
+            while len(self._entradas) > self._maximo or self.bytes > self._maximo_bytes:
+                self.bytes -= len(self._entradas.popitem(last=False)[1][2])
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def obtener(self, clave, vigencia):
+        with self._lock:
+            entrada = self._entradas.get(clave)
+        if entrada is None:
+            return None
+        edad = self._reloj() - entrada[0]
+        return (edad,) + entrada[1:] if edad <= vigencia else None
+
+
+respaldo = CacheRespaldo()
+
+
+def _clave():
+    return (condominio_actual(), request.full_path)
+
+
+def _respuesta_respaldo(app):
+    entrada = respaldo.obtener(_clave(), app.config.get('VIGENCIA_RESPALDO', VIGENCIA_RESPALDO))
+    if entrada is None:
+        return None
+    edad, status, cuerpo, mimetype = entrada
+    respuesta = make_response(cuerpo, status)
+    respuesta.mimetype = mimetype
+    respuesta.headers['Age'] = str(int(edad))
+    respuesta.headers['Warning'] = '110 - "Response is Stale"'
+    respuesta.headers['X-Cache'] = 'stale'
+    return respuesta
+
+
+def _no_disponible():
+    respuesta = jsonify({'status': 'error', 'message': 'Firestore no está disponible, intente nuevamente.'})
+    respuesta.status_code = 503
+    respuesta.headers['Retry-After'] = str(max(1, int(interruptor.reintentar_en() + 0.5)))
+    return respuesta
+
+
+def _con_respaldo():
+    return request.method == 'GET' and request.endpoint in ENDPOINTS_RESPALDO
+
+
+def registrar_interruptor(app):
+    # Con el circuito abierto las lecturas se responden desde el respaldo sin
+    # ocupar el worker; el resto llega al handler y falla de inmediato
+    @app.before_request
+    def responder_sin_firestore():
+        if interruptor.estado != ABIERTO or interruptor.reintentar_en() <= 0 or not _con_respaldo():
+            return None
+        return _respuesta_respaldo(app) or _no_disponible()
+
+    @app.after_request
+    def respaldar_lectura(respuesta):
+        if respuesta.headers.get('X-Cache') == 'stale':
+            return respuesta
+        # Los handlers convierten CircuitoAbierto en 500; otros errores se responden tal cual
+        if respuesta.status_code >= 500 and g.get('circuito_abierto'):
+            return (_con_respaldo() and _respuesta_respaldo(app)) or _no_disponible()
+        if respuesta.status_code == 200 and _con_respaldo():
+            cuerpo = respuesta.get_data()
+            if len(cuerpo) <= MAX_BYTES_RESPALDO:
+                respaldo.guardar(_clave(), respuesta.status_code, cuerpo, respuesta.mimetype)
+        return respuesta
+
+    @app.errorhandler(CircuitoAbierto)
+    def circuito_abierto(error):
+        return _no_disponible()
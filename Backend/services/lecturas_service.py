@@ -0,0 +1,180 @@
+# backend/services/lecturas_service.py
+
+import functools
+import logging
+
+from flask import g, has_request_context
+from fireo.managers.managers import Manager
+from fireo.models import Model
+from fireo.queries.query_wrapper import ReferenceDocLoader
+
+from firebase_config import db
+
+logger = logging.getLogger(__name__)
+
+_NO_EXISTE = object()
+
+
+# Mapa de identidad de la solicitud actual: key -> modelo (o _NO_EXISTE).
+# Fuera de una solicitud HTTP (scripts, jobs) no se memoiza nada.
+def _mapa():
+    if not has_request_context():
+        return None
+    if 'mapa_identidad' not in g:
+        g.mapa_identidad = {}
+        g.mapa_snapshots = {}
+        g.lecturas = {'firestore': 0, 'ahorradas': 0}
+    return g.mapa_identidad
+
+
+# Snapshots leídos sin pasar por FireO (Recurso), en el mismo mapa de la solicitud
+def _mapa_snapshots():
+    return g.mapa_snapshots if _mapa() is not None else None
+
+
+def _contar(clave):
+    if has_request_context() and 'lecturas' in g:
+        g.lecturas[clave] += 1
+
+
+def _key_completa(manager, key):
+    if '/' in str(key):
+        return key
+    return manager.get_key_by_id(key)
+
+
+def _envolver_get(get_original):
+    @functools.wraps(get_original)
+    def get(self, *args, **kwargs):
+        mapa = _mapa()
+        key = kwargs.get('key') or kwargs.get('id') or (args[0] if args else None)
+        transaccion = kwargs.get('transaction') or (args[1] if len(args) > 1 else None)
+        # Las lecturas dentro de una transacción siempre van a Firestore
+        if mapa is None or key is None or transaccion is not None:
+            return get_original(self, *args, **kwargs)
+
+        key = _key_completa(self, key)
+        if key in mapa:
+            _contar('ahorradas')
+            modelo = mapa[key]
+            return None if modelo is _NO_EXISTE else modelo
+
+        _contar('firestore')
+        modelo = get_original(self, *args, **kwargs)
+        mapa[key] = _NO_EXISTE if modelo is None else modelo
+        return modelo
+    return get
+
+
+def _envolver_referencia(get_original):
+    @functools.wraps(get_original)
+    def get(self):
+        mapa = _mapa()
+        if mapa is None:
+            return get_original(self)
+
+        key = self.ref.path
+        modelo = mapa.get(key)
+        if modelo is not None and modelo is not _NO_EXISTE:
+            _contar('ahorradas')
+            return modelo
+
+        _contar('firestore')
+        modelo = get_original(self)
+        mapa[key] = modelo
+        return modelo
+    return get
+
+
+# Lee un documento como snapshot, a lo más una vez por solicitud
+def leer_documento(key):
+    mapa = _mapa_snapshots()
+    if mapa is None:
+        return db.document(key).get()
+    if key in mapa:
+        _contar('ahorradas')
+        return mapa[key]
+    _contar('firestore')
+    snapshot = mapa[key] = db.document(key).get()
+    return snapshot
+
+
+# Lee varios documentos con un solo get_all para los que no están en el mapa;
+# devuelve {key: snapshot}
+def leer_documentos(keys):
+    keys = set(keys)
+    mapa = _mapa_snapshots()
+    if mapa is None:
+        return {snapshot.reference.path: snapshot for snapshot in db.get_all([db.document(key) for key in keys])}
+    faltantes = [key for key in keys if key not in mapa]
+    for _ in range(len(keys) - len(faltantes)):
+        _contar('ahorradas')
+    if faltantes:
+        for snapshot in db.get_all([db.document(key) for key in faltantes]):
+            _contar('firestore')
+            mapa[snapshot.reference.path] = snapshot
+    return {key: mapa[key] for key in keys if key in mapa}
+
+
+# Quita un documento del mapa después de escribirlo; sin key, vacía el mapa
+# (escrituras que tocan documentos derivados, como los resúmenes)
+def olvidar(key=None):
+    mapa = _mapa()
+    if mapa is None:
+        return
+    if key is None:
+        mapa.clear()
+        g.mapa_snapshots.clear()
+    else:
+        mapa.pop(key, None)
+        g.mapa_snapshots.pop(key, None)
+
+
+# Cualquier escritura invalida la entrada del documento en el mapa
+def _envolver_escritura(metodo_original):
+    @functools.wraps(metodo_original)
+    def escribir(self, *args, **kwargs):
+        resultado = metodo_original(self, *args, **kwargs)
+        try:
+            olvidar(self.key)
+        except Exception:
+            pass
+        return resultado
+    return escribir
+
+
+def _envolver_escritura_por_key(metodo_original):
+    @functools.wraps(metodo_original)
+    def escribir(self, *args, **kwargs):
+        resultado = metodo_original(self, *args, **kwargs)
+        key = kwargs.get('key') or kwargs.get('id') or (args[0] if args else None)
+        if isinstance(key, str) and _mapa() is not None:
+            olvidar(_key_completa(self, key))
+        return resultado
+    return escribir
+
+
+_instalado = False
+
+
+def instalar_mapa_identidad(app):
+    global _instalado
+    if not _instalado:
+        Manager.get = _envolver_get(Manager.get)
+        ReferenceDocLoader.get = _envolver_referencia(ReferenceDocLoader.get)
+        for metodo in ('save', 'update', 'delete'):
+            if hasattr(Model, metodo):
+                setattr(Model, metodo, _envolver_escritura(getattr(Model, metodo)))
+        for metodo in ('update', 'delete'):
+            setattr(Manager, metodo, _envolver_escritura_por_key(getattr(Manager, metodo)))
+        _instalado = True
+
+    # En modo depuración se informa cuántas lecturas se evitaron en cada solicitud
+    @app.after_request
+    def informar_lecturas(respuesta):
+        lecturas = g.get('lecturas')
+        if app.debug and lecturas:
+            respuesta.headers['X-Lecturas-Firestore'] = str(lecturas['firestore'])
+            respuesta.headers['X-Lecturas-Ahorradas'] = str(lecturas['ahorradas'])
+            logger.debug('Lecturas Firestore: %(firestore)d, ahorradas: %(ahorradas)d', lecturas)
+        return respuesta
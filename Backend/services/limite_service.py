@@ -0,0 +1,206 @@
+# backend/services/limite_service.py
+
+import math
+import os
+import threading
+import time
+
+from flask import request, jsonify, g
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+# Valores por defecto (se pueden cambiar en app.config)
+TASA_POR_DEFECTO = 20          # fichas repuestas por segundo por cliente y ruta
+CAPACIDAD_POR_DEFECTO = 100    # ráfaga máxima
+MAX_CONCURRENCIA = 64          # solicitudes en curso por proceso antes de rechazar
+UMBRAL_COSTOSAS = 0.75         # fracción de MAX_CONCURRENCIA desde la que se rechazan rutas costosas
+
+# Costo de las lecturas de colección completa (GET sin parámetros de ruta)
+COSTO_LISTADO = 10
+
+# Costos específicos por endpoint; tienen prioridad sobre la heurística
+COSTOS = {
+    'historialpago_bp.get_historiales_pagos': 20,
+    'transaccion_bp.get_transacciones': 20,
+    'notificacion_bp.get_notificaciones': 20,
+    'importacion_bp.importar_archivo': 50,
+    'busqueda_bp.reconstruir_indice': 100,
+    'solicitud_bp.asignar_solicitudes_pendientes': 50,
+}
+
+RUTAS_EXENTAS = {'/'}
+
+# Conexiones de larga duración que no cuentan para el control de concurrencia
+ENDPOINTS_STREAMING = {'cambios_bp.stream_cambios'}
+
+# Cada cuántas operaciones se purgan las cubetas inactivas del almacén local
+INTERVALO_PURGA = 10000
+
+
+# Almacén local de cubetas de fichas (un proceso)
+class AlmacenFichasLocal:
+    def __init__(self, reloj=time.monotonic):
+        self._cubetas = {}
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._operaciones = 0
+
+    # Descuenta 'costo' fichas; devuelve (permitido, fichas_restantes)
+    def consumir(self, clave, costo, tasa, capacidad):
+        with self._lock:
+            ahora = self._reloj()
+            fichas, ultimo = self._cubetas.get(clave, (capacidad, ahora))
+            fichas = min(capacidad, fichas + (ahora - ultimo) * tasa)
+            permitido = fichas >= costo
+            if permitido:
+                fichas -= costo
+            self._cubetas[clave] = (fichas, ahora)
+
+            self._operaciones += 1
+            if self._operaciones >= INTERVALO_PURGA:
+                self._purgar(ahora, tasa, capacidad)
+            return permitido, fichas
+
+    # Una cubeta que ya se habría llenado otra vez equivale a no tenerla
+    def _purgar(self, ahora, tasa, capacidad):
+        self._operaciones = 0
+        llenado = capacidad / tasa
+        for clave, (_, ultimo) in list(self._cubetas.items()):
+            if ahora - ultimo > llenado:
+                del self._cubetas[clave]
+
+
+_SCRIPT_REDIS = """
+local tasa = tonumber(ARGV[1])
+local capacidad = tonumber(ARGV[2])
+local costo = tonumber(ARGV[3])
+local ahora = tonumber(ARGV[4])
+local datos = redis.call('HMGET', KEYS[1], 'fichas', 'ts')
+local fichas = tonumber(datos[1]) or capacidad
+local ultimo = tonumber(datos[2]) or ahora
+fichas = math.min(capacidad, fichas + math.max(0, ahora - ultimo) * tasa)
+local permitido = 0
+if fichas >= costo then
+    fichas = fichas - costo
+    permitido = 1
+end
+redis.call('HSET', KEYS[1], 'fichas', fichas, 'ts', ahora)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidad / tasa) + 1)
+return {permitido, tostring(fichas)}
+"""
+
+
+# Almacén compartido en Redis para despliegues con varios nodos. La operación
+# completa es un script Lua, así que es atómica entre procesos.
+class AlmacenFichasRedis:
+    def __init__(self, url, prefijo='limite:'):
+        import redis
+        self._cliente = redis.Redis.from_url(url)
+        self._script = self._cliente.register_script(_SCRIPT_REDIS)
+        self._prefijo = prefijo
+
+    def consumir(self, clave, costo, tasa, capacidad):
+        permitido, fichas = self._script(keys=[self._prefijo + clave], args=[tasa, capacidad, costo, time.time()])
+        return bool(permitido), float(fichas)
+
+
+def _crear_almacen():
+    url = os.environ.get('LIMITE_REDIS_URL')
+    return AlmacenFichasRedis(url) if url else AlmacenFichasLocal()
+
+
+# El usuario del token ya verificado; sin autenticación, la dirección de origen
+# (la del cliente según los proxies confiables, ver instalar_proxies).
+# Un encabezado enviado por el cliente (como X-API-Key) no sirve: bastaría con
+# cambiarlo en cada solicitud para tener una cubeta nueva.
+def identificar_cliente():
+    usuario = g.get('usuario')
+    if usuario and usuario.get('uid'):
+        return f'uid:{usuario["uid"]}'
+    return f'ip:{request.remote_addr}'
+
+
+def costo_ruta():
+    if request.endpoint in COSTOS:
+        return COSTOS[request.endpoint]
+    if request.method == 'GET' and not request.view_args:
+        return COSTO_LISTADO
+    return 1
+
+
+# Limita las solicitudes por cliente y ruta con cubetas de fichas ponderadas por
+# costo, y rechaza con 503 cuando hay demasiadas solicitudes en curso en el proceso.
+class LimitadorSolicitudes:
+    def __init__(self, almacen=None):
+        self.almacen = almacen or _crear_almacen()
+        self._en_curso = 0
+        self._lock = threading.Lock()
+
+    def en_curso(self):
+        return self._en_curso
+
+    def registrar(self, app):
+        @app.before_request
+        def limitar_solicitud():
+            if request.path in RUTAS_EXENTAS or request.method == 'OPTIONS':
+                return None
+
+            costo = costo_ruta()
+            maximo = app.config.get('MAX_CONCURRENCIA', MAX_CONCURRENCIA)
+
+            # Control de carga: se rechaza antes de ocupar el worker
+            saturado = False
+            if request.endpoint not in ENDPOINTS_STREAMING:
+                with self._lock:
+                    limite = maximo if costo == 1 else int(maximo * UMBRAL_COSTOSAS)
+                    if self._en_curso >= limite:
+                        saturado = True
+                    else:
+                        self._en_curso += 1
+                        g.limite_en_curso = True
+            if saturado:
+                respuesta = jsonify({'status': 'error', 'message': 'Servidor sobrecargado, intente nuevamente.'})
+                respuesta.headers['Retry-After'] = '1'
+                return respuesta, 503
+
+            tasa = app.config.get('RATE_LIMIT_TASA', TASA_POR_DEFECTO)
+            capacidad = app.config.get('RATE_LIMIT_CAPACIDAD', CAPACIDAD_POR_DEFECTO)
+            clave = f'{identificar_cliente()}:{request.endpoint}'
+            permitido, fichas = self.almacen.consumir(clave, costo, tasa, capacidad)
+            g.limite_fichas = (fichas, capacidad)
+            if not permitido:
+                respuesta = jsonify({'status': 'error', 'message': 'Demasiadas solicitudes, intente más tarde.'})
+                respuesta.headers['Retry-After'] = str(max(1, math.ceil((costo - fichas) / tasa)))
+                return respuesta, 429
+            return None
+
+        @app.after_request
+        def encabezados_limite(respuesta):
+            fichas = g.get('limite_fichas')
+            if fichas is not None:
+                respuesta.headers['X-RateLimit-Limit'] = str(fichas[1])
+                respuesta.headers['X-RateLimit-Remaining'] = str(int(fichas[0]))
+            return respuesta
+
+        @app.teardown_request
+        def liberar_solicitud(error=None):
+            if g.pop('limite_en_curso', False):
+                with self._lock:
+                    self._en_curso -= 1
+
+
+limitador = LimitadorSolicitudes()
+
+
+# Detrás de un balanceador remote_addr es la del balanceador y todos los
+# clientes anónimos compartirían una cubeta. Con PROXIES_CONFIABLES = n se toma
+# la dirección de X-Forwarded-For que agregó el n-ésimo proxy desde la app;
+# lo que el cliente ponga antes en el encabezado se ignora.
+def instalar_proxies(app):
+    saltos = app.config.get('PROXIES_CONFIABLES', 0)
+    if saltos:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=saltos, x_proto=saltos)
+
+
+def registrar_limites(app):
+    instalar_proxies(app)
+    limitador.registrar(app)
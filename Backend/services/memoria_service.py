@@ -0,0 +1,930 @@
+# backend/services/memoria_service.py
+
+import itertools
+import math
+import queue
+import random
+import threading
+import time
+
+import grpc
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import firestore
+from google.cloud.firestore_v1.types import (
+    aggregation_result as tipos_agregacion,
+    document as tipos_documento,
+    firestore as tipos_firestore,
+    query as tipos_consulta,
+    write as tipos_escritura,
+)
+from google.protobuf.empty_pb2 import Empty
+from google.protobuf.timestamp_pb2 import Timestamp
+
+# Mensajes protobuf sin la capa proto-plus: el almacén trabaja con ellos directamente
+Documento = tipos_documento.Document.pb()
+Valor = tipos_documento.Value.pb()
+ConsultaEstructurada = tipos_consulta.StructuredQuery.pb()
+CambioObjetivo = tipos_firestore.TargetChange.pb()
+
+PROYECTO = 'local'
+
+
+class ErrorMemoria(grpc.RpcError, grpc.Call):
+    def __init__(self, codigo, detalle):
+        super().__init__(detalle)
+        self._codigo = codigo
+        self._detalle = detalle
+
+    def code(self):
+        return self._codigo
+
+    def details(self):
+        return self._detalle
+
+    def initial_metadata(self):
+        return ()
+
+    def trailing_metadata(self):
+        return ()
+
+    def is_active(self):
+        return False
+
+    def time_remaining(self):
+        return None
+
+    def cancel(self):
+        return False
+
+    def add_callback(self, callback):
+        return False
+
+
+# --- Rutas de campos y valores ---------------------------------------------
+
+def partes_campo(ruta):
+    # 'a.b' -> ['a', 'b']; los segmentos entre comillas invertidas pueden tener puntos
+    partes, actual, i = [], [], 0
+    while i < len(ruta):
+        caracter = ruta[i]
+        if caracter == '`':
+            i += 1
+            while i < len(ruta) and ruta[i] != '`':
+                if ruta[i] == '\\' and i + 1 < len(ruta):
+                    i += 1
+                actual.append(ruta[i])
+                i += 1
+        elif caracter == '.':
+            partes.append(''.join(actual))
+            actual = []
+        else:
+            actual.append(caracter)
+        i += 1
+    partes.append(''.join(actual))
+    return partes
+
+
+def leer_campo(campos, partes):
+    for parte in partes[:-1]:
+        valor = campos.get(parte)
+        if valor is None or valor.WhichOneof('value_type') != 'map_value':
+            return None
+        campos = valor.map_value.fields
+    return campos.get(partes[-1])
+
+
+def poner_campo(campos, partes, valor):
+    for parte in partes[:-1]:
+        if campos[parte].WhichOneof('value_type') != 'map_value':
+            campos[parte].map_value.SetInParent()
+        campos = campos[parte].map_value.fields
+    campos[partes[-1]].CopyFrom(valor)
+
+
+def quitar_campo(campos, partes):
+    for parte in partes[:-1]:
+        valor = campos.get(parte)
+        if valor is None or valor.WhichOneof('value_type') != 'map_value':
+            return
+        campos = valor.map_value.fields
+    if partes[-1] in campos:
+        del campos[partes[-1]]
+
+
+def _segmentos(nombre):
+    return tuple(nombre.split('/documents/', 1)[-1].split('/'))
+
+
+# Orden de Firestore entre tipos: nulo < booleano < número < fecha < texto <
+# bytes < referencia < geopunto < arreglo < mapa
+def clave_valor(valor):
+    tipo = valor.WhichOneof('value_type')
+    if tipo == 'null_value' or tipo is None:
+        return (0,)
+    if tipo == 'boolean_value':
+        return (1, valor.boolean_value)
+    if tipo == 'integer_value':
+        return (2, 0, valor.integer_value)
+    if tipo == 'double_value':
+        numero = valor.double_value
+        return (2, -1) if math.isnan(numero) else (2, 0, numero)
+    if tipo == 'timestamp_value':
+        return (3, valor.timestamp_value.seconds, valor.timestamp_value.nanos)
+    if tipo == 'string_value':
+        return (4, valor.string_value)
+    if tipo == 'bytes_value':
+        return (5, valor.bytes_value)
+    if tipo == 'reference_value':
+        return (6, _segmentos(valor.reference_value))
+    if tipo == 'geo_point_value':
+        return (7, valor.geo_point_value.latitude, valor.geo_point_value.longitude)
+    if tipo == 'array_value':
+        return (8, tuple(clave_valor(v) for v in valor.array_value.values))
+    return (9, tuple(sorted((k, clave_valor(v)) for k, v in valor.map_value.fields.items())))
+
+
+def _numero(valor):
+    tipo = valor.WhichOneof('value_type')
+    if tipo == 'integer_value':
+        return valor.integer_value
+    if tipo == 'double_value':
+        return valor.double_value
+    return None
+
+
+def _valor_numero(numero):
+    valor = Valor()
+    if isinstance(numero, int):
+        valor.integer_value = numero
+    else:
+        valor.double_value = numero
+    return valor
+
+
+def _valor_campo(documento, partes):
+    if partes == ['__name__']:
+        return Valor(reference_value=documento.name)
+    return leer_campo(documento.fields, partes)
+
+
+# --- Consultas ---------------------------------------------------------------
+
+_DESIGUALDADES = {'LESS_THAN', 'LESS_THAN_OR_EQUAL', 'GREATER_THAN', 'GREATER_THAN_OR_EQUAL', 'NOT_EQUAL', 'NOT_IN'}
+
+
+def _cumple_campo(filtro, documento):
+    operador = ConsultaEstructurada.FieldFilter.Operator.Name(filtro.op)
+    valor = _valor_campo(documento, partes_campo(filtro.field.field_path))
+    if valor is None:
+        return False
+    clave = clave_valor(valor)
+    esperado = clave_valor(filtro.value)
+
+    if operador == 'EQUAL':
+        return clave == esperado
+    if operador == 'NOT_EQUAL':
+        return clave != esperado and clave[0] != 0
+    if operador in ('LESS_THAN', 'LESS_THAN_OR_EQUAL', 'GREATER_THAN', 'GREATER_THAN_OR_EQUAL'):
+        # Las desigualdades solo comparan valores del mismo tipo (y nunca NaN)
+        if clave[0] != esperado[0] or clave == (2, -1) or esperado == (2, -1):
+            return False
+        return {
+            'LESS_THAN': clave < esperado,
+            'LESS_THAN_OR_EQUAL': clave <= esperado,
+            'GREATER_THAN': clave > esperado,
+            'GREATER_THAN_OR_EQUAL': clave >= esperado,
+        }[operador]
+    if operador == 'ARRAY_CONTAINS':
+        return clave[0] == 8 and esperado in clave[1]
+    if operador == 'IN':
+        return clave in esperado[1]
+    if operador == 'NOT_IN':
+        return clave[0] != 0 and clave not in esperado[1]
+    if operador == 'ARRAY_CONTAINS_ANY':
+        return clave[0] == 8 and any(elemento in esperado[1] for elemento in clave[1])
+    raise ErrorMemoria(grpc.StatusCode.INVALID_ARGUMENT, f'Operador no soportado: {operador}')
+
+
+def _cumple_unario(filtro, documento):
+    operador = ConsultaEstructurada.UnaryFilter.Operator.Name(filtro.op)
+    valor = _valor_campo(documento, partes_campo(filtro.field.field_path))
+    if valor is None:
+        return False
+    clave = clave_valor(valor)
+    es_nan = clave == (2, -1)
+    return {
+        'IS_NULL': clave[0] == 0,
+        'IS_NOT_NULL': clave[0] != 0,
+        'IS_NAN': es_nan,
+        'IS_NOT_NAN': clave[0] == 2 and not es_nan,
+    }[operador]
+
+
+def cumple_filtro(filtro, documento):
+    tipo = filtro.WhichOneof('filter_type')
+    if tipo == 'field_filter':
+        return _cumple_campo(filtro.field_filter, documento)
+    if tipo == 'unary_filter':
+        return _cumple_unario(filtro.unary_filter, documento)
+    if tipo == 'composite_filter':
+        compuesto = filtro.composite_filter
+        resultados = (cumple_filtro(f, documento) for f in compuesto.filters)
+        if compuesto.op == ConsultaEstructurada.CompositeFilter.OR:
+            return any(resultados)
+        return all(resultados)
+    return True
+
+
+def _campos_desigualdad(filtro, campos):
+    tipo = filtro.WhichOneof('filter_type')
+    if tipo == 'field_filter':
+        if ConsultaEstructurada.FieldFilter.Operator.Name(filtro.field_filter.op) in _DESIGUALDADES:
+            campos.add(filtro.field_filter.field.field_path)
+    elif tipo == 'composite_filter':
+        for subfiltro in filtro.composite_filter.filters:
+            _campos_desigualdad(subfiltro, campos)
+    return campos
+
+
+# Orden efectivo: el explícito, luego los campos con desigualdad y al final __name__
+def orden_efectivo(consulta):
+    orden = [(o.field.field_path, o.direction == ConsultaEstructurada.DESCENDING) for o in consulta.order_by]
+    presentes = {campo for campo, _ in orden}
+    for campo in sorted(_campos_desigualdad(consulta.where, set()) - presentes):
+        orden.append((campo, False))
+    if '__name__' not in presentes:
+        orden.append(('__name__', orden[-1][1] if orden else False))
+    return [(partes_campo(campo), descendente) for campo, descendente in orden]
+
+
+def _comparar(claves, cursor, orden):
+    for clave, valor, (_, descendente) in zip(claves, cursor, orden):
+        if clave != valor:
+            menor = clave < valor
+            return (1 if menor else -1) if descendente else (-1 if menor else 1)
+    return 0
+
+
+def _claves_cursor(cursor):
+    return [clave_valor(valor) for valor in cursor.values]
+
+
+def ejecutar_consulta(documentos, consulta):
+    orden = orden_efectivo(consulta)
+    filas = []
+    for documento in documentos:
+        if consulta.HasField('where') and not cumple_filtro(consulta.where, documento):
+            continue
+        claves = []
+        for partes, _ in orden:
+            valor = _valor_campo(documento, partes)
+            if valor is None:
+                break
+            claves.append(clave_valor(valor))
+        else:
+            # Los documentos sin algún campo de ordenamiento no aparecen en la consulta
+            filas.append((claves, documento))
+
+    for posicion in range(len(orden) - 1, -1, -1):
+        filas.sort(key=lambda fila: fila[0][posicion], reverse=orden[posicion][1])
+
+    if consulta.HasField('start_at'):
+        cursor = _claves_cursor(consulta.start_at)
+        incluir = consulta.start_at.before
+        filas = [f for f in filas if (_comparar(f[0], cursor, orden) >= 0 if incluir else _comparar(f[0], cursor, orden) > 0)]
+    if consulta.HasField('end_at'):
+        cursor = _claves_cursor(consulta.end_at)
+        excluir = consulta.end_at.before
+        filas = [f for f in filas if (_comparar(f[0], cursor, orden) < 0 if excluir else _comparar(f[0], cursor, orden) <= 0)]
+
+    filas = filas[consulta.offset:]
+    if consulta.HasField('limit'):
+        filas = filas[:consulta.limit.value]
+    return [documento for _, documento in filas]
+
+
+def proyectar(documento, mascara):
+    if not mascara:
+        return documento
+    proyectado = Documento(name=documento.name, create_time=documento.create_time, update_time=documento.update_time)
+    for ruta in mascara:
+        if ruta == '__name__':
+            continue
+        partes = partes_campo(ruta)
+        valor = leer_campo(documento.fields, partes)
+        if valor is not None:
+            poner_campo(proyectado.fields, partes, valor)
+    return proyectado
+
+
+# --- Almacén -----------------------------------------------------------------
+
+class _Escucha:
+    def __init__(self, id_objetivo, objetivo):
+        self.id_objetivo = id_objetivo
+        self.objetivo = objetivo
+        self.versiones = {}
+        self.respuestas = queue.Queue()
+
+
+# Almacén en memoria con la semántica de Firestore que usan el cliente de
+# Python y FireO: escrituras atómicas con precondiciones y transformaciones,
+# consultas con filtros, orden, cursores y límites, transacciones optimistas
+# (un conflicto responde ABORTED y el cliente reintenta) y listeners.
+class AlmacenMemoria:
+    def __init__(self):
+        self._colecciones = {}
+        self._lock = threading.RLock()
+        self._transacciones = {}
+        self._ids_transaccion = itertools.count(1)
+        self._escuchas = []
+        self._ultimo_ns = 0
+
+    def _ahora(self):
+        # Tiempos de commit estrictamente crecientes (en microsegundos, como los conserva el cliente)
+        ns = max(time.time_ns() // 1000 * 1000, self._ultimo_ns + 1000)
+        self._ultimo_ns = ns
+        marca = Timestamp()
+        marca.FromNanoseconds(ns)
+        return marca
+
+    def _marca_lectura(self):
+        marca = Timestamp()
+        marca.FromNanoseconds(max(time.time_ns(), self._ultimo_ns))
+        return marca
+
+    def documento(self, nombre):
+        coleccion, _, _ = nombre.rpartition('/')
+        return self._colecciones.get(coleccion, {}).get(nombre)
+
+    def cantidad(self):
+        with self._lock:
+            return sum(len(documentos) for documentos in self._colecciones.values())
+
+    def vaciar(self):
+        with self._lock:
+            self._colecciones.clear()
+            self._transacciones.clear()
+
+    def _documentos_consulta(self, padre, consulta):
+        documentos = []
+        for origen in consulta.from_:
+            if origen.all_descendants:
+                for ruta, coleccion in self._colecciones.items():
+                    if ruta.rsplit('/', 1)[-1] == origen.collection_id and ruta.startswith(padre + '/'):
+                        documentos.extend(coleccion.values())
+            else:
+                documentos.extend(self._colecciones.get(f'{padre}/{origen.collection_id}', {}).values())
+        return documentos
+
+    def consultar(self, padre, consulta):
+        with self._lock:
+            return ejecutar_consulta(self._documentos_consulta(padre, consulta), consulta)
+
+    # Transacciones
+    def iniciar_transaccion(self, solo_lectura=False):
+        with self._lock:
+            id_transaccion = str(next(self._ids_transaccion)).encode()
+            self._transacciones[id_transaccion] = {'lecturas': {}, 'solo_lectura': solo_lectura}
+            return id_transaccion
+
+    def registrar_lectura(self, id_transaccion, nombre, documento):
+        if not id_transaccion:
+            return
+        transaccion = self._transacciones.get(id_transaccion)
+        if transaccion is None:
+            raise ErrorMemoria(grpc.StatusCode.INVALID_ARGUMENT, 'Transacción inválida.')
+        transaccion['lecturas'].setdefault(nombre, documento.update_time.ToNanoseconds() if documento else None)
+
+    def descartar_transaccion(self, id_transaccion):
+        with self._lock:
+            self._transacciones.pop(id_transaccion, None)
+
+    # Escrituras
+    def _verificar_precondicion(self, escritura, nombre, actual):
+        if not escritura.HasField('current_document'):
+            return
+        precondicion = escritura.current_document
+        if precondicion.HasField('exists'):
+            if precondicion.exists and actual is None:
+                raise ErrorMemoria(grpc.StatusCode.NOT_FOUND, f'No document to update: {nombre}')
+            if not precondicion.exists and actual is not None:
+                raise ErrorMemoria(grpc.StatusCode.ALREADY_EXISTS, f'Document already exists: {nombre}')
+        elif precondicion.HasField('update_time'):
+            if actual is None or actual.update_time != precondicion.update_time:
+                raise ErrorMemoria(grpc.StatusCode.FAILED_PRECONDITION, f'Document was modified: {nombre}')
+
+    def _transformar(self, campos, transformacion, momento):
+        partes = partes_campo(transformacion.field_path)
+        actual = leer_campo(campos, partes)
+        tipo = transformacion.WhichOneof('transform_type')
+        if tipo == 'set_to_server_value':
+            resultado = Valor(timestamp_value=momento)
+        elif tipo in ('increment', 'maximum', 'minimum'):
+            operando = _numero(getattr(transformacion, tipo))
+            base = _numero(actual) if actual is not None else None
+            if tipo == 'increment':
+                numero = operando if base is None else base + operando
+            elif base is None:
+                numero = operando
+            else:
+                numero = max(base, operando) if tipo == 'maximum' else min(base, operando)
+            resultado = _valor_numero(numero)
+        else:
+            elementos = list(actual.array_value.values) if actual is not None and actual.HasField('array_value') else []
+            claves = [clave_valor(v) for v in elementos]
+            if tipo == 'append_missing_elements':
+                for valor in transformacion.append_missing_elements.values:
+                    if clave_valor(valor) not in claves:
+                        elementos.append(valor)
+                        claves.append(clave_valor(valor))
+            else:
+                quitar = {clave_valor(v) for v in transformacion.remove_all_from_array.values}
+                elementos = [v for v, clave in zip(elementos, claves) if clave not in quitar]
+            resultado = Valor()
+            resultado.array_value.SetInParent()
+            resultado.array_value.values.extend(elementos)
+        poner_campo(campos, partes, resultado)
+        return resultado
+
+    def _aplicar(self, escritura, pendientes, momento):
+        operacion = escritura.WhichOneof('operation')
+        nombre = escritura.delete if operacion == 'delete' else (
+            escritura.update.name if operacion == 'update' else escritura.transform.document)
+        actual = pendientes[nombre] if nombre in pendientes else self.documento(nombre)
+        self._verificar_precondicion(escritura, nombre, actual)
+
+        resultado = tipos_escritura.WriteResult.pb()()
+        if operacion == 'delete':
+            pendientes[nombre] = None
+            return resultado
+
+        nuevo = Documento(name=nombre)
+        if actual is not None:
+            nuevo.CopyFrom(actual)
+        else:
+            nuevo.create_time.CopyFrom(momento)
+        if operacion == 'update':
+            if escritura.HasField('update_mask'):
+                for ruta in escritura.update_mask.field_paths:
+                    partes = partes_campo(ruta)
+                    valor = leer_campo(escritura.update.fields, partes)
+                    if valor is None:
+                        quitar_campo(nuevo.fields, partes)
+                    else:
+                        poner_campo(nuevo.fields, partes, valor)
+            else:
+                nuevo.ClearField('fields')
+                for campo, valor in escritura.update.fields.items():
+                    nuevo.fields[campo].CopyFrom(valor)
+            transformaciones = escritura.update_transforms
+        else:
+            transformaciones = escritura.transform.field_transforms
+
+        for transformacion in transformaciones:
+            resultado.transform_results.append(self._transformar(nuevo.fields, transformacion, momento))
+        nuevo.update_time.CopyFrom(momento)
+        resultado.update_time.CopyFrom(momento)
+        pendientes[nombre] = nuevo
+        return resultado
+
+    # Aplica las escrituras de forma atómica; devuelve (resultados, momento)
+    def confirmar(self, escrituras, id_transaccion=None):
+        with self._lock:
+            if id_transaccion:
+                transaccion = self._transacciones.pop(id_transaccion, None)
+                if transaccion is None:
+                    raise ErrorMemoria(grpc.StatusCode.INVALID_ARGUMENT, 'Transacción inválida.')
+                for nombre, version in transaccion['lecturas'].items():
+                    documento = self.documento(nombre)
+                    if (documento.update_time.ToNanoseconds() if documento else None) != version:
+                        raise ErrorMemoria(grpc.StatusCode.ABORTED, 'Transaction lock timeout or contention.')
+
+            momento = self._ahora()
+            pendientes = {}
+            resultados = [self._aplicar(escritura, pendientes, momento) for escritura in escrituras]
+            for nombre, documento in pendientes.items():
+                coleccion, _, _ = nombre.rpartition('/')
+                if documento is None:
+                    self._colecciones.get(coleccion, {}).pop(nombre, None)
+                else:
+                    self._colecciones.setdefault(coleccion, {})[nombre] = documento
+            if pendientes and self._escuchas:
+                self._notificar(set(pendientes), momento)
+            return resultados, momento
+
+    # Listeners
+    def _resultado_objetivo(self, objetivo):
+        if objetivo.WhichOneof('target_type') == 'documents':
+            return [d for d in (self.documento(n) for n in objetivo.documents.documents) if d is not None]
+        return ejecutar_consulta(
+            self._documentos_consulta(objetivo.query.parent, objetivo.query.structured_query),
+            objetivo.query.structured_query,
+        )
+
+    def _afecta(self, objetivo, nombres):
+        if objetivo.WhichOneof('target_type') == 'documents':
+            return bool(nombres & set(objetivo.documents.documents))
+        padre = objetivo.query.parent
+        colecciones = {origen.collection_id for origen in objetivo.query.structured_query.from_}
+        return any(n.startswith(padre + '/') and n.rsplit('/', 2)[-2] in colecciones for n in nombres)
+
+    @staticmethod
+    def _cambio_objetivo(tipo, ids=(), momento=None):
+        mensaje = tipos_firestore.ListenResponse.pb()()
+        mensaje.target_change.target_change_type = tipo
+        mensaje.target_change.target_ids.extend(ids)
+        if momento is not None:
+            mensaje.target_change.read_time.CopyFrom(momento)
+            mensaje.target_change.resume_token = str(momento.ToNanoseconds()).encode()
+        return mensaje
+
+    def _enviar_documentos(self, escucha, momento):
+        actuales = {d.name: d for d in self._resultado_objetivo(escucha.objetivo)}
+        for nombre, documento in actuales.items():
+            version = documento.update_time.ToNanoseconds()
+            if escucha.versiones.get(nombre) != version:
+                escucha.versiones[nombre] = version
+                mensaje = tipos_firestore.ListenResponse.pb()()
+                mensaje.document_change.document.CopyFrom(documento)
+                mensaje.document_change.target_ids.append(escucha.id_objetivo)
+                escucha.respuestas.put(mensaje)
+        for nombre in set(escucha.versiones) - set(actuales):
+            del escucha.versiones[nombre]
+            mensaje = tipos_firestore.ListenResponse.pb()()
+            mensaje.document_delete.document = nombre
+            mensaje.document_delete.removed_target_ids.append(escucha.id_objetivo)
+            mensaje.document_delete.read_time.CopyFrom(momento)
+            escucha.respuestas.put(mensaje)
+
+    # Secuencia inicial: ADD, documentos, CURRENT y NO_CHANGE con read_time
+    # (con esto último el cliente publica el primer snapshot)
+    def escuchar(self, id_objetivo, objetivo):
+        escucha = _Escucha(id_objetivo, objetivo)
+        with self._lock:
+            momento = self._marca_lectura()
+            escucha.respuestas.put(self._cambio_objetivo(CambioObjetivo.ADD, [id_objetivo]))
+            self._enviar_documentos(escucha, momento)
+            escucha.respuestas.put(self._cambio_objetivo(CambioObjetivo.CURRENT, [id_objetivo]))
+            escucha.respuestas.put(self._cambio_objetivo(CambioObjetivo.NO_CHANGE, momento=momento))
+            self._escuchas.append(escucha)
+        return escucha
+
+    def dejar_de_escuchar(self, escucha):
+        with self._lock:
+            if escucha in self._escuchas:
+                self._escuchas.remove(escucha)
+        escucha.respuestas.put(None)
+
+    def _notificar(self, nombres, momento):
+        for escucha in self._escuchas:
+            if self._afecta(escucha.objetivo, nombres):
+                self._enviar_documentos(escucha, momento)
+                escucha.respuestas.put(self._cambio_objetivo(CambioObjetivo.NO_CHANGE, momento=momento))
+
+
+# --- Canal gRPC en memoria -------------------------------------------------
+
+# Latencia y fallas simuladas, compartidas por todos los canales del almacén.
+# Con semilla fija la secuencia de latencias y fallas es reproducible.
+class Inyeccion:
+    def __init__(self, latencia=0.0, variacion=0.0, tasa_fallas=0.0, semilla=None):
+        self.latencia = latencia
+        self.variacion = variacion
+        self.tasa_fallas = tasa_fallas
+        self.caida = False
+        self._azar = random.Random(semilla)
+        self._lock = threading.Lock()
+
+    def aplicar(self, timeout):
+        with self._lock:
+            demora = self.latencia + (self._azar.uniform(0, self.variacion) if self.variacion else 0.0)
+            falla = self.caida or (self.tasa_fallas and self._azar.random() < self.tasa_fallas)
+        if timeout is not None and demora > timeout:
+            time.sleep(max(timeout, 0))
+            raise ErrorMemoria(grpc.StatusCode.DEADLINE_EXCEEDED, 'Deadline Exceeded')
+        if demora:
+            time.sleep(demora)
+        if falla:
+            raise ErrorMemoria(grpc.StatusCode.UNAVAILABLE, 'Falla inyectada en el almacén en memoria.')
+
+
+# Respuesta en streaming ya completa (la consulta se resuelve al llamar)
+class _RespuestaStream(grpc.Call):
+    def __init__(self, respuestas):
+        self._respuestas = iter(respuestas)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._respuestas)
+
+    def code(self):
+        return grpc.StatusCode.OK
+
+    def details(self):
+        return None
+
+    def initial_metadata(self):
+        return ()
+
+    def trailing_metadata(self):
+        return ()
+
+    def is_active(self):
+        return False
+
+    def time_remaining(self):
+        return None
+
+    def cancel(self):
+        return False
+
+    def add_callback(self, callback):
+        return False
+
+
+# Stream bidireccional de Listen: entrega los cambios hasta que se cancela
+class _LlamadaEscucha(grpc.Call, grpc.Future):
+    def __init__(self, almacen, escucha, deserializar):
+        self._almacen = almacen
+        self._escucha = escucha
+        self._deserializar = deserializar
+        self._callbacks = []
+        self._activa = True
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        mensaje = self._escucha.respuestas.get()
+        if mensaje is None:
+            raise ErrorMemoria(grpc.StatusCode.CANCELLED, 'Locally cancelled by application!')
+        return self._deserializar(mensaje.SerializeToString())
+
+    def cancel(self):
+        with self._lock:
+            if not self._activa:
+                return False
+            self._activa = False
+            callbacks, self._callbacks = self._callbacks, []
+        self._almacen.dejar_de_escuchar(self._escucha)
+        for callback in callbacks:
+            callback(self)
+        return True
+
+    def add_callback(self, callback):
+        with self._lock:
+            if not self._activa:
+                return False
+            self._callbacks.append(lambda llamada: callback())
+            return True
+
+    def add_done_callback(self, callback):
+        with self._lock:
+            if self._activa:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def is_active(self):
+        return self._activa
+
+    def code(self):
+        return None if self._activa else grpc.StatusCode.CANCELLED
+
+    def details(self):
+        return None
+
+    def initial_metadata(self):
+        return ()
+
+    def trailing_metadata(self):
+        return ()
+
+    def time_remaining(self):
+        return None
+
+    def cancelled(self):
+        return not self._activa
+
+    def running(self):
+        return self._activa
+
+    def done(self):
+        return not self._activa
+
+    def result(self, timeout=None):
+        raise ErrorMemoria(grpc.StatusCode.CANCELLED, 'Locally cancelled by application!')
+
+    def exception(self, timeout=None):
+        return None
+
+    def traceback(self, timeout=None):
+        return None
+
+
+class _MetodoMemoria:
+    def __init__(self, canal, nombre, serializar, deserializar, streaming_entrada):
+        self._canal = canal
+        self._nombre = nombre
+        self._serializar = serializar
+        self._deserializar = deserializar
+        self._streaming_entrada = streaming_entrada
+
+    def __call__(self, solicitud, timeout=None, metadata=None, **kwargs):
+        self._canal.inyeccion.aplicar(timeout)
+        if self._streaming_entrada:
+            return self._canal.listen(next(iter(solicitud)), self._serializar, self._deserializar)
+        manejador = self._canal.manejadores.get(self._nombre)
+        if manejador is None:
+            raise ErrorMemoria(grpc.StatusCode.UNIMPLEMENTED, f'Método no soportado en memoria: {self._nombre}')
+        tipo_solicitud, procesar, es_stream = manejador
+        pb = tipo_solicitud.FromString(self._serializar(solicitud))
+        respuesta = procesar(pb)
+        if es_stream:
+            return _RespuestaStream(self._deserializar(m.SerializeToString()) for m in respuesta)
+        return self._deserializar(respuesta.SerializeToString())
+
+
+# Canal gRPC que atiende la API de Firestore con un AlmacenMemoria. El cliente
+# de Firestore (y por lo tanto FireO) lo usa sin cambios a través de PoolCanales.
+class CanalMemoria(grpc.Channel):
+    def __init__(self, almacen, inyeccion=None):
+        self.almacen = almacen
+        self.inyeccion = inyeccion or Inyeccion()
+        servicio = '/google.firestore.v1.Firestore/'
+        self.manejadores = {
+            servicio + 'GetDocument': (tipos_firestore.GetDocumentRequest.pb(), self._get_document, False),
+            servicio + 'BatchGetDocuments': (tipos_firestore.BatchGetDocumentsRequest.pb(), self._batch_get, True),
+            servicio + 'RunQuery': (tipos_firestore.RunQueryRequest.pb(), self._run_query, True),
+            servicio + 'RunAggregationQuery': (tipos_firestore.RunAggregationQueryRequest.pb(), self._run_aggregation, True),
+            servicio + 'Commit': (tipos_firestore.CommitRequest.pb(), self._commit, False),
+            servicio + 'BatchWrite': (tipos_firestore.BatchWriteRequest.pb(), self._batch_write, False),
+            servicio + 'BeginTransaction': (tipos_firestore.BeginTransactionRequest.pb(), self._begin_transaction, False),
+            servicio + 'Rollback': (tipos_firestore.RollbackRequest.pb(), self._rollback, False),
+            servicio + 'ListDocuments': (tipos_firestore.ListDocumentsRequest.pb(), self._list_documents, False),
+            servicio + 'ListCollectionIds': (tipos_firestore.ListCollectionIdsRequest.pb(), self._list_collection_ids, False),
+        }
+
+    def _metodo(self, nombre, kwargs, streaming_entrada=False):
+        return _MetodoMemoria(self, nombre, kwargs.get('request_serializer'), kwargs.get('response_deserializer'), streaming_entrada)
+
+    def unary_unary(self, metodo, **kwargs):
+        return self._metodo(metodo, kwargs)
+
+    def unary_stream(self, metodo, **kwargs):
+        return self._metodo(metodo, kwargs)
+
+    def stream_unary(self, metodo, **kwargs):
+        return self._metodo(metodo, kwargs)
+
+    def stream_stream(self, metodo, **kwargs):
+        return self._metodo(metodo, kwargs, streaming_entrada=True)
+
+    def subscribe(self, callback, try_to_connect=False):
+        callback(grpc.ChannelConnectivity.READY)
+
+    def unsubscribe(self, callback):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    # Transacción de la lectura: la existente o una nueva (new_transaction)
+    def _transaccion_lectura(self, solicitud):
+        consistencia = solicitud.WhichOneof('consistency_selector')
+        if consistencia == 'transaction':
+            return solicitud.transaction, False
+        if consistencia == 'new_transaction':
+            return self.almacen.iniciar_transaccion(solicitud.new_transaction.HasField('read_only')), True
+        return None, False
+
+    def _get_document(self, solicitud):
+        with self.almacen._lock:
+            documento = self.almacen.documento(solicitud.name)
+            if solicitud.WhichOneof('consistency_selector') == 'transaction':
+                self.almacen.registrar_lectura(solicitud.transaction, solicitud.name, documento)
+        if documento is None:
+            raise ErrorMemoria(grpc.StatusCode.NOT_FOUND, f'Document not found: {solicitud.name}')
+        return proyectar(documento, list(solicitud.mask.field_paths))
+
+    def _batch_get(self, solicitud):
+        tipo = tipos_firestore.BatchGetDocumentsResponse.pb()
+        mascara = list(solicitud.mask.field_paths)
+        respuestas = []
+        with self.almacen._lock:
+            id_transaccion, nueva = self._transaccion_lectura(solicitud)
+            momento = self.almacen._marca_lectura()
+            for nombre in solicitud.documents:
+                documento = self.almacen.documento(nombre)
+                self.almacen.registrar_lectura(id_transaccion, nombre, documento)
+                respuesta = tipo(read_time=momento)
+                if documento is None:
+                    respuesta.missing = nombre
+                else:
+                    respuesta.found.CopyFrom(proyectar(documento, mascara))
+                respuestas.append(respuesta)
+        if nueva and respuestas:
+            respuestas[0].transaction = id_transaccion
+        return respuestas
+
+    def _run_query(self, solicitud):
+        tipo = tipos_firestore.RunQueryResponse.pb()
+        consulta = solicitud.structured_query
+        mascara = [campo.field_path for campo in consulta.select.fields]
+        with self.almacen._lock:
+            id_transaccion, nueva = self._transaccion_lectura(solicitud)
+            momento = self.almacen._marca_lectura()
+            documentos = self.almacen.consultar(solicitud.parent, consulta)
+            for documento in documentos:
+                self.almacen.registrar_lectura(id_transaccion, documento.name, documento)
+        respuestas = [tipo(document=proyectar(d, mascara), read_time=momento) for d in documentos] or [tipo(read_time=momento)]
+        if nueva:
+            respuestas[0].transaction = id_transaccion
+        return respuestas
+
+    def _run_aggregation(self, solicitud):
+        consulta = solicitud.structured_aggregation_query.structured_query
+        with self.almacen._lock:
+            momento = self.almacen._marca_lectura()
+            documentos = self.almacen.consultar(solicitud.parent, consulta)
+        resultado = tipos_agregacion.AggregationResult.pb()()
+        for agregacion in solicitud.structured_aggregation_query.aggregations:
+            operador = agregacion.WhichOneof('operator')
+            if operador == 'count':
+                limite = agregacion.count.up_to.value if agregacion.count.HasField('up_to') else None
+                resultado.aggregate_fields[agregacion.alias].integer_value = len(documentos[:limite])
+                continue
+            partes = partes_campo(getattr(agregacion, operador).field.field_path)
+            numeros = [n for n in (_numero(leer_campo(d.fields, partes) or Valor()) for d in documentos) if n is not None]
+            if operador == 'sum':
+                resultado.aggregate_fields[agregacion.alias].CopyFrom(_valor_numero(sum(numeros)))
+            elif numeros:
+                resultado.aggregate_fields[agregacion.alias].double_value = sum(numeros) / len(numeros)
+            else:
+                resultado.aggregate_fields[agregacion.alias].null_value = 0
+        return [tipos_firestore.RunAggregationQueryResponse.pb()(result=resultado, read_time=momento)]
+
+    def _commit(self, solicitud):
+        resultados, momento = self.almacen.confirmar(list(solicitud.writes), solicitud.transaction or None)
+        return tipos_firestore.CommitResponse.pb()(write_results=resultados, commit_time=momento)
+
+    def _batch_write(self, solicitud):
+        respuesta = tipos_firestore.BatchWriteResponse.pb()()
+        for escritura in solicitud.writes:
+            try:
+                resultados, _ = self.almacen.confirmar([escritura])
+                respuesta.write_results.append(resultados[0])
+                respuesta.status.add(code=0)
+            except ErrorMemoria as e:
+                respuesta.write_results.add()
+                respuesta.status.add(code=e.code().value[0], message=e.details())
+        return respuesta
+
+    def _begin_transaction(self, solicitud):
+        solo_lectura = solicitud.options.HasField('read_only')
+        return tipos_firestore.BeginTransactionResponse.pb()(transaction=self.almacen.iniciar_transaccion(solo_lectura))
+
+    def _rollback(self, solicitud):
+        self.almacen.descartar_transaccion(solicitud.transaction)
+        return Empty()
+
+    def _list_documents(self, solicitud):
+        coleccion = f'{solicitud.parent}/{solicitud.collection_id}'
+        with self.almacen._lock:
+            documentos = sorted(self.almacen._colecciones.get(coleccion, {}).values(), key=lambda d: d.name)
+        inicio = int(solicitud.page_token or 0)
+        fin = inicio + solicitud.page_size if solicitud.page_size else len(documentos)
+        respuesta = tipos_firestore.ListDocumentsResponse.pb()()
+        mascara = list(solicitud.mask.field_paths)
+        respuesta.documents.extend(proyectar(d, mascara) for d in documentos[inicio:fin])
+        if fin < len(documentos):
+            respuesta.next_page_token = str(fin)
+        return respuesta
+
+    def _list_collection_ids(self, solicitud):
+        prefijo = solicitud.parent + '/'
+        with self.almacen._lock:
+            ids = sorted({
+                ruta[len(prefijo):] for ruta in self.almacen._colecciones
+                if ruta.startswith(prefijo) and '/' not in ruta[len(prefijo):] and self.almacen._colecciones[ruta]
+            })
+        return tipos_firestore.ListCollectionIdsResponse.pb()(collection_ids=ids)
+
+    def listen(self, solicitud, serializar, deserializar):
+        pb = tipos_firestore.ListenRequest.pb().FromString(tipos_firestore.ListenRequest.serialize(solicitud))
+        objetivo = pb.add_target
+        return _LlamadaEscucha(self.almacen, self.almacen.escuchar(objetivo.target_id, objetivo), deserializar)
+
+
+def crear_cliente_memoria(proyecto=PROYECTO):
+    return firestore.Client(project=proyecto, credentials=AnonymousCredentials())
@@ -0,0 +1,438 @@
+# backend/services/notificacion_service.py
+
+import atexit
+import logging
+import os
+import queue
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import fireo
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+
+from firebase_config import db
+from models import Notificacion
+from services.condominio_service import COLECCION_CONDOMINIOS
+
+logger = logging.getLogger(__name__)
+
+# Firestore admite como máximo 500 escrituras por lote
+TAMANO_LOTE = 500
+
+# Parámetros por defecto de la cola de despacho
+NUM_TRABAJADORES = 4
+MAX_REINTENTOS = 3
+ESPERA_BASE = 0.5
+ESPERA_MAXIMA = 30.0
+
+CANAL_POR_DEFECTO = 'falso'
+
+# Transporte del canal por defecto. El transporte falso solo se usa si se pide
+# explícitamente (NOTIFICACIONES_TRANSPORTE=falso); en producción se registra
+# uno real con registrar_transporte() antes del primer envío.
+TRANSPORTE = os.environ.get('NOTIFICACIONES_TRANSPORTE')
+
+# Cada notificación Pendiente guarda en encolada_por la cola que la tiene en
+# memoria, y cada cola registra un latido en COLECCION_COLAS. El barrido solo
+# vuelve a encolar las de colas sin latido reciente (el proceso terminó); las
+# que no tienen cola (anteriores a este esquema) tras ANTIGUEDAD_REENCOLAR.
+COLECCION_COLAS = 'colas_notificacion'
+INTERVALO_LATIDO = 30
+VENCIMIENTO_LATIDO = 120
+ANTIGUEDAD_REENCOLAR = 600
+INTERVALO_BARRIDO = 600
+
+_FIN = object()
+
+
+class EntregaError(Exception):
+    pass
+
+
+class TransporteNoConfigurado(RuntimeError):
+    pass
+
+
+# Transporte local para pruebas y desarrollo: registra los envíos en memoria
+# y puede simular fallos para ejercitar los reintentos.
+class TransporteFalso:
+    def __init__(self, fallos=None):
+        self.enviadas = []
+        self._fallos = dict(fallos or {})
+        self._lock = threading.Lock()
+
+    # fallos: {key_notificacion: número de intentos que deben fallar}
+    def enviar(self, notificacion):
+        with self._lock:
+            pendientes = self._fallos.get(notificacion['key'], 0)
+            if pendientes:
+                self._fallos[notificacion['key']] = pendientes - 1
+                raise EntregaError('Fallo simulado de entrega.')
+            self.enviadas.append(notificacion)
+
+
+# Cubeta de fichas para limitar los envíos por segundo de un canal
+class LimiteTasa:
+    def __init__(self, por_segundo, capacidad=None, reloj=time.monotonic):
+        self.por_segundo = float(por_segundo)
+        self.capacidad = float(capacidad or por_segundo)
+        self._fichas = self.capacidad
+        self._reloj = reloj
+        self._ultimo = reloj()
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        while True:
+            with self._lock:
+                ahora = self._reloj()
+                self._fichas = min(self.capacidad, self._fichas + (ahora - self._ultimo) * self.por_segundo)
+                self._ultimo = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.por_segundo
+            time.sleep(espera)
+
+
+# Actualiza el estado de muchas notificaciones con escrituras en lote
+def actualizar_estados(estados):
+    items = list(estados.items())
+    for inicio in range(0, len(items), TAMANO_LOTE):
+        lote = fireo.batch()
+        for key, estado in items[inicio:inicio + TAMANO_LOTE]:
+            Notificacion.collection.update(key, estado=estado, batch=lote)
+        lote.commit()
+
+
+# Cola de despacho en segundo plano: un conjunto de hilos toma notificaciones
+# en lotes, las entrega por su canal con reintentos y backoff exponencial,
+# y al terminar cada lote actualiza el estado de todas en una sola escritura.
+class ColaDespacho:
+    def __init__(self, num_trabajadores=NUM_TRABAJADORES, tamano_lote=100, max_reintentos=MAX_REINTENTOS,
+                 espera_base=ESPERA_BASE, actualizar=actualizar_estados):
+        # Identifica a la cola como dueña de las notificaciones que encola
+        self.id = f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self.num_trabajadores = num_trabajadores
+        self.tamano_lote = tamano_lote
+        self.max_reintentos = max_reintentos
+        self.espera_base = espera_base
+        self._actualizar = actualizar
+        self._canales = {}
+        self._cola = queue.Queue()
+        self._hilos = []
+        self._lock = threading.Lock()
+        self.estadisticas = {'enviadas': 0, 'fallidas': 0, 'reintentos': 0}
+        self._lock_estadisticas = threading.Lock()
+
+    def registrar_canal(self, canal, transporte, por_segundo=None):
+        limite = LimiteTasa(por_segundo) if por_segundo else None
+        self._canales[canal] = (transporte, limite)
+
+    def iniciar(self):
+        with self._lock:
+            if self._hilos:
+                return
+            for i in range(self.num_trabajadores):
+                hilo = threading.Thread(target=self._trabajar, name=f'despacho-{i}', daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+
+    def detener(self, timeout=None):
+        with self._lock:
+            hilos, self._hilos = self._hilos, []
+        for _ in hilos:
+            self._cola.put(_FIN)
+        for hilo in hilos:
+            hilo.join(timeout)
+
+    # Encola notificaciones ya guardadas; cada una es un dict con al menos 'key'
+    def encolar(self, notificaciones, canal=CANAL_POR_DEFECTO):
+        if canal not in self._canales:
+            raise ValueError(f'Canal {canal} no registrado.')
+        total = 0
+        for notificacion in notificaciones:
+            self._cola.put((canal, notificacion))
+            total += 1
+        return total
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def esperar_vacia(self):
+        self._cola.join()
+
+    def _tomar_lote(self):
+        primero = self._cola.get()
+        lote = [primero]
+        if primero is _FIN:
+            return lote
+        while len(lote) < self.tamano_lote:
+            try:
+                item = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            lote.append(item)
+            if item is _FIN:
+                break
+        return lote
+
+    def _trabajar(self):
+        while True:
+            lote = self._tomar_lote()
+            terminar = lote[-1] is _FIN
+            items = [item for item in lote if item is not _FIN]
+            try:
+                estados = {}
+                for canal, notificacion in items:
+                    estados[notificacion['key']] = 'Enviado' if self._entregar(canal, notificacion) else 'Fallido'
+                if estados:
+                    try:
+                        self._actualizar(estados)
+                    except Exception:
+                        logger.exception('No se pudo actualizar el estado de %d notificaciones.', len(estados))
+            finally:
+                for _ in lote:
+                    self._cola.task_done()
+            if terminar:
+                return
+
+    def _contar(self, clave):
+        with self._lock_estadisticas:
+            self.estadisticas[clave] += 1
+
+    def _entregar(self, canal, notificacion):
+        transporte, limite = self._canales[canal]
+        for intento in range(self.max_reintentos + 1):
+            if limite:
+                limite.esperar()
+            try:
+                transporte.enviar(notificacion)
+                self._contar('enviadas')
+                return True
+            except Exception as e:
+                if intento == self.max_reintentos:
+                    logger.warning('Notificación %s fallida tras %d intentos: %s', notificacion['key'], intento + 1, e)
+                    self._contar('fallidas')
+                    return False
+                self._contar('reintentos')
+                # Backoff exponencial con variación aleatoria para no sincronizar reintentos
+                espera = min(ESPERA_MAXIMA, self.espera_base * (2 ** intento))
+                time.sleep(espera * random.uniform(0.5, 1.0))
+
+
+_cola = None
+_lock_cola = threading.Lock()
+_transporte = None
+
+
+def registrar_transporte(transporte, por_segundo=None):
+    global _transporte
+    _transporte = (transporte, por_segundo)
+
+
+def _transporte_por_defecto():
+    if _transporte is not None:
+        return _transporte
+    if TRANSPORTE == 'falso':
+        return TransporteFalso(), None
+    raise TransporteNoConfigurado(
+        'No hay un transporte de notificaciones configurado: registre uno con registrar_transporte() '
+        'o use NOTIFICACIONES_TRANSPORTE=falso en desarrollo.'
+    )
+
+
+def registrar_latido(cola):
+    db.collection(COLECCION_COLAS).document(cola.id).set({'latido': datetime.now(timezone.utc)})
+
+
+def _retirar_latido(cola):
+    try:
+        db.collection(COLECCION_COLAS).document(cola.id).delete()
+    except Exception:
+        logger.exception('No se pudo retirar el latido de la cola %s.', cola.id)
+
+
+def _latir_periodicamente(cola):
+    while True:
+        time.sleep(INTERVALO_LATIDO)
+        try:
+            registrar_latido(cola)
+        except Exception:
+            logger.exception('No se pudo registrar el latido de la cola %s.', cola.id)
+
+
+# Cola compartida por el proceso, iniciada la primera vez que se usa, con su
+# latido, y el barrido de notificaciones pendientes al iniciar y cada INTERVALO_BARRIDO
+def obtener_cola():
+    global _cola
+    if _cola is None:
+        with _lock_cola:
+            if _cola is None:
+                transporte, por_segundo = _transporte_por_defecto()
+                cola = ColaDespacho()
+                cola.registrar_canal(CANAL_POR_DEFECTO, transporte, por_segundo)
+                cola.iniciar()
+                registrar_latido(cola)
+                atexit.register(_retirar_latido, cola)
+                atexit.register(cola.detener, 5)
+                threading.Thread(target=_latir_periodicamente, args=(cola,), name='latido-notificaciones', daemon=True).start()
+                threading.Thread(target=_barrer_periodicamente, args=(cola,), name='barrido-notificaciones', daemon=True).start()
+                _cola = cola
+    return _cola
+
+
+def _ruta(valor):
+    return valor if isinstance(valor, str) else getattr(valor, 'path', None)
+
+
+# Colecciones de notificaciones: la global y la de cada condominio registrado
+def _colecciones_notificacion():
+    yield Notificacion.collection_name
+    for condominio in db.collection(COLECCION_CONDOMINIOS).stream():
+        yield f'{COLECCION_CONDOMINIOS}/{condominio.id}/{Notificacion.collection_name}'
+
+
+def _colas_vivas(ahora):
+    limite = ahora - timedelta(seconds=VENCIMIENTO_LATIDO)
+    return {
+        snapshot.id for snapshot in db.collection(COLECCION_COLAS).stream()
+        if ((snapshot.to_dict() or {}).get('latido') or limite) > limite
+    }
+
+
+# Vuelve a encolar las notificaciones Pendiente cuya cola ya no existe (por
+# ejemplo, si el proceso se reinició con la cola en memoria). Las de una cola
+# con latido, incluida esta, siguen en su memoria o reintentándose y no se
+# tocan. Cada una se reclama poniendo esta cola como dueña con la precondición
+# de que no haya cambiado desde que se leyó, así dos procesos que barren a la
+# vez no la encolan dos veces.
+def reencolar_pendientes(cola=None, antiguedad=ANTIGUEDAD_REENCOLAR, canal=CANAL_POR_DEFECTO):
+    cola = cola or obtener_cola()
+    ahora = datetime.now(timezone.utc)
+    limite = ahora - timedelta(seconds=antiguedad)
+    vivas = _colas_vivas(ahora) | {cola.id}
+    total = 0
+    for ruta in _colecciones_notificacion():
+        for snapshot in db.collection(ruta).where('estado', '==', 'Pendiente').stream():
+            datos = snapshot.to_dict() or {}
+            duena = datos.get('encolada_por')
+            if duena in vivas:
+                continue
+            fecha = datos.get('fecha_envio')
+            if duena is None and fecha is not None and fecha > limite:
+                continue
+            try:
+                snapshot.reference.update(
+                    {'encolada_por': cola.id}, option=db.write_option(last_update_time=snapshot.update_time)
+                )
+            except (FailedPrecondition, NotFound):
+                continue
+            total += cola.encolar([{
+                'key': snapshot.reference.path,
+                'residente': _ruta(datos.get('residente')),
+                'tipo': datos.get('tipo'),
+                'mensaje': datos.get('mensaje'),
+            }], canal)
+    if total:
+        logger.info('Notificaciones pendientes reencoladas: %d', total)
+    return total
+
+
+def _barrer_periodicamente(cola):
+    while True:
+        try:
+            reencolar_pendientes(cola)
+        except Exception:
+            logger.exception('No se pudieron reencolar las notificaciones pendientes.')
+        time.sleep(INTERVALO_BARRIDO)
+
+
+# FireO guarda con set(); las notificaciones con clave de deduplicación se
+# guardan con create() para que un duplicado falle en vez de sobrescribir
+class _Creacion:
+    def __init__(self, lote=None):
+        self._lote = lote
+
+    def set(self, referencia, valores, merge=False):
+        if self._lote is None:
+            referencia.create(valores)
+        else:
+            self._lote.create(referencia, valores)
+
+
+def _notificacion(datos, fecha_envio, cola):
+    notificacion = Notificacion(
+        residente=datos['residente'],
+        tipo=datos['tipo'],
+        mensaje=datos['mensaje'],
+        fecha_envio=fecha_envio,
+        estado='Pendiente',
+        encolada_por=cola.id
+    )
+    if datos.get('id'):
+        notificacion.id_notificacion = datos['id']
+    return notificacion
+
+
+def _encolable(notificacion, datos):
+    return {
+        'key': notificacion.key,
+        'residente': datos['residente'],
+        'tipo': datos['tipo'],
+        'mensaje': datos['mensaje'],
+    }
+
+
+# Guarda un tramo en un solo lote. Si una notificación con clave de
+# deduplicación ya existe (otra ejecución la creó entre medio), el lote
+# completo se rechaza y el tramo se guarda de a una: las existentes se
+# omiten, porque ya se enviaron o están en camino.
+def _guardar_tramo(tramo, fecha_envio, cola):
+    lote = fireo.batch()
+    creadas = []
+    for datos in tramo:
+        notificacion = _notificacion(datos, fecha_envio, cola)
+        notificacion.save(batch=_Creacion(lote) if datos.get('id') else lote)
+        creadas.append(_encolable(notificacion, datos))
+    try:
+        lote.commit()
+        return creadas
+    except AlreadyExists:
+        pass
+
+    creadas = []
+    for datos in tramo:
+        notificacion = _notificacion(datos, fecha_envio, cola)
+        try:
+            if datos.get('id'):
+                notificacion.save(batch=_Creacion())
+            else:
+                notificacion.save()
+        except AlreadyExists:
+            continue
+        creadas.append(_encolable(notificacion, datos))
+    return creadas
+
+
+# Guarda notificaciones en estado Pendiente con escrituras en lote y las encola para su entrega.
+# Cada elemento es un dict con residente, tipo, mensaje y opcionalmente id (clave de
+# deduplicación: si ya existe una notificación con ese ID, no se vuelve a guardar ni a encolar).
+def guardar_y_encolar(notificaciones, canal=CANAL_POR_DEFECTO, cola=None):
+    cola = cola or obtener_cola()
+    fecha_envio = datetime.now(timezone.utc)
+    total = 0
+    notificaciones = list(notificaciones)
+    for inicio in range(0, len(notificaciones), TAMANO_LOTE):
+        creadas = _guardar_tramo(notificaciones[inicio:inicio + TAMANO_LOTE], fecha_envio, cola)
+        total += cola.encolar(creadas, canal)
+    return total
+
+
+# Crea la misma notificación para varios residentes y la encola para su entrega
+def crear_y_encolar(residentes, tipo, mensaje, canal=CANAL_POR_DEFECTO, cola=None):
+    notificaciones = ({'residente': residente, 'tipo': tipo, 'mensaje': mensaje} for residente in residentes)
+    return guardar_y_encolar(notificaciones, canal, cola)
@@ -0,0 +1,163 @@
+# backend/services/pago_service.py
+
+from datetime import datetime, timezone
+
+import fireo
+from google.cloud.firestore_v1 import DocumentReference
+from firebase_config import db
+from models import Pago, Departamento, Cuota, HistorialPago, Transaccion, Morosidad
+from services.resumen_service import resumen_pago, resumen_cuota, combinar, aplicar
+
+METODOS_PAGO = ['Transferencia', 'Tarjeta', 'Efectivo', 'Otro']
+
+
+class RegistroPagoError(Exception):
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.status = status
+
+
+def _key_referencia(valor):
+    if isinstance(valor, str):
+        return valor
+    return getattr(valor, 'key', None) or getattr(valor, 'path', None)
+
+
+def _serializar(valor):
+    if isinstance(valor, DocumentReference):
+        return valor.path
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, dict):
+        return {k: _serializar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_serializar(v) for v in valor]
+    return valor
+
+
+def _validar(datos):
+    for campo in ['departamento', 'monto', 'fecha_pago', 'periodo', 'metodo_pago']:
+        if datos.get(campo) in (None, ''):
+            raise RegistroPagoError(f'El campo {campo} es requerido.')
+    if not isinstance(datos['monto'], (int, float)) or datos['monto'] <= 0:
+        raise RegistroPagoError('El campo monto debe ser un número positivo.')
+    if datos['metodo_pago'] not in METODOS_PAGO:
+        raise RegistroPagoError(f'El campo metodo_pago debe ser uno de: {", ".join(METODOS_PAGO)}.')
+    # fecha_pago llega como texto ISO 8601; sin zona horaria se asume UTC
+    fecha = datos['fecha_pago']
+    if isinstance(fecha, str):
+        try:
+            fecha = datetime.fromisoformat(fecha.replace('Z', '+00:00'))
+        except ValueError:
+            raise RegistroPagoError('El campo fecha_pago debe ser una fecha ISO 8601.') from None
+    elif not isinstance(fecha, datetime):
+        raise RegistroPagoError('El campo fecha_pago debe ser una fecha ISO 8601.')
+    datos['fecha_pago'] = fecha if fecha.tzinfo else fecha.replace(tzinfo=timezone.utc)
+
+
+# Registra un pago completo en una sola transacción de Firestore: lee primero
+# departamento, cuota y morosidad (solo los que vienen en la solicitud) y luego
+# escribe Pago, HistorialPago, Transaccion, los cambios de Cuota y Morosidad y
+# el resumen del departamento. Los pagos parciales de una cuota se acumulan en
+# monto_pagado; la cuota queda Pagada cuando la suma cubre su monto.
+@fireo.transactional
+def _registrar(transaction, datos):
+    cuota = None
+    if datos.get('cuota'):
+        cuota = Cuota.collection.get(datos['cuota'], transaction=transaction)
+        if not cuota:
+            raise RegistroPagoError('Cuota no encontrada.', 404)
+
+    departamento = Departamento.collection.get(datos['departamento'], transaction=transaction)
+    if not departamento:
+        raise RegistroPagoError('Departamento no encontrado.', 404)
+
+    if cuota is not None:
+        if _key_referencia(cuota.departamento) != departamento.key:
+            raise RegistroPagoError('La cuota no pertenece al departamento.', 409)
+        if cuota.estado == 'Pagada':
+            raise RegistroPagoError('La cuota ya está pagada.', 409)
+
+    morosidad = None
+    if datos.get('morosidad'):
+        morosidad = Morosidad.collection.get(datos['morosidad'], transaction=transaction)
+        if not morosidad:
+            raise RegistroPagoError('Morosidad no encontrada.', 404)
+        if morosidad.estado != 'Activo':
+            raise RegistroPagoError('La morosidad ya está cancelada.', 409)
+        # La morosidad es de un pago anterior: tiene que ser del mismo departamento
+        pago_moroso = db.document(_key_referencia(morosidad.pago)).get(transaction=transaction)
+        if not pago_moroso.exists or _key_referencia(pago_moroso.get('departamento')) != departamento.key:
+            raise RegistroPagoError('La morosidad no pertenece al departamento.', 409)
+
+    if cuota is not None:
+        anterior = {
+            'departamento': departamento.key,
+            'monto': cuota.monto,
+            'monto_pagado': cuota.monto_pagado or 0,
+            'estado': cuota.estado,
+        }
+        monto_pagado = anterior['monto_pagado'] + datos['monto']
+        completo = monto_pagado >= cuota.monto
+    else:
+        # Sin cuota, el pago solo cancela la morosidad si cubre la deuda con intereses
+        completo = morosidad is None or datos['monto'] >= morosidad.monto_atrasado + (morosidad.intereses or 0)
+
+    pago = Pago(
+        departamento=departamento.key,
+        monto=datos['monto'],
+        fecha_pago=datos['fecha_pago'],
+        periodo=datos['periodo'],
+        estado='Pagado' if completo else 'Pendiente'
+    )
+    pago.save(transaction=transaction)
+
+    historial = HistorialPago(
+        pago=pago.key,
+        fecha_pago=datos['fecha_pago'],
+        monto_pagado=datos['monto'],
+        metodo_pago=datos['metodo_pago'],
+        referencia_pago=datos.get('referencia_pago'),
+        estado='Completado' if completo else 'Parcial'
+    )
+    historial.save(transaction=transaction)
+
+    transaccion = Transaccion(
+        tipo='Ingreso',
+        descripcion=f'Pago {datos["periodo"]} - Departamento {departamento.numero}',
+        monto=datos['monto'],
+        fecha=datos['fecha_pago'],
+        departamento=departamento.key
+    )
+    transaccion.save(transaction=transaction)
+
+    if cuota is not None:
+        nueva = dict(anterior, monto_pagado=monto_pagado, estado='Pagada' if completo else cuota.estado)
+        Cuota.collection.update(cuota.key, monto_pagado=monto_pagado, estado=nueva['estado'], transaction=transaction)
+
+    # El departamento ya se leyó en la transacción: los efectos se escriben sin releerlo
+    resumen = resumen_pago.efectos(transaction, pago.key, None, {'departamento': departamento.key, 'monto': datos['monto']})
+    if cuota is not None:
+        resumen = combinar(resumen, resumen_cuota.efectos(transaction, cuota.key, anterior, nueva))
+    aplicar(transaction, resumen)
+
+    if morosidad is not None and completo:
+        Morosidad.collection.update(
+            morosidad.key,
+            estado='Cancelado',
+            fecha_cancelacion=datetime.now(timezone.utc),
+            transaction=transaction
+        )
+
+    return {
+        'pago': _serializar(pago.to_dict()),
+        'historial_pago': _serializar(historial.to_dict()),
+        'transaccion': _serializar(transaccion.to_dict()),
+        'cuota': {'key': cuota.key, 'estado': nueva['estado'], 'monto_pagado': monto_pagado} if cuota else None,
+        'morosidad': {'key': morosidad.key, 'estado': 'Cancelado' if completo else morosidad.estado} if morosidad else None,
+    }
+
+
+def registrar_pago(datos):
+    _validar(datos)
+    return _registrar(fireo.transaction(), datos)
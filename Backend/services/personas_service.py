@@ -0,0 +1,290 @@
+# backend/services/personas_service.py
+
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from models import Residente, Propietario, Personal
+from services.busqueda_service import plegar_acentos
+from services.condominio_service import PorCondominio, en_condominio
+
+logger = logging.getLogger(__name__)
+
+# Colecciones incluidas en la búsqueda de personas
+MODELOS = {
+    Residente.collection_name: Residente,
+    Propietario.collection_name: Propietario,
+    Personal.collection_name: Personal,
+}
+
+CAMPOS_NOMBRE = ('nombre', 'apepat', 'apemat')
+
+# Campos que alimentan el índice (nombres más RUT y teléfono)
+CAMPOS_INDEXADOS = CAMPOS_NOMBRE + ('rut', 'telefono')
+
+# Similitud mínima de trigramas para aceptar una coincidencia aproximada
+SIMILITUD_MINIMA = 0.4
+
+# Máximo de términos del vocabulario considerados por prefijo (consultas de 1-2 letras)
+MAX_PREFIJOS = 2000
+
+# Segundos que se usa el índice antes de volver a leerlo desde Firestore, para
+# recoger lo que escribieron otros workers (cada worker tiene su propio índice)
+VIGENCIA_INDICE = 60
+
+_NO_ALFANUMERICO = re.compile(r'[^a-z0-9]+')
+
+
+def normalizar(texto):
+    return _NO_ALFANUMERICO.sub(' ', plegar_acentos(str(texto or '').lower())).split()
+
+
+def _solo_digitos(texto):
+    return re.sub(r'[^0-9k]', '', str(texto or '').lower())
+
+
+def trigramas(termino):
+    relleno = f'  {termino} '
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+# Trigramas sin el relleno de inicio y fin, para buscar fragmentos en cualquier posición
+def _trigramas_internos(termino):
+    return {termino[i:i + 3] for i in range(len(termino) - 2)}
+
+
+def _es_numerico(termino):
+    return termino.rstrip('k').isdigit()
+
+
+def _tokens_persona(persona):
+    tokens = set()
+    for campo in CAMPOS_NOMBRE:
+        tokens.update(normalizar(getattr(persona, campo, '')))
+    for campo in ('rut', 'telefono'):
+        valor = _solo_digitos(getattr(persona, campo, ''))
+        if valor:
+            tokens.add(valor)
+    return tokens
+
+
+def _resumen(persona):
+    return {
+        'key': persona.key,
+        'tipo': persona.collection_name,
+        'nombre': ' '.join(str(getattr(persona, c, '') or '') for c in CAMPOS_NOMBRE).strip(),
+        'rut': getattr(persona, 'rut', None),
+        'telefono': getattr(persona, 'telefono', None),
+    }
+
+
+# Índice de personas para búsqueda tipo typeahead: vocabulario ordenado para
+# prefijos (bisect) y un índice de trigramas sobre el vocabulario para
+# coincidencias aproximadas y fragmentos de RUT o teléfono.
+class IndicePersonas:
+    def __init__(self):
+        self._personas = {}
+        self._por_token = defaultdict(set)
+        self._vocabulario = []
+        self._trigramas = defaultdict(set)
+
+    def __len__(self):
+        return len(self._personas)
+
+    def agregar(self, key, tokens, resumen):
+        self.eliminar(key)
+        self._personas[key] = (tuple(tokens), resumen)
+        for token in tokens:
+            if not self._por_token[token]:
+                insort(self._vocabulario, token)
+                for trigrama in trigramas(token):
+                    self._trigramas[trigrama].add(token)
+            self._por_token[token].add(key)
+
+    def eliminar(self, key):
+        persona = self._personas.pop(key, None)
+        if persona is None:
+            return
+        for token in persona[0]:
+            keys = self._por_token.get(token)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._por_token[token]
+                posicion = bisect_left(self._vocabulario, token)
+                if posicion < len(self._vocabulario) and self._vocabulario[posicion] == token:
+                    del self._vocabulario[posicion]
+                for trigrama in trigramas(token):
+                    tokens = self._trigramas.get(trigrama)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._trigramas[trigrama]
+
+    # Términos del vocabulario que coinciden con un término de la consulta y su puntaje
+    def _coincidencias(self, termino):
+        puntajes = {}
+        posicion = bisect_left(self._vocabulario, termino)
+        for token in self._vocabulario[posicion:posicion + MAX_PREFIJOS]:
+            if not token.startswith(termino):
+                break
+            puntajes[token] = 3.0 if token == termino else 2.0
+
+        if len(termino) >= 3 and _es_numerico(termino):
+            # Fragmento de RUT o teléfono: coincidencia por subcadena, usando la
+            # intersección de trigramas (empezando por el más selectivo) como filtro
+            conjuntos = sorted((self._trigramas.get(t, set()) for t in _trigramas_internos(termino)), key=len)
+            candidatos = set(conjuntos[0]).intersection(*conjuntos[1:]) if conjuntos else set()
+            for token in candidatos:
+                if termino in token and token not in puntajes:
+                    puntajes[token] = 1.5
+        elif len(termino) >= 3:
+            propios = trigramas(termino)
+            comunes = defaultdict(int)
+            for trigrama in propios:
+                for token in self._trigramas.get(trigrama, ()):
+                    comunes[token] += 1
+            for token, compartidos in comunes.items():
+                similitud = compartidos / (len(propios) + len(trigramas(token)) - compartidos)
+                if similitud >= SIMILITUD_MINIMA and similitud > puntajes.get(token, 0):
+                    puntajes[token] = similitud
+        return puntajes
+
+    def buscar(self, consulta, tipos=None, limite=10):
+        terminos = normalizar(consulta)
+        # Un RUT o teléfono escrito con puntos o guiones se busca también como un solo término
+        digitos = _solo_digitos(consulta)
+        if len(terminos) > 1 and digitos and len(digitos) >= 4 and all(t.isdigit() or t == 'k' for t in terminos):
+            terminos = [digitos]
+        if not terminos:
+            return []
+
+        total = None
+        for termino in terminos:
+            puntajes = defaultdict(float)
+            for token, puntaje in self._coincidencias(termino).items():
+                for key in self._por_token[token]:
+                    if puntaje > puntajes[key]:
+                        puntajes[key] = puntaje
+            if total is None:
+                total = puntajes
+            else:
+                # Todas las palabras de la consulta deben coincidir
+                total = {key: total[key] + puntaje for key, puntaje in puntajes.items() if key in total}
+            if not total:
+                return []
+
+        if tipos:
+            total = {key: puntaje for key, puntaje in total.items() if self._personas[key][1]['tipo'] in tipos}
+        mejores = heapq.nsmallest(limite, total.items(), key=lambda item: (-item[1], self._personas[item[0]][1]['nombre']))
+        salida = [dict(self._personas[key][1], puntaje=round(puntaje, 3)) for key, puntaje in mejores]
+        return salida
+
+
+# Índice del proceso: se construye la primera vez que se busca, se actualiza
+# en cada escritura de este worker y, al vencer su vigencia o invalidarse, se
+# reconstruye en un hilo aparte mientras las búsquedas siguen usando el
+# anterior. Las escrituras que llegan durante la reconstrucción se vuelven a
+# aplicar sobre el índice nuevo antes de reemplazarlo.
+class BuscadorPersonas:
+    def __init__(self, vigencia=VIGENCIA_INDICE, reloj=time.monotonic, condominio=None):
+        self.condominio = condominio
+        self._indice = None
+        self._cargado = None
+        self._vigencia = vigencia
+        self._reloj = reloj
+        self._pendientes = None
+        self._hilo = None
+        self._lock = threading.RLock()
+        self._lock_construccion = threading.Lock()
+
+    def _vigente(self):
+        return self._cargado is not None and self._reloj() - self._cargado < self._vigencia
+
+    def _construir(self):
+        indice = IndicePersonas()
+        with en_condominio(self.condominio):
+            for modelo in MODELOS.values():
+                for persona in modelo.collection.fetch():
+                    indice.agregar(persona.key, _tokens_persona(persona), _resumen(persona))
+        return indice
+
+    def _reconstruir(self):
+        with self._lock_construccion:
+            with self._lock:
+                if self._indice is not None and self._vigente():
+                    return self._indice
+                self._pendientes = []
+            try:
+                indice = self._construir()
+            except Exception:
+                with self._lock:
+                    self._pendientes = None
+                raise
+            with self._lock:
+                for metodo, argumentos in self._pendientes:
+                    getattr(indice, metodo)(*argumentos)
+                self._pendientes = None
+                self._indice = indice
+                self._cargado = self._reloj()
+            return indice
+
+    def _reconstruir_en_fondo(self):
+        try:
+            self._reconstruir()
+        except Exception:
+            logger.exception('No se pudo reconstruir el índice de personas.')
+        finally:
+            with self._lock:
+                self._hilo = None
+
+    def reconstruir_en_segundo_plano(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._reconstruir_en_fondo, name='indice-personas', daemon=True)
+                self._hilo.start()
+            return self._hilo
+
+    def _actual(self):
+        with self._lock:
+            indice = self._indice
+            vigente = self._vigente()
+        if indice is None:
+            # Primera carga: no hay un índice anterior que usar mientras tanto
+            return self._reconstruir()
+        if not vigente:
+            self.reconstruir_en_segundo_plano()
+        return indice
+
+    def _aplicar(self, metodo, *argumentos):
+        with self._lock:
+            if self._indice is not None:
+                getattr(self._indice, metodo)(*argumentos)
+            if self._pendientes is not None:
+                self._pendientes.append((metodo, argumentos))
+
+    def registrar(self, persona):
+        self._aplicar('agregar', persona.key, _tokens_persona(persona), _resumen(persona))
+
+    def retirar(self, key):
+        self._aplicar('eliminar', key)
+
+    def invalidar(self):
+        with self._lock:
+            self._cargado = None
+            if self._indice is None:
+                return
+        self.reconstruir_en_segundo_plano()
+
+    def buscar(self, consulta, tipos=None, limite=10):
+        indice = self._actual()
+        with self._lock:
+            return indice.buscar(consulta, tipos, limite)
+
+
+buscador_personas = PorCondominio(lambda condominio: BuscadorPersonas(condominio=condominio))
@@ -0,0 +1,103 @@
+# backend/services/recordatorio_service.py
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from firebase_config import db
+from models import Cuota, Residente, Notificacion
+from services.condominio_service import ruta_condominio
+from services.notificacion_service import guardar_y_encolar, CANAL_POR_DEFECTO
+
+# Días de anticipación por defecto respecto de la fecha de vencimiento
+DIAS_ANTICIPACION = 3
+
+# Cantidad de keys por lectura múltiple al revisar recordatorios ya enviados
+TAMANO_LECTURA = 300
+
+# Estados de cuota que no necesitan recordatorio
+ESTADOS_SIN_RECORDATORIO = {'Pagada'}
+
+
+# Cuotas que vencen dentro de la ventana [desde, hasta). Es una consulta de
+# rango sobre un solo campo, que Firestore resuelve con su índice automático.
+def cuotas_por_vencer(desde, hasta):
+    consulta = Cuota.collection.filter('fecha_vencimiento', '>=', desde).filter('fecha_vencimiento', '<', hasta)
+    for cuota in consulta.fetch():
+        if cuota.estado not in ESTADOS_SIN_RECORDATORIO:
+            yield cuota
+
+
+# Mapa departamento -> residentes, construido con una sola lectura por ejecución
+def residentes_por_departamento(departamentos):
+    mapa = defaultdict(list)
+    for residente in Residente.collection.fetch():
+        key_departamento = _key_referencia(residente.departamento)
+        if key_departamento in departamentos:
+            mapa[key_departamento].append(residente.key)
+    return mapa
+
+
+def _key_referencia(valor):
+    return valor if isinstance(valor, str) else getattr(valor, 'key', None)
+
+
+def _id_desde_key(key):
+    return key.split('/')[-1]
+
+
+# Clave de deduplicación: un recordatorio por cuota y residente
+def id_recordatorio(cuota_key, residente_key):
+    return f'recordatorio-{_id_desde_key(cuota_key)}-{_id_desde_key(residente_key)}'
+
+
+# Devuelve el subconjunto de IDs de notificación que ya existen en Firestore,
+# en la colección del condominio actual. Solo se pide un campo: basta saber
+# si el documento existe.
+def ids_existentes(ids):
+    existentes = set()
+    raiz = ruta_condominio()
+    coleccion = db.collection(f'{raiz}/{Notificacion.collection_name}' if raiz else Notificacion.collection_name)
+    ids = list(ids)
+    for inicio in range(0, len(ids), TAMANO_LECTURA):
+        referencias = [coleccion.document(id_) for id_ in ids[inicio:inicio + TAMANO_LECTURA]]
+        for snapshot in db.get_all(referencias, field_paths=['estado']):
+            if snapshot.exists:
+                existentes.add(snapshot.id)
+    return existentes
+
+
+def _mensaje(cuota):
+    vencimiento = cuota.fecha_vencimiento.strftime('%d-%m-%Y') if cuota.fecha_vencimiento else ''
+    return f'Recordatorio: la cuota del periodo {cuota.periodo} por ${cuota.monto} vence el {vencimiento}.'
+
+
+# Encola un recordatorio para cada residente de los departamentos con cuotas por vencer.
+# Las notificaciones usan IDs deterministas y se crean con create(), así que volver a
+# ejecutar el job (o dos ejecuciones a la vez) no reenvía. La lectura previa solo
+# evita intentar crear las que ya se enviaron en ejecuciones anteriores.
+def enviar_recordatorios(dias=DIAS_ANTICIPACION, ahora=None, canal=CANAL_POR_DEFECTO, cola=None):
+    ahora = ahora or datetime.now(timezone.utc)
+    desde = ahora
+    hasta = ahora + timedelta(days=dias)
+
+    cuotas = list(cuotas_por_vencer(desde, hasta))
+    departamentos = {_key_referencia(cuota.departamento) for cuota in cuotas}
+    mapa = residentes_por_departamento(departamentos) if cuotas else {}
+
+    candidatas = {}
+    for cuota in cuotas:
+        mensaje = _mensaje(cuota)
+        for residente in mapa.get(_key_referencia(cuota.departamento), []):
+            id_ = id_recordatorio(cuota.key, residente)
+            candidatas[id_] = {'id': id_, 'residente': residente, 'tipo': 'Recordatorio', 'mensaje': mensaje}
+
+    existentes = ids_existentes(candidatas)
+    nuevas = [datos for id_, datos in candidatas.items() if id_ not in existentes]
+    encoladas = guardar_y_encolar(nuevas, canal, cola) if nuevas else 0
+
+    return {
+        'cuotas': len(cuotas),
+        'departamentos': len(departamentos),
+        'encoladas': encoladas,
+        'omitidas': len(candidatas) - encoladas,
+    }
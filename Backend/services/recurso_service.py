@@ -0,0 +1,390 @@
+# backend/services/recurso_service.py
+
+import logging
+from datetime import datetime
+
+import fireo
+from flask import request, jsonify
+from fireo.fields import IDField, ReferenceField
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import DocumentReference
+
+from firebase_config import db
+from services.condominio_service import key_en_condominio, ruta_condominio
+from services.esquema_service import Esquema, ErrorValidacion
+from services.idempotencia_service import idempotente
+from services.interruptor_service import ENDPOINTS_RESPALDO
+from services.lecturas_service import leer_documento, leer_documentos, olvidar
+
+logger = logging.getLogger(__name__)
+
+
+def serializar_valor(valor):
+    if isinstance(valor, DocumentReference):
+        return valor.path
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, dict):
+        return {k: serializar_valor(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [serializar_valor(v) for v in valor]
+    return valor
+
+
+# Vista de solo lectura de un documento ya serializado; es lo que reciben los
+# hooks (índices de búsqueda, calendario) sin tener que cargar el modelo de FireO.
+class Documento:
+    def __init__(self, key, collection_name, datos):
+        self.key = key
+        self.collection_name = collection_name
+        self._datos = datos
+
+    def __getattr__(self, nombre):
+        try:
+            return self._datos[nombre]
+        except KeyError:
+            raise AttributeError(nombre) from None
+
+    def to_dict(self):
+        return dict(self._datos)
+
+
+class ErrorRecurso(Exception):
+    def __init__(self, mensaje, status=400):
+        super().__init__(mensaje)
+        self.status = status
+
+
+# Recurso CRUD declarativo sobre un modelo de FireO. Cada controlador lo
+# configura con su modelo y mensajes, y registra las rutas en su blueprint:
+#   GET / · GET /<id>/ · POST / · PUT /<id>/ · PATCH /<id>/ · DELETE /<id>/
+# Las lecturas van directo a Firestore y serializan las referencias como keys
+# (sin cargar los documentos referenciados), las referencias recibidas se
+# verifican con una sola lectura por lotes, y PUT y PATCH escriben solo los
+# campos enviados (PATCH además sin leer el documento antes).
+# Con resumen (services/resumen_service.py) la escritura y los cambios que
+# produce en los resúmenes de Departamento van en una misma transacción.
+class Recurso:
+    def __init__(self, modelo, nombre, femenino=False, requeridos=None, duplicado=None,
+                 al_guardar=(), al_eliminar=(), campos_hooks=None, crear_idempotente=False,
+                 resumen=None, solo_lectura=(), invalidar=()):
+        self.modelo = modelo
+        self.nombre = nombre
+        self.femenino = femenino
+        self.al_guardar = list(al_guardar)
+        self.al_eliminar = list(al_eliminar)
+        # Se llaman si falla un hook, para que el índice afectado se reconstruya
+        self.invalidar = list(invalidar)
+        # Campos que leen los hooks de al_guardar; un PATCH que no toca ninguno
+        # no los ejecuta y se ahorra releer el documento (None: cualquier campo)
+        self.campos_hooks = set(campos_hooks) if campos_hooks is not None else None
+        self.crear_idempotente = crear_idempotente
+        self.resumen = resumen
+
+        campos = modelo._meta.field_list
+        self.campo_id = modelo._meta.id[0]
+        self.campos = {nombre: campo for nombre, campo in campos.items() if not isinstance(campo, IDField)}
+        # Campos declarados unique=True en el modelo; FireO no los hace cumplir
+        self.unicos = [nombre for nombre, campo in self.campos.items() if campo.raw_attributes.get('unique')]
+        self.referencias = {
+            nombre: campo.model_ref for nombre, campo in self.campos.items() if isinstance(campo, ReferenceField)
+        }
+        # El esquema se compila una vez al registrar el controlador
+        self.esquema = Esquema(modelo, requeridos, excluidos=solo_lectura)
+
+        articulo = 'La' if femenino else 'El'
+        self.mensaje_duplicado = duplicado or f'{articulo} {nombre.lower()} ya existe.'
+
+    @property
+    def no_encontrado(self):
+        return f'{self.nombre} no encontrad{"a" if self.femenino else "o"}.'
+
+    @property
+    def eliminado(self):
+        return f'{self.nombre} eliminad{"a" if self.femenino else "o"} correctamente.'
+
+    def _ruta_coleccion(self):
+        raiz = ruta_condominio()
+        return f'{raiz}/{self.modelo.collection_name}' if raiz else self.modelo.collection_name
+
+    def _key(self, id_documento):
+        return f'{self._ruta_coleccion()}/{id_documento}'
+
+    def serializar_snapshot(self, snapshot):
+        datos = serializar_valor(snapshot.to_dict() or {})
+        datos[self.campo_id] = snapshot.id
+        datos['key'] = snapshot.reference.path
+        return datos
+
+    def _documento(self, key, datos):
+        return Documento(key, self.modelo.collection_name, datos)
+
+    @staticmethod
+    def _cuerpo():
+        datos = request.get_json(silent=True)
+        if not isinstance(datos, dict):
+            raise ErrorRecurso('El cuerpo de la solicitud debe ser un objeto JSON.')
+        return datos
+
+    # Valida antes de cualquier lectura o escritura en Firestore
+    def _validar(self, datos, parcial=False, estricto=False):
+        try:
+            return self.esquema.validar(datos, parcial, estricto)
+        except ErrorValidacion as e:
+            raise ErrorRecurso(str(e)) from None
+
+    # Resuelve las referencias (id o key) a keys completas del condominio y
+    # verifica que existan con una sola lectura por lotes
+    def _resolver_referencias(self, datos):
+        keys = {}
+        for campo, modelo_ref in self.referencias.items():
+            valor = datos.get(campo)
+            if not valor:
+                continue
+            if not isinstance(valor, str):
+                raise ErrorRecurso(f'El campo {campo} debe ser un id o una key.')
+            key = key_en_condominio(valor) if '/' in valor else modelo_ref.collection.get_key_by_id(valor)
+            if key.rsplit('/', 2)[-2] != modelo_ref.collection_name:
+                raise ErrorRecurso(f'El campo {campo} debe referenciar un documento de {modelo_ref.collection_name}.')
+            keys[campo] = key
+
+        if keys:
+            existentes = {
+                key for key, snapshot in leer_documentos(keys.values()).items() if snapshot.exists
+            }
+            for campo, key in keys.items():
+                if key not in existentes:
+                    raise ErrorRecurso(f'Referencia {campo} no encontrada.', 404)
+        return dict(datos, **keys)
+
+    # Escribe solo los campos indicados. Se usa un lote de una escritura para
+    # no releer el documento; update() falla con NotFound si no existe.
+    def _escribir_cambios(self, key, cambios):
+        lote = fireo.batch()
+        self.modelo.collection.update(key, batch=lote, **cambios)
+        try:
+            lote.commit()
+        except NotFound:
+            raise ErrorRecurso(self.no_encontrado, 404) from None
+
+    def _crear_con_resumen(self, datos):
+        @fireo.transactional
+        def escribir(transaction):
+            completos = dict(datos, **self.resumen.completar(transaction, datos))
+            cambios = self.resumen.calcular(transaction, None, None, serializar_valor(completos))
+            modelo = self.modelo(**completos)
+            modelo.save(transaction=transaction)
+            self.resumen.aplicar(transaction, cambios)
+            return modelo
+        modelo = escribir(fireo.transaction())
+        olvidar()
+        return modelo
+
+    # Lee el documento dentro de la transacción para conocer su aporte anterior
+    # al resumen; con cambios None lo elimina. Devuelve el snapshot anterior y
+    # los campos escritos (los recibidos más los que agrega el resumen).
+    def _escribir_con_resumen(self, key, cambios):
+        @fireo.transactional
+        def escribir(transaction):
+            referencia = db.document(key)
+            snapshot = referencia.get(transaction=transaction)
+            if not snapshot.exists:
+                raise ErrorRecurso(self.no_encontrado, 404)
+            anterior = self.serializar_snapshot(snapshot)
+            completos = None
+            if cambios is None:
+                efectos = self.resumen.calcular(transaction, key, anterior, None)
+                transaction.delete(referencia)
+            else:
+                completos = dict(cambios, **self.resumen.completar(transaction, cambios))
+                efectos = self.resumen.calcular(transaction, key, anterior, dict(anterior, **serializar_valor(completos)))
+                if completos:
+                    self.modelo.collection.update(key, transaction=transaction, **completos)
+            self.resumen.aplicar(transaction, efectos)
+            return snapshot, completos
+        resultado = escribir(fireo.transaction())
+        # El resumen escribió otros documentos (departamentos) en la transacción
+        olvidar()
+        return resultado
+
+    # Una consulta por campo único con valor; la creación concurrente de dos
+    # documentos con el mismo valor no queda cubierta
+    def _verificar_unicos(self, datos):
+        coleccion = db.collection(self._ruta_coleccion())
+        for campo in self.unicos:
+            valor = datos.get(campo)
+            if valor is not None and any(coleccion.where(campo, '==', valor).limit(1).stream()):
+                raise ErrorRecurso(self.mensaje_duplicado, 409)
+
+    # Los hooks corren con la escritura ya confirmada: si uno falla la
+    # solicitud no se responde con error (el cliente la reintentaría y
+    # duplicaría la escritura), se registra y se invalidan los índices
+    def _ejecutar_hooks(self, hooks, argumento):
+        for hook in hooks:
+            try:
+                hook(argumento)
+            except Exception:
+                logger.exception('Falló un hook de %s; se invalidan sus índices.', self.nombre)
+                self._invalidar_indices()
+                return
+
+    def _invalidar_indices(self):
+        for invalidar in self.invalidar:
+            try:
+                invalidar()
+            except Exception:
+                logger.exception('No se pudo invalidar un índice de %s.', self.nombre)
+
+    def listar(self):
+        return [self.serializar_snapshot(snapshot) for snapshot in db.collection(self._ruta_coleccion()).stream()]
+
+    def obtener(self, id_documento):
+        snapshot = leer_documento(self._key(id_documento))
+        if not snapshot.exists:
+            raise ErrorRecurso(self.no_encontrado, 404)
+        return self.serializar_snapshot(snapshot)
+
+    def crear(self, datos):
+        datos = self._resolver_referencias(self._validar(datos))
+        self._verificar_unicos(datos)
+
+        if self.resumen is not None:
+            modelo = self._crear_con_resumen(datos)
+        else:
+            modelo = self.modelo(**datos)
+            modelo.save()
+        resultado = serializar_valor(modelo.to_dict())
+        self._ejecutar_hooks(self.al_guardar, self._documento(modelo.key, resultado))
+        return resultado
+
+    def actualizar(self, id_documento, datos):
+        cambios = self._validar(datos, parcial=True)
+        key = self._key(id_documento)
+        if self.resumen is not None:
+            cambios = self._resolver_referencias(cambios)
+            snapshot, cambios = self._escribir_con_resumen(key, cambios)
+        else:
+            snapshot = leer_documento(key)
+            if not snapshot.exists:
+                raise ErrorRecurso(self.no_encontrado, 404)
+
+            cambios = self._resolver_referencias(cambios)
+            if cambios:
+                self._escribir_cambios(key, cambios)
+
+        resultado = self.serializar_snapshot(snapshot)
+        resultado.update(serializar_valor(cambios))
+        self._ejecutar_hooks(self.al_guardar, self._documento(key, resultado))
+        return resultado
+
+    # Actualización parcial sin lectura previa: solo se envían los campos
+    # recibidos, así que no pisa cambios concurrentes en otros campos
+    def modificar(self, id_documento, datos):
+        if not datos:
+            raise ErrorRecurso('No hay campos para actualizar.')
+        cambios = self._validar(datos, parcial=True, estricto=True)
+
+        key = self._key(id_documento)
+        cambios = self._resolver_referencias(cambios)
+        # Solo los campos que cambian el resumen obligan a leer el documento
+        if self.resumen is not None and self.resumen.campos & set(cambios):
+            _, cambios = self._escribir_con_resumen(key, cambios)
+        else:
+            self._escribir_cambios(key, cambios)
+
+        if self.al_guardar and (self.campos_hooks is None or self.campos_hooks & set(cambios)):
+            snapshot = leer_documento(key)
+            if snapshot.exists:
+                self._ejecutar_hooks(self.al_guardar, self._documento(key, self.serializar_snapshot(snapshot)))
+
+        resultado = serializar_valor(cambios)
+        resultado[self.campo_id] = id_documento
+        resultado['key'] = key
+        return resultado
+
+    def eliminar(self, id_documento):
+        key = self._key(id_documento)
+        if self.resumen is not None:
+            self._escribir_con_resumen(key, None)
+        else:
+            try:
+                # La precondición evita leer el documento antes de borrarlo
+                db.document(key).delete(option=db.write_option(exists=True))
+            except NotFound:
+                raise ErrorRecurso(self.no_encontrado, 404) from None
+            olvidar(key)
+        self._ejecutar_hooks(self.al_eliminar, key)
+
+    # Registra las rutas en el blueprint. Los nombres de endpoint siguen la
+    # convención get_<plural>, get_<singular>, create_<singular>, ...
+    def registrar(self, blueprint, singular, plural, endpoints=None):
+        nombres = {
+            'listar': f'get_{plural}',
+            'obtener': f'get_{singular}',
+            'crear': f'create_{singular}',
+            'actualizar': f'update_{singular}',
+            'modificar': f'patch_{singular}',
+            'eliminar': f'delete_{singular}',
+        }
+        nombres.update(endpoints or {})
+
+        def listar():
+            try:
+                return jsonify({'status': 'success', 'data': self.listar()}), 200
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        def obtener(id_documento):
+            try:
+                return jsonify({'status': 'success', 'data': self.obtener(id_documento)}), 200
+            except ErrorRecurso as e:
+                return jsonify({'status': 'error', 'message': str(e)}), e.status
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        def crear():
+            try:
+                return jsonify({'status': 'success', 'data': self.crear(self._cuerpo())}), 201
+            except ErrorRecurso as e:
+                return jsonify({'status': 'error', 'message': str(e)}), e.status
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        def actualizar(id_documento):
+            try:
+                return jsonify({'status': 'success', 'data': self.actualizar(id_documento, self._cuerpo())}), 200
+            except ErrorRecurso as e:
+                return jsonify({'status': 'error', 'message': str(e)}), e.status
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        def modificar(id_documento):
+            try:
+                return jsonify({'status': 'success', 'data': self.modificar(id_documento, self._cuerpo())}), 200
+            except ErrorRecurso as e:
+                return jsonify({'status': 'error', 'message': str(e)}), e.status
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        def eliminar(id_documento):
+            try:
+                self.eliminar(id_documento)
+                return jsonify({'status': 'success', 'message': self.eliminado}), 200
+            except ErrorRecurso as e:
+                return jsonify({'status': 'error', 'message': str(e)}), e.status
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 500
+
+        if self.crear_idempotente:
+            crear = idempotente(crear)
+
+        # Las lecturas se pueden responder desde el respaldo si Firestore no está disponible
+        ENDPOINTS_RESPALDO.update({f'{blueprint.name}.{nombres["listar"]}', f'{blueprint.name}.{nombres["obtener"]}'})
+
+        blueprint.add_url_rule('/', nombres['listar'], listar, methods=['GET'])
+        blueprint.add_url_rule('/<id_documento>/', nombres['obtener'], obtener, methods=['GET'])
+        blueprint.add_url_rule('/', nombres['crear'], crear, methods=['POST'])
+        blueprint.add_url_rule('/<id_documento>/', nombres['actualizar'], actualizar, methods=['PUT'])
+        blueprint.add_url_rule('/<id_documento>/', nombres['modificar'], modificar, methods=['PATCH'])
+        blueprint.add_url_rule('/<id_documento>/', nombres['eliminar'], eliminar, methods=['DELETE'])
+        return self
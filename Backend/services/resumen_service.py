@@ -0,0 +1,291 @@
+# backend/services/resumen_service.py
+
+from google.cloud.firestore_v1 import Increment
+
+from firebase_config import db
+from models import Departamento, Propietario, Residente, Cuota, Pago, Solicitud
+from services.condominio_service import ruta_condominio
+
+# Campos de resumen de Departamento: los mantiene este servicio en la misma
+# transacción que la escritura que los cambia y no se aceptan en las solicitudes
+CONTADORES = ['residentes_actuales', 'saldo_pendiente', 'cuotas_pendientes', 'solicitudes_abiertas', 'total_pagado']
+CAMPOS_RESUMEN = ['propietario_nombre'] + CONTADORES
+
+# Campos que devuelve el listado paginado de departamentos
+CAMPOS_LISTADO = ['numero', 'piso', 'tipo', 'estado', 'propietario'] + CAMPOS_RESUMEN
+TAMANO_PAGINA = 50
+
+CUOTA_PENDIENTE = {'Pendiente', 'Atrasada'}
+SOLICITUD_ABIERTA = {'Pendiente', 'En Proceso'}
+
+# Firestore admite como máximo 500 escrituras por lote
+TAMANO_LOTE = 500
+
+
+def _coleccion(modelo):
+    raiz = ruta_condominio()
+    return db.collection(f'{raiz}/{modelo.collection_name}' if raiz else modelo.collection_name)
+
+
+def _key(valor):
+    return valor if isinstance(valor, str) else getattr(valor, 'path', None)
+
+
+def nombre_completo(datos):
+    return ' '.join(datos[campo] for campo in ('nombre', 'apepat', 'apemat') if datos.get(campo)) or None
+
+
+def sumar(cambios, departamento, campo, valor):
+    departamento = _key(departamento)
+    if departamento and valor:
+        campos = cambios.setdefault(departamento, {})
+        campos[campo] = campos.get(campo, 0) + valor
+
+
+def combinar(*cambios):
+    resultado = {}
+    for parcial in cambios:
+        for departamento, campos in parcial.items():
+            for campo, valor in campos.items():
+                if campo in CONTADORES:
+                    sumar(resultado, departamento, campo, valor)
+                else:
+                    resultado.setdefault(departamento, {})[campo] = valor
+    return resultado
+
+
+# Escribe los cambios en una transacción o un lote: los contadores como
+# incrementos (no dependen del valor leído) y el resto como valores
+def aplicar(escritura, cambios):
+    for departamento, campos in cambios.items():
+        valores = {}
+        for campo, valor in campos.items():
+            if campo not in CONTADORES:
+                valores[campo] = valor
+            elif valor:
+                valores[campo] = Increment(valor)
+        if valores:
+            escritura.update(db.document(departamento), valores)
+
+
+# Resumen que una entidad aporta a los departamentos. Recurso lo usa en cada
+# escritura: completar() agrega campos al propio documento y calcular()
+# devuelve los cambios {key de departamento: {campo: valor o incremento}}
+# entre el documento anterior y el nuevo (None al crear o al eliminar).
+# Todas las lecturas ocurren en calcular(), antes de cualquier escritura.
+class Resumen:
+    # Un PATCH que no toca estos campos no cambia el resumen
+    campos = set()
+
+    def completar(self, transaccion, datos):
+        return {}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        return {}
+
+    def calcular(self, transaccion, key, anterior, nuevo):
+        cambios = self.efectos(transaccion, key, anterior, nuevo)
+        if not cambios:
+            return cambios
+        # Un departamento eliminado no se vuelve a crear por su resumen
+        existentes = {
+            snapshot.reference.path
+            for snapshot in db.get_all([db.document(departamento) for departamento in cambios], transaction=transaccion)
+            if snapshot.exists
+        }
+        return {departamento: campos for departamento, campos in cambios.items() if departamento in existentes}
+
+    def aplicar(self, transaccion, cambios):
+        aplicar(transaccion, cambios)
+
+
+class ResumenDepartamento(Resumen):
+    campos = {'propietario'}
+
+    def completar(self, transaccion, datos):
+        if 'propietario' not in datos:
+            return {}
+        if not datos['propietario']:
+            return {'propietario_nombre': None}
+        snapshot = db.document(datos['propietario']).get(transaction=transaccion)
+        return {'propietario_nombre': nombre_completo(snapshot.to_dict() or {})}
+
+
+class ResumenPropietario(Resumen):
+    campos = {'nombre', 'apepat', 'apemat'}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        if anterior is None:
+            return {}
+        if nuevo is None:
+            valores = {'propietario': None, 'propietario_nombre': None}
+        elif nombre_completo(nuevo) != nombre_completo(anterior):
+            valores = {'propietario_nombre': nombre_completo(nuevo)}
+        else:
+            return {}
+        consulta = _coleccion(Departamento).where('propietario', '==', db.document(key))
+        return {snapshot.reference.path: dict(valores) for snapshot in consulta.stream(transaction=transaccion)}
+
+
+class ResumenResidente(Resumen):
+    campos = {'departamento'}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        antes = _key(anterior.get('departamento')) if anterior else None
+        despues = _key(nuevo.get('departamento')) if nuevo else None
+        cambios = {}
+        if antes == despues:
+            return cambios
+
+        # Las solicitudes abiertas del residente se cuentan en su departamento
+        abiertas = 0
+        if anterior is not None:
+            consulta = _coleccion(Solicitud).where('residente', '==', db.document(key))
+            abiertas = sum(
+                1 for snapshot in consulta.stream(transaction=transaccion)
+                if (snapshot.to_dict() or {}).get('estado') in SOLICITUD_ABIERTA
+            )
+        sumar(cambios, antes, 'residentes_actuales', -1)
+        sumar(cambios, antes, 'solicitudes_abiertas', -abiertas)
+        sumar(cambios, despues, 'residentes_actuales', 1)
+        sumar(cambios, despues, 'solicitudes_abiertas', abiertas)
+        return cambios
+
+
+# Lo que falta pagar de una cuota pendiente, descontados los pagos parciales
+def saldo_cuota(cuota):
+    return (cuota.get('monto') or 0) - (cuota.get('monto_pagado') or 0)
+
+
+class ResumenCuota(Resumen):
+    campos = {'departamento', 'monto', 'estado', 'monto_pagado'}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        cambios = {}
+        for cuota, signo in ((anterior, -1), (nuevo, 1)):
+            if cuota and cuota.get('estado') in CUOTA_PENDIENTE:
+                sumar(cambios, cuota.get('departamento'), 'saldo_pendiente', signo * saldo_cuota(cuota))
+                sumar(cambios, cuota.get('departamento'), 'cuotas_pendientes', signo)
+        return cambios
+
+
+class ResumenPago(Resumen):
+    campos = {'departamento', 'monto'}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        cambios = {}
+        for pago, signo in ((anterior, -1), (nuevo, 1)):
+            if pago:
+                sumar(cambios, pago.get('departamento'), 'total_pagado', signo * (pago.get('monto') or 0))
+        return cambios
+
+
+class ResumenSolicitud(Resumen):
+    campos = {'residente', 'estado'}
+
+    def efectos(self, transaccion, key, anterior, nuevo):
+        abiertas = [
+            (solicitud, signo) for solicitud, signo in ((anterior, -1), (nuevo, 1))
+            if solicitud and solicitud.get('estado') in SOLICITUD_ABIERTA and solicitud.get('residente')
+        ]
+        residentes = {_key(solicitud['residente']) for solicitud, _ in abiertas}
+        if not residentes:
+            return {}
+
+        # El departamento de la solicitud es el de su residente
+        departamentos = {
+            snapshot.reference.path: (snapshot.to_dict() or {}).get('departamento')
+            for snapshot in db.get_all([db.document(residente) for residente in residentes], transaction=transaccion)
+            if snapshot.exists
+        }
+        cambios = {}
+        for solicitud, signo in abiertas:
+            sumar(cambios, departamentos.get(_key(solicitud['residente'])), 'solicitudes_abiertas', signo)
+        return cambios
+
+
+resumen_departamento = ResumenDepartamento()
+resumen_propietario = ResumenPropietario()
+resumen_residente = ResumenResidente()
+resumen_cuota = ResumenCuota()
+resumen_pago = ResumenPago()
+resumen_solicitud = ResumenSolicitud()
+
+
+# Recalcula el resumen de todos los departamentos desde las colecciones (por
+# ejemplo, después de una carga directa en Firestore). Las escrituras que
+# ocurran mientras se recorre pueden perderse: conviene ejecutarlo con poco tráfico.
+def reconstruir_resumenes():
+    resumenes = {}
+    for snapshot in _coleccion(Departamento).stream():
+        resumenes[snapshot.reference.path] = {
+            'propietario': _key((snapshot.to_dict() or {}).get('propietario')),
+            'propietario_nombre': None,
+            **{campo: 0 for campo in CONTADORES},
+        }
+
+    propietarios = {
+        snapshot.reference.path: nombre_completo(snapshot.to_dict() or {})
+        for snapshot in _coleccion(Propietario).stream()
+    }
+    departamento_de = {}
+    for snapshot in _coleccion(Residente).stream():
+        departamento = _key(snapshot.get('departamento'))
+        departamento_de[snapshot.reference.path] = departamento
+        if departamento in resumenes:
+            resumenes[departamento]['residentes_actuales'] += 1
+
+    for snapshot in _coleccion(Cuota).stream():
+        cuota = snapshot.to_dict() or {}
+        resumen = resumenes.get(_key(cuota.get('departamento')))
+        if resumen is not None and cuota.get('estado') in CUOTA_PENDIENTE:
+            resumen['saldo_pendiente'] += saldo_cuota(cuota)
+            resumen['cuotas_pendientes'] += 1
+
+    for snapshot in _coleccion(Pago).stream():
+        pago = snapshot.to_dict() or {}
+        resumen = resumenes.get(_key(pago.get('departamento')))
+        if resumen is not None:
+            resumen['total_pagado'] += pago.get('monto') or 0
+
+    for snapshot in _coleccion(Solicitud).stream():
+        solicitud = snapshot.to_dict() or {}
+        resumen = resumenes.get(departamento_de.get(_key(solicitud.get('residente'))))
+        if resumen is not None and solicitud.get('estado') in SOLICITUD_ABIERTA:
+            resumen['solicitudes_abiertas'] += 1
+
+    lote = db.batch()
+    pendientes = 0
+    for departamento, resumen in resumenes.items():
+        propietario = resumen.pop('propietario')
+        resumen['propietario_nombre'] = propietarios.get(propietario)
+        lote.update(db.document(departamento), resumen)
+        pendientes += 1
+        if pendientes == TAMANO_LOTE:
+            lote.commit()
+            lote = db.batch()
+            pendientes = 0
+    if pendientes:
+        lote.commit()
+    return len(resumenes)
+
+
+# Una página del listado de departamentos ordenado por número (y por id para
+# desempatar), con el resumen ya calculado: una sola consulta. Devuelve los
+# snapshots y el cursor de la siguiente página, "<numero>/<id>" (None si no hay
+# más). Un cursor con solo el número sigue aceptándose: salta ese número entero.
+def listar_departamentos(limite=TAMANO_PAGINA, cursor=None):
+    coleccion = _coleccion(Departamento)
+    consulta = coleccion.select(CAMPOS_LISTADO).order_by('numero').order_by('__name__').limit(limite)
+    if cursor:
+        # Los ids de documento no pueden contener '/', el número sí
+        numero, separador, id_documento = cursor.rpartition('/')
+        if separador and id_documento:
+            consulta = consulta.start_after({'numero': numero, '__name__': coleccion.document(id_documento)})
+        else:
+            consulta = consulta.start_after({'numero': cursor})
+    documentos = list(consulta.stream())
+    if len(documentos) < limite:
+        return documentos, None
+    ultimo = documentos[-1]
+    return documentos, f"{ultimo.get('numero')}/{ultimo.id}"
@@ -0,0 +1,85 @@
+# backend/tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+# Las pruebas usan el almacén en memoria (CanalMemoria): no requieren un proyecto de Firebase
+os.environ.setdefault('FIRESTORE_BACKEND', 'memoria')
+os.environ.setdefault('AUTH_REQUIRED', '0')
+os.environ.setdefault('FIRESTORE_CALENTAR', '0')
+os.environ.setdefault('NOTIFICACIONES_TRANSPORTE', 'falso')
+os.environ.setdefault('INDICE_BUSQUEDA_DIR', tempfile.mkdtemp(prefix='indice-busqueda-'))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+
+import firebase_config
+from app import app as aplicacion
+from services import busqueda_service
+from services.interruptor_service import interruptor
+from services.limite_service import limitador, AlmacenFichasLocal
+
+
+# Cada prueba parte con el almacén vacío, sin fallas inyectadas, con el circuito
+# cerrado, sin cubetas de límite de tasa y con el índice de búsqueda en un
+# directorio propio
+@pytest.fixture(autouse=True)
+def almacen(monkeypatch, tmp_path):
+    monkeypatch.setattr(busqueda_service, 'DIRECTORIO_INDICE', str(tmp_path / 'busqueda'))
+    monkeypatch.setattr(busqueda_service.buscador, '_instancias', OrderedDict())
+    monkeypatch.setattr(limitador, 'almacen', AlmacenFichasLocal())
+    firebase_config.almacen.vaciar()
+    inyeccion = firebase_config.inyeccion
+    inyeccion.latencia = inyeccion.variacion = inyeccion.tasa_fallas = 0.0
+    inyeccion.caida = False
+    interruptor._cerrar()
+    yield firebase_config.almacen
+    inyeccion.tasa_fallas = 0.0
+    inyeccion.caida = False
+    interruptor._cerrar()
+
+
+@pytest.fixture
+def cliente():
+    aplicacion.config['RATE_LIMIT_CAPACIDAD'] = 10000
+    return aplicacion.test_client()
+
+
+# Crea un documento por la API y devuelve sus datos
+@pytest.fixture
+def crear(cliente):
+    def crear(ruta, datos, **kwargs):
+        respuesta = cliente.post(f'/api/{ruta}/', json=datos, **kwargs)
+        assert respuesta.status_code == 201, respuesta.get_json()
+        return respuesta.get_json()['data']
+    return crear
+
+
+@pytest.fixture
+def ahora():
+    return datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def departamento(crear):
+    return crear('departamento', {'numero': '101', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'})
+
+
+@pytest.fixture
+def residente(crear, departamento):
+    return crear('residente', {
+        'departamento': departamento['id_departamento'], 'nombre': 'Juan', 'apepat': 'Pérez', 'apemat': 'Soto',
+        'rut': '12345678-5', 'telefono': '+56922222222', 'email': 'juan@example.com',
+    })
+
+
+@pytest.fixture
+def resumen(cliente):
+    def resumen(id_departamento):
+        datos = cliente.get(f'/api/departamento/{id_departamento}/').get_json()['data']
+        return {campo: datos.get(campo) for campo in ('saldo_pendiente', 'cuotas_pendientes', 'total_pagado')}
+    return resumen
@@ -0,0 +1,101 @@
+# backend/tests/test_archivo.py
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import archivo_service
+
+# Fecha fija para que el corte (12 meses atrás) no dependa del día en que se corren las pruebas
+AHORA = datetime(2026, 10, 19, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def transacciones(crear, monkeypatch):
+    # Partes pequeñas para que un periodo quede repartido en varios documentos
+    monkeypatch.setattr(archivo_service, 'DOCUMENTOS_POR_PARTE', 3)
+    creadas = []
+    for i in range(24):
+        fecha = AHORA - timedelta(days=30 * i + 3)
+        creadas.append(crear('transaccion', {
+            'tipo': 'Ingreso' if i % 3 else 'Egreso',
+            'descripcion': f'Movimiento {i}',
+            'monto': 100 * (i + 1),
+            'fecha': fecha.isoformat(),
+        }))
+    return creadas
+
+
+def test_archivar_y_leer_de_vuelta(cliente, transacciones):
+    corte = archivo_service.fecha_corte(ahora=AHORA)
+    antiguas = [t for t in transacciones if datetime.fromisoformat(t['fecha']) < corte]
+
+    resultado = archivo_service.archivar('transaccion', ahora=AHORA)
+    assert resultado['archivados'] == len(antiguas)
+    assert resultado['omitidos'] == 0
+    assert len(cliente.get('/api/transaccion/').get_json()['data']) == len(transacciones) - len(antiguas)
+
+    # El resumen de los periodos cuadra con lo archivado
+    periodos = cliente.get('/api/archivo/?coleccion=transaccion').get_json()['data']
+    assert sum(periodo['documentos'] for periodo in periodos) == len(antiguas)
+    assert sum(periodo['monto_total'] for periodo in periodos) == sum(t['monto'] for t in antiguas)
+
+    # Cada documento se lee de vuelta igual a como estaba
+    for original in antiguas:
+        periodo = archivo_service.periodo_de(datetime.fromisoformat(original['fecha']))
+        respuesta = cliente.get(f'/api/archivo/transaccion/{periodo}/{original["id_transaccion"]}/')
+        assert respuesta.status_code == 200
+        archivado = respuesta.get_json()['data']
+        assert {campo: archivado.get(campo) for campo in original} == original
+
+
+def test_archivar_de_nuevo_no_duplica(cliente, transacciones):
+    primera = archivo_service.archivar('transaccion', ahora=AHORA)
+    assert archivo_service.archivar('transaccion', ahora=AHORA)['archivados'] == 0
+
+    periodos = cliente.get('/api/archivo/?coleccion=transaccion').get_json()['data']
+    assert sum(periodo['documentos'] for periodo in periodos) == primera['archivados']
+
+
+def test_simular_no_mueve_documentos(cliente, transacciones):
+    resultado = archivo_service.archivar('transaccion', ahora=AHORA, simular=True)
+    assert resultado['archivados'] > 0
+    assert len(cliente.get('/api/transaccion/').get_json()['data']) == len(transacciones)
+    assert cliente.get('/api/archivo/?coleccion=transaccion').get_json()['data'] == []
+
+
+def test_periodos_invalidos(cliente):
+    assert cliente.get('/api/archivo/transaccion/2020-13/').status_code == 400
+    assert cliente.get('/api/archivo/pago/2020-01/').status_code == 404
+    assert cliente.get('/api/archivo/transaccion/2001-01/').status_code == 404
+
+
+def test_periodo_paginado_con_cursor(cliente, crear, monkeypatch):
+    monkeypatch.setattr(archivo_service, 'DOCUMENTOS_POR_PARTE', 4)
+    fecha = datetime(2024, 3, 10, tzinfo=timezone.utc)
+    ids = {
+        crear('transaccion', {'tipo': 'Ingreso', 'descripcion': f'Cuota {i}', 'monto': 10, 'fecha': (fecha + timedelta(hours=i)).isoformat()})['id_transaccion']
+        for i in range(7)
+    }
+    archivo_service.archivar('transaccion', ahora=AHORA)
+
+    leidos = []
+    cursor = None
+    while True:
+        consulta = f'?limite=3&cursor={cursor}' if cursor else '?limite=3'
+        respuesta = cliente.get(f'/api/archivo/transaccion/2024-03/{consulta}').get_json()
+        leidos.extend(registro['id_transaccion'] for registro in respuesta['data'])
+        assert len(respuesta['data']) <= 3
+        cursor = respuesta['siguiente']
+        if cursor is None:
+            break
+    assert len(leidos) == len(ids) and set(leidos) == ids
+
+    assert cliente.get('/api/archivo/transaccion/2024-03/?cursor=desconocido').status_code == 400
+    assert cliente.get('/api/archivo/transaccion/2024-03/?limite=0').status_code == 400
+    assert cliente.get('/api/archivo/transaccion/2024-03/?limite=x').status_code == 400
+
+
+def test_no_se_archiva_el_mes_en_curso():
+    with pytest.raises(archivo_service.ErrorArchivo):
+        archivo_service.archivar('transaccion', meses=0, ahora=AHORA)
@@ -0,0 +1,61 @@
+# backend/tests/test_asignacion.py
+
+import pytest
+
+from firebase_config import db
+from services.asignacion_service import cargar_motor, guardar_asignaciones
+
+
+@pytest.fixture
+def tecnico(crear, ahora):
+    return crear('personal', {
+        'nombre': 'Luis', 'apepat': 'Mora', 'apemat': 'Vera', 'cargo': 'Mantenimiento',
+        'telefono': '+56933333333', 'email': 'luis@example.com', 'fecha_contratacion': ahora.isoformat(),
+    })
+
+
+@pytest.fixture
+def solicitud(crear, residente, ahora):
+    def solicitud(prioridad='Media'):
+        return crear('solicitud', {
+            'residente': residente['id_residente'], 'tipo': 'Mantenimiento', 'descripcion': 'Llave que gotea',
+            'fecha_creacion': ahora.isoformat(), 'estado': 'Pendiente', 'prioridad': prioridad,
+        })
+    return solicitud
+
+
+def asignar(cliente, **datos):
+    return cliente.post('/api/solicitud/asignar/', json=datos)
+
+
+def test_asigna_hasta_el_limite_por_prioridad(cliente, tecnico, solicitud):
+    alta = solicitud('Alta')
+    solicitud('Baja')
+    solicitud('Media')
+
+    datos = asignar(cliente, limite=2).get_json()['data']
+    assert (datos['asignadas'], datos['sin_asignar'], datos['descartadas'], datos['restantes']) == (2, 0, 0, 1)
+    assert datos['asignaciones'][0] == {'solicitud': alta['key'], 'personal': tecnico['key']}
+    guardada = db.document(alta['key']).get()
+    assert guardada.get('estado') == 'En Proceso'
+    assert guardada.get('personal').path == tecnico['key']
+
+    datos = asignar(cliente).get_json()['data']
+    assert (datos['asignadas'], datos['restantes']) == (1, 0)
+
+
+def test_descarta_las_que_cambiaron_mientras_se_calculaba(tecnico, solicitud):
+    primera = solicitud()
+    segunda = solicitud()
+    asignaciones, _ = cargar_motor().asignar()
+    db.document(primera['key']).update({'estado': 'Cancelada'})
+
+    guardadas, descartadas = guardar_asignaciones(asignaciones)
+    assert [s for s, _ in guardadas] == [segunda['key']]
+    assert descartadas == [primera['key']]
+    assert not db.document(primera['key']).get().to_dict().get('personal')
+
+
+@pytest.mark.parametrize('limite', [0, -1, 501, 'diez'])
+def test_limite_invalido(cliente, limite):
+    assert asignar(cliente, limite=limite).status_code == 400
@@ -0,0 +1,68 @@
+# backend/tests/test_auth.py
+
+import base64
+import json
+import urllib.error
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+import firebase_config
+from services import auth_service
+from services.auth_service import ClavesNoDisponibles, VerificadorTokens, registrar_autenticacion
+
+
+def _parte(datos):
+    return base64.urlsafe_b64encode(json.dumps(datos).encode()).rstrip(b'=').decode()
+
+
+# Token con la forma de un ID token (la firma no se llega a revisar)
+TOKEN = '.'.join([_parte({'alg': 'RS256', 'kid': 'k1'}), _parte({'sub': 'u1'}), 'ZmlybWE'])
+
+
+def sin_red():
+    raise urllib.error.URLError('sin conexión')
+
+
+def aplicacion(verificador):
+    app = Flask(__name__)
+    app.config['AUTH_REQUIRED'] = True
+    registrar_autenticacion(app, verificador)
+    app.add_url_rule('/api/prueba/', 'prueba', lambda: 'ok')
+    return app.test_client()
+
+
+def test_sin_claves_responde_503_en_json():
+    respuesta = aplicacion(VerificadorTokens('proyecto', obtener_claves=sin_red)).get(
+        '/api/prueba/', headers={'Authorization': f'Bearer {TOKEN}'}
+    )
+    assert respuesta.status_code == 503
+    assert respuesta.get_json()['status'] == 'error'
+    assert respuesta.headers['Retry-After']
+
+
+def test_con_claves_anteriores_se_siguen_usando():
+    instante = [0.0]
+    respuestas = [({'k1': 'clave'}, 60)]
+
+    def obtener_claves():
+        if not respuestas:
+            sin_red()
+        return respuestas.pop()
+
+    verificador = VerificadorTokens('proyecto', obtener_claves=obtener_claves, reloj=lambda: instante[0])
+    assert verificador._clave_para('k1') == 'clave'
+    instante[0] = 120
+    assert verificador._clave_para('k1') == 'clave'
+    with pytest.raises(ClavesNoDisponibles):
+        VerificadorTokens('proyecto', obtener_claves=sin_red)._clave_para('k1')
+
+
+def test_sin_proyecto_no_arranca(monkeypatch):
+    monkeypatch.setattr(firebase_config, 'firebase', SimpleNamespace(project_id=None))
+    monkeypatch.setattr(auth_service, '_verificador', None)
+    app = Flask(__name__)
+    app.config['AUTH_REQUIRED'] = True
+    with pytest.raises(ValueError):
+        registrar_autenticacion(app)
@@ -0,0 +1,64 @@
+# backend/tests/test_busqueda.py
+
+import pytest
+
+from services.busqueda_service import BuscadorTextos, buscador
+
+
+@pytest.fixture
+def queja(crear, residente, ahora):
+    def queja(descripcion):
+        return crear('queja', {
+            'residente': residente['id_residente'], 'descripcion': descripcion,
+            'fecha_creacion': ahora.isoformat(), 'estado': 'Pendiente',
+        })
+    return queja
+
+
+def buscar(cliente, consulta):
+    return cliente.get('/api/buscar/', query_string={'q': consulta})
+
+
+def cargar():
+    buscador.cargar_en_segundo_plano().join()
+
+
+def test_el_indice_se_carga_fuera_de_la_solicitud(cliente, queja):
+    creada = queja('Filtración en el baño del segundo piso')
+    # La escritura solo agrega el cambio al registro: no construye el índice
+    assert buscador.instancia()._indice is None
+
+    respuesta = buscar(cliente, 'filtración')
+    assert respuesta.status_code == 503
+    cargar()
+
+    resultados = buscar(cliente, 'filtracion').get_json()['data']
+    assert [r['key'] for r in resultados] == [creada['key']]
+
+
+def test_cambios_con_el_indice_cargado(cliente, queja):
+    cargar()
+    creada = queja('Ruido de la bomba de agua')
+    assert [r['key'] for r in buscar(cliente, 'bomba').get_json()['data']] == [creada['key']]
+
+    assert cliente.delete(f'/api/queja/{creada["id_queja"]}/').status_code == 200
+    assert buscar(cliente, 'bomba').get_json()['data'] == []
+
+
+def test_cambios_de_otro_proceso_y_reconstruccion(cliente, queja):
+    cargar()
+    local = buscador.instancia()
+    local.intervalo_recarga = 0
+    otro = BuscadorTextos(local.directorio)
+
+    otro.retirar('queja/no-existe')
+    primera = queja('Portón del estacionamiento no cierra')
+    assert len(buscar(cliente, 'porton').get_json()['data']) == 1
+
+    # Otro proceso reconstruye: se sigue respondiendo con el índice actual
+    # mientras el nuevo snapshot se carga en segundo plano
+    otro.reconstruir()
+    assert [r['key'] for r in buscar(cliente, 'porton').get_json()['data']] == [primera['key']]
+    cargar()
+    assert local._generacion == otro._generacion
+    assert [r['key'] for r in buscar(cliente, 'porton').get_json()['data']] == [primera['key']]
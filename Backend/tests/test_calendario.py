@@ -0,0 +1,54 @@
+# backend/tests/test_calendario.py
+
+from datetime import timedelta
+
+import pytest
+
+from services.calendario_service import calendario
+
+
+@pytest.fixture
+def personal(crear, ahora):
+    return crear('personal', {
+        'nombre': 'Ana', 'apepat': 'Soto', 'apemat': 'Rojas', 'cargo': 'Conserje',
+        'telefono': '+56911111111', 'email': 'ana@example.com', 'fecha_contratacion': ahora.isoformat(),
+    })
+
+
+@pytest.fixture
+def mantenimiento(crear, personal, ahora):
+    def mantenimiento(inicio, horas, estado='Pendiente'):
+        return crear('mantenimiento', {
+            'tipo': 'Ascensor', 'descripcion': 'Revisión', 'costo': 1000, 'estado': estado,
+            'personal': personal['id_personal'],
+            'fecha_inicio': (ahora + timedelta(hours=inicio)).isoformat(),
+            'fecha_fin': (ahora + timedelta(hours=inicio + horas)).isoformat(),
+        })
+    return mantenimiento
+
+
+def consultar(cliente, ahora, desde, hasta):
+    respuesta = cliente.get('/api/mantenimiento/calendario/', query_string={
+        'desde': (ahora + timedelta(hours=desde)).isoformat(),
+        'hasta': (ahora + timedelta(hours=hasta)).isoformat(),
+    })
+    assert respuesta.status_code == 200, respuesta.get_json()
+    return respuesta.get_json()['data']
+
+
+@pytest.mark.parametrize('reconstruir', [False, True])
+def test_solapados_con_personal(cliente, ahora, personal, mantenimiento, reconstruir):
+    primero = mantenimiento(0, 2)
+    mantenimiento(5, 1)
+    mantenimiento(1, 2, estado='Completado')
+    if reconstruir:
+        # El índice se vuelve a construir leyendo los modelos desde Firestore
+        calendario.invalidar()
+
+    datos = consultar(cliente, ahora, 1, 3)
+    assert len(datos['mantenimientos']) == 2
+    assert primero['key'] in [m['key'] for m in datos['mantenimientos']]
+    assert all(m['personal'] == personal['key'] for m in datos['mantenimientos'])
+    assert datos['personal_ocupado'] == [personal['key']]
+
+    assert consultar(cliente, ahora, 10, 12)['mantenimientos'] == []
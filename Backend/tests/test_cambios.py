@@ -0,0 +1,85 @@
+# backend/tests/test_cambios.py
+
+from types import SimpleNamespace
+
+from services.cambios_service import FeedCambios, INTERVALO_REINICIO
+
+
+class Listener:
+    def __init__(self, callback):
+        self.callback = callback
+        self.is_active = True
+
+    def unsubscribe(self):
+        self.is_active = False
+
+
+# Cliente de Firestore mínimo: guarda los listeners abiertos por colección
+class Cliente:
+    def __init__(self):
+        self.listeners = {}
+
+    def collection(self, ruta):
+        def on_snapshot(callback):
+            listener = Listener(callback)
+            self.listeners.setdefault(ruta, []).append(listener)
+            return listener
+        return SimpleNamespace(on_snapshot=on_snapshot)
+
+
+def _documento(id_documento, **datos):
+    return SimpleNamespace(id=id_documento, to_dict=lambda: datos)
+
+
+def _cambio(tipo, documento):
+    return SimpleNamespace(type=SimpleNamespace(name=tipo), document=documento)
+
+
+def _pendientes(suscripcion):
+    eventos = []
+    while not suscripcion.eventos.empty():
+        eventos.append(suscripcion.eventos.get_nowait())
+    return eventos
+
+
+def _feed(instante):
+    cliente = Cliente()
+    return cliente, FeedCambios(cliente, colecciones={'solicitud': 'solicitudes'}, reloj=lambda: instante[0])
+
+
+def test_documento_que_deja_de_cumplir_el_filtro_se_publica_eliminado():
+    cliente, feed = _feed([0])
+    suscripcion = feed.suscribir(['solicitud'], {'estado': 'Pendiente'})
+    callback = cliente.listeners['solicitudes'][0].callback
+    callback([_documento('s1', estado='Pendiente')], [], None)
+
+    callback([], [_cambio('ADDED', _documento('s2', estado='Pendiente'))], None)
+    callback([], [_cambio('MODIFIED', _documento('s1', estado='En Proceso'))], None)
+    callback([], [_cambio('ADDED', _documento('s3', estado='Resuelta'))], None)
+
+    assert [(e['id'], e['tipo']) for e in _pendientes(suscripcion)] == [('s2', 'creado'), ('s1', 'eliminado')]
+
+
+def test_listener_caido_se_reabre_y_publica_lo_que_cambio():
+    instante = [0]
+    cliente, feed = _feed(instante)
+    suscripcion = feed.suscribir(['solicitud'])
+    primero = cliente.listeners['solicitudes'][0]
+    primero.callback([_documento('s1', estado='Pendiente'), _documento('s2', estado='Pendiente')], [], None)
+
+    primero.is_active = False
+    feed.revisar()
+    assert len(cliente.listeners['solicitudes']) == 1
+
+    instante[0] = INTERVALO_REINICIO
+    feed.revisar()
+    segundo = cliente.listeners['solicitudes'][1]
+    segundo.callback([_documento('s1', estado='En Proceso'), _documento('s3', estado='Pendiente')], [], None)
+
+    eventos = sorted((e['id'], e['tipo']) for e in _pendientes(suscripcion))
+    assert eventos == [('s1', 'actualizado'), ('s2', 'eliminado'), ('s3', 'creado')]
+
+
+def test_coleccion_desconocida_responde_400(cliente):
+    respuesta = cliente.get('/api/cambios/', query_string={'colecciones': 'pago'})
+    assert respuesta.status_code == 400
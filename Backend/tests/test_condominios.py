@@ -0,0 +1,71 @@
+# backend/tests/test_condominios.py
+
+import sys
+
+import pytest
+
+import importar
+from app import app as aplicacion
+from services.condominio_service import instalar_particion, listar_condominios, registrar_condominio
+
+DEPARTAMENTO = {'numero': '101', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'}
+
+
+@pytest.fixture
+def multi(monkeypatch):
+    instalar_particion()
+    monkeypatch.setitem(aplicacion.config, 'MULTI_CONDOMINIO', True)
+
+
+def en(condominio):
+    return {'X-Condominio': condominio}
+
+
+def test_datos_separados_por_condominio(multi, cliente):
+    assert registrar_condominio('norte', 'Torre Norte')
+    assert registrar_condominio('sur')
+    assert not registrar_condominio('norte')
+    assert sorted(c['id'] for c in listar_condominios()) == ['norte', 'sur']
+
+    # El número de departamento es único dentro de cada condominio
+    norte = cliente.post('/api/departamento/', json=DEPARTAMENTO, headers=en('norte'))
+    assert norte.status_code == 201, norte.get_json()
+    assert cliente.post('/api/departamento/', json=DEPARTAMENTO, headers=en('sur')).status_code == 201
+    assert cliente.post('/api/departamento/', json=DEPARTAMENTO, headers=en('norte')).status_code == 409
+
+    datos = norte.get_json()['data']
+    listado = cliente.get('/api/departamento/', headers=en('norte')).get_json()['data']
+    assert [d['key'] for d in listado] == [f'condominios/norte/departamento/{datos["id_departamento"]}']
+    assert cliente.get(f'/api/departamento/{datos["id_departamento"]}/', headers=en('sur')).status_code == 404
+
+
+def test_condominio_no_registrado_o_sin_encabezado(multi, cliente):
+    assert cliente.get('/api/departamento/', headers=en('oeste')).status_code == 404
+    assert cliente.get('/api/departamento/').status_code == 400
+
+    registrar_condominio('oeste')
+    assert cliente.get('/api/departamento/', headers=en('oeste')).status_code == 200
+
+
+def test_importar_registra_el_condominio(multi, cliente, tmp_path, monkeypatch):
+    archivo = tmp_path / 'departamentos.csv'
+    archivo.write_text('numero,piso,tipo,superficie,estado\n201,2,Propietario,60,Ocupado\n', encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['importar.py', 'departamentos', str(archivo), '--condominio', 'este'])
+
+    assert importar.main() == 0
+    listado = cliente.get('/api/departamento/', headers=en('este')).get_json()['data']
+    assert [d['numero'] for d in listado] == ['201']
+
+
+def test_instancias_por_condominio_con_maximo(monkeypatch):
+    from services import condominio_service
+    from services.condominio_service import PorCondominio, en_condominio
+
+    creadas = []
+    servicio = PorCondominio(lambda condominio: creadas.append(condominio) or object())
+    monkeypatch.setattr(condominio_service, 'MAX_INSTANCIAS', 2)
+    for condominio in ('a', 'b', 'a', 'c', 'a'):
+        with en_condominio(condominio):
+            servicio.instancia()
+    # 'b' se descarta al entrar 'c'; 'a' se sigue usando y no se reconstruye
+    assert creadas == ['a', 'b', 'c']
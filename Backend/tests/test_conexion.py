@@ -0,0 +1,26 @@
+# backend/tests/test_conexion.py
+
+from google.cloud import firestore_v1
+from google.cloud.firestore_v1.services.firestore import client as firestore_client
+
+from firebase_config import db
+from services import conexion_service
+
+
+def test_version_de_firestore_probada():
+    assert firestore_v1.__version__.startswith(conexion_service.VERSIONES_FIRESTORE)
+
+
+def test_las_llamadas_pasan_por_el_pool():
+    pool = conexion_service.pool
+    antes = pool.metricas()['llamadas']
+    db.document('pruebas/uno').set({'valor': 1})
+    assert db.document('pruebas/uno').get().get('valor') == 1
+    assert pool.metricas()['llamadas'] >= antes + 2
+    assert db._firestore_api._transport.grpc_channel is pool
+
+
+# El client_info del cliente va en su transporte, no en una variable global
+# que afectaría a otros clientes del proceso
+def test_el_client_info_no_cambia_el_modulo():
+    assert getattr(firestore_client, '_client_info', None) is not db._client_info
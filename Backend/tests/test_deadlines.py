@@ -0,0 +1,44 @@
+# backend/tests/test_deadlines.py
+
+import time
+
+import pytest
+
+import firebase_config
+from services import deadline_service
+from services.deadline_service import DeadlineExcedido, acotar_timeout
+
+
+@pytest.mark.parametrize('valor', ['0', '-1', '61', 'abc'])
+def test_encabezado_fuera_de_rango_responde_400(cliente, valor):
+    respuesta = cliente.get('/api/departamento/', headers={'X-Request-Timeout': valor})
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()['status'] == 'error'
+
+
+def test_timeout_se_acota_al_tiempo_restante():
+    assert acotar_timeout(30) == 30
+    token = deadline_service._vence.set(time.monotonic() + 1)
+    try:
+        assert acotar_timeout(30) <= 1
+        assert acotar_timeout(None) <= 1
+        assert acotar_timeout(0.5) == 0.5
+    finally:
+        deadline_service._vence.reset(token)
+
+    token = deadline_service._vence.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DeadlineExcedido):
+            acotar_timeout(30)
+    finally:
+        deadline_service._vence.reset(token)
+
+
+# Una llamada a Firestore más lenta que el plazo de la solicitud termina en 504
+def test_firestore_lento_responde_504(cliente, departamento):
+    firebase_config.inyeccion.latencia = 0.5
+    inicio = time.monotonic()
+    respuesta = cliente.get(f"/api/departamento/{departamento['id_departamento']}/", headers={'X-Request-Timeout': '0.1'})
+    assert respuesta.status_code == 504
+    assert respuesta.get_json()['status'] == 'error'
+    assert time.monotonic() - inicio < 0.5
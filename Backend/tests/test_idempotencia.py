@@ -0,0 +1,44 @@
+# backend/tests/test_idempotencia.py
+
+from datetime import datetime, timedelta, timezone
+
+from services.idempotencia_service import almacen
+
+
+def _transaccion(ahora, monto=100):
+    return {'tipo': 'Ingreso', 'descripcion': 'Arriendo sala', 'monto': monto, 'fecha': ahora.isoformat()}
+
+
+def test_reintento_reproduce_la_primera_respuesta(cliente, ahora):
+    encabezados = {'Idempotency-Key': 'clave-1'}
+    primera = cliente.post('/api/transaccion/', json=_transaccion(ahora), headers=encabezados)
+    segunda = cliente.post('/api/transaccion/', json=_transaccion(ahora), headers=encabezados)
+
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.headers.get('Idempotent-Replayed') == 'true'
+    assert segunda.get_json() == primera.get_json()
+    assert len(cliente.get('/api/transaccion/').get_json()['data']) == 1
+
+
+def test_misma_clave_con_otro_contenido(cliente, ahora):
+    encabezados = {'Idempotency-Key': 'clave-2'}
+    assert cliente.post('/api/transaccion/', json=_transaccion(ahora), headers=encabezados).status_code == 201
+    respuesta = cliente.post('/api/transaccion/', json=_transaccion(ahora, monto=200), headers=encabezados)
+    assert respuesta.status_code == 422
+    assert len(cliente.get('/api/transaccion/').get_json()['data']) == 1
+
+
+def test_sin_clave_no_se_deduplica(cliente, ahora):
+    for _ in range(2):
+        assert cliente.post('/api/transaccion/', json=_transaccion(ahora)).status_code == 201
+    assert len(cliente.get('/api/transaccion/').get_json()['data']) == 2
+
+
+# Una reserva de un proceso que murió sin completarla se reemplaza al vencer
+def test_reserva_vencida_se_reemplaza():
+    assert almacen.reclamar('reserva-vencida', 'huella-a') is None
+    almacen._documento('reserva-vencida').update({'expira': datetime.now(timezone.utc) - timedelta(seconds=1)})
+
+    assert almacen.reclamar('reserva-vencida', 'huella-b') is None
+    registro = almacen.reclamar('reserva-vencida', 'huella-c')
+    assert registro['huella'] == 'huella-b'
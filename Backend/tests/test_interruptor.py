@@ -0,0 +1,101 @@
+# backend/tests/test_interruptor.py
+
+import pytest
+from google.api_core.exceptions import ServiceUnavailable
+
+import firebase_config
+from firebase_config import db
+from services.interruptor_service import interruptor, CacheRespaldo, CircuitoAbierto, ABIERTO, SEMIABIERTO, CERRADO
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    instante = [1000.0]
+    monkeypatch.setattr(interruptor, '_reloj', lambda: instante[0])
+    return instante
+
+
+def _leer():
+    return db.collection('prueba').document('a').get(retry=None, timeout=1)
+
+
+def _abrir_con_fallas():
+    firebase_config.inyeccion.tasa_fallas = 1.0
+    for _ in range(interruptor.minimo):
+        if interruptor.estado == ABIERTO:
+            break
+        with pytest.raises(ServiceUnavailable):
+            _leer()
+    firebase_config.inyeccion.tasa_fallas = 0.0
+
+
+def test_se_abre_con_fallas_y_rechaza_sin_llamar(reloj):
+    _abrir_con_fallas()
+    assert interruptor.estado == ABIERTO
+
+    # Con el circuito abierto no se llega al almacén, aunque ya responda
+    with pytest.raises(CircuitoAbierto):
+        _leer()
+
+
+def test_semiabierto_se_cierra_con_sondeos_exitosos(reloj):
+    _abrir_con_fallas()
+    reloj[0] += interruptor.espera
+
+    for _ in range(interruptor.sondeos - 1):
+        _leer()
+        assert interruptor.estado == SEMIABIERTO
+    _leer()
+    assert interruptor.estado == CERRADO
+
+
+def test_sondeo_fallido_vuelve_a_abrir(reloj):
+    _abrir_con_fallas()
+    reloj[0] += interruptor.espera
+
+    firebase_config.inyeccion.tasa_fallas = 1.0
+    with pytest.raises(ServiceUnavailable):
+        _leer()
+    assert interruptor.estado == ABIERTO
+    assert interruptor.reintentar_en() == interruptor.espera
+
+
+def test_lecturas_http_desde_respaldo_con_circuito_abierto(cliente, crear, departamento, reloj):
+    respuesta = cliente.get('/api/departamento/resumen/')
+    assert respuesta.status_code == 200
+
+    _abrir_con_fallas()
+    respaldo = cliente.get('/api/departamento/resumen/')
+    assert respaldo.status_code == 200
+    assert respaldo.headers.get('X-Cache') == 'stale'
+    assert respaldo.get_json() == respuesta.get_json()
+
+    # Las escrituras no tienen respaldo
+    nuevo = {'numero': '102', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'}
+    assert cliente.post('/api/departamento/', json=nuevo).status_code == 503
+
+
+def test_respaldo_acotado_en_bytes():
+    cache = CacheRespaldo(maximo=100, maximo_bytes=10)
+    for clave in 'abc':
+        cache.guardar(clave, 200, b'1234', 'application/json')
+    # La tercera entrada supera los 10 bytes: se descarta la más antigua
+    assert (len(cache), cache.bytes) == (2, 8)
+    assert cache.obtener('a', 60) is None
+    cache.guardar('b', 200, b'123456', 'application/json')
+    assert (len(cache), cache.bytes) == (2, 10)
+
+
+def test_solo_se_traduce_el_circuito_abierto(cliente, monkeypatch, reloj):
+    from controllers.departamento_controller import recurso
+
+    _abrir_con_fallas()
+    # Rechazada por el circuito: 503
+    respuesta = cliente.post('/api/departamento/', json={
+        'numero': '102', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado',
+    })
+    assert respuesta.status_code == 503
+
+    # Un error del handler que no viene del circuito se responde tal cual
+    monkeypatch.setattr(recurso, 'crear', lambda datos: 1 / 0)
+    assert cliente.post('/api/departamento/', json={'numero': '102'}).status_code == 500
@@ -0,0 +1,34 @@
+# backend/tests/test_limites.py
+
+import pytest
+
+from app import app as aplicacion
+from services.limite_service import instalar_proxies
+
+
+@pytest.fixture
+def limitado(cliente, monkeypatch):
+    monkeypatch.setitem(aplicacion.config, 'RATE_LIMIT_CAPACIDAD', 2)
+    monkeypatch.setitem(aplicacion.config, 'RATE_LIMIT_TASA', 0.001)
+    monkeypatch.setattr(aplicacion, 'wsgi_app', aplicacion.wsgi_app)
+    return cliente
+
+
+def obtener(cliente, reenviado):
+    return cliente.get('/api/departamento/x/', headers={'X-Forwarded-For': reenviado}).status_code
+
+
+def test_sin_proxies_confiables_se_ignora_x_forwarded_for(limitado, monkeypatch):
+    monkeypatch.setitem(aplicacion.config, 'PROXIES_CONFIABLES', 0)
+    instalar_proxies(aplicacion)
+    estados = [obtener(limitado, f'203.0.113.{i}') for i in range(3)]
+    assert estados == [404, 404, 429]
+
+
+def test_con_un_proxy_cada_cliente_tiene_su_cubeta(limitado, monkeypatch):
+    monkeypatch.setitem(aplicacion.config, 'PROXIES_CONFIABLES', 1)
+    instalar_proxies(aplicacion)
+    assert [obtener(limitado, '198.51.100.1') for _ in range(3)] == [404, 404, 429]
+    assert obtener(limitado, '198.51.100.2') == 404
+    # Una dirección falsa agregada por el cliente antes de la del proxy no cuenta
+    assert obtener(limitado, '10.9.9.9, 198.51.100.1') == 429
@@ -0,0 +1,35 @@
+# backend/tests/test_listado.py
+
+from firebase_config import db
+from models import Departamento
+
+
+# Números repetidos (p. ej. datos importados antes de exigir unicidad) no deben
+# perderse ni repetirse entre páginas
+def test_paginas_no_pierden_numeros_repetidos(cliente):
+    coleccion = db.collection(Departamento.collection_name)
+    ids = []
+    for numero, id_departamento in [('101', 'a'), ('101', 'b'), ('101', 'c'), ('102', 'd'), ('103', 'e')]:
+        coleccion.document(id_departamento).set({'numero': numero, 'piso': 1, 'tipo': 'Propietario', 'estado': 'Ocupado'})
+        ids.append(id_departamento)
+
+    vistos, cursor = [], None
+    while True:
+        parametros = {'limite': 2, **({'cursor': cursor} if cursor else {})}
+        respuesta = cliente.get('/api/departamento/resumen/', query_string=parametros).get_json()
+        vistos += [departamento['id_departamento'] for departamento in respuesta['data']]
+        cursor = respuesta['siguiente']
+        if cursor is None:
+            break
+        assert cursor.startswith(('101/', '102/', '103/'))
+
+    assert vistos == ids
+
+
+def test_cursor_con_solo_el_numero_salta_ese_numero(cliente):
+    coleccion = db.collection(Departamento.collection_name)
+    for numero, id_departamento in [('101', 'a'), ('101', 'b'), ('102', 'c')]:
+        coleccion.document(id_departamento).set({'numero': numero, 'piso': 1, 'tipo': 'Propietario', 'estado': 'Ocupado'})
+
+    respuesta = cliente.get('/api/departamento/resumen/', query_string={'cursor': '101'}).get_json()
+    assert [departamento['id_departamento'] for departamento in respuesta['data']] == ['c']
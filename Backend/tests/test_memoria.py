@@ -0,0 +1,62 @@
+# backend/tests/test_memoria.py
+
+import pytest
+from google.api_core.exceptions import FailedPrecondition
+from google.cloud import firestore
+
+from firebase_config import db
+
+
+def test_consulta_con_filtro_orden_y_cursor():
+    coleccion = db.collection('pruebas')
+    for numero in range(10):
+        coleccion.document(f'd{numero}').set({'numero': numero, 'par': numero % 2 == 0})
+
+    consulta = coleccion.where('par', '==', True).order_by('numero', direction=firestore.Query.DESCENDING)
+    primera = list(consulta.limit(2).stream())
+    assert [s.get('numero') for s in primera] == [8, 6]
+
+    siguiente = list(consulta.start_after(primera[-1]).limit(2).stream())
+    assert [s.get('numero') for s in siguiente] == [4, 2]
+
+
+def test_lote_atomico_con_precondicion():
+    referencia = db.document('pruebas/uno')
+    referencia.set({'valor': 1})
+    actualizado = referencia.get().update_time
+
+    lote = db.batch()
+    lote.set(db.document('pruebas/dos'), {'valor': 2})
+    lote.update(referencia, {'valor': 3}, option=db.write_option(last_update_time=actualizado))
+    lote.commit()
+    assert referencia.get().get('valor') == 3
+
+    lote = db.batch()
+    lote.set(db.document('pruebas/tres'), {'valor': 3})
+    lote.update(referencia, {'valor': 4}, option=db.write_option(last_update_time=actualizado))
+    with pytest.raises(FailedPrecondition):
+        lote.commit()
+    # Nada del lote fallido queda escrito
+    assert not db.document('pruebas/tres').get().exists
+    assert referencia.get().get('valor') == 3
+
+
+def test_transaccion_lee_y_escribe():
+    referencia = db.document('pruebas/contador')
+    referencia.set({'valor': 0})
+
+    @firestore.transactional
+    def incrementar(transaction):
+        snapshot = referencia.get(transaction=transaction)
+        transaction.update(referencia, {'valor': snapshot.get('valor') + 1})
+
+    for _ in range(3):
+        incrementar(db.transaction())
+    assert referencia.get().get('valor') == 3
+
+
+def test_campo_unico_del_modelo(crear, cliente):
+    datos = {'numero': '101', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'}
+    crear('departamento', datos)
+    respuesta = cliente.post('/api/departamento/', json=datos)
+    assert respuesta.status_code == 409
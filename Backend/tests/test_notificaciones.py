@@ -0,0 +1,54 @@
+# backend/tests/test_notificaciones.py
+
+from datetime import timedelta
+
+from firebase_config import db
+from models import Notificacion
+from services.notificacion_service import (
+    COLECCION_COLAS, ColaDespacho, TransporteFalso, guardar_y_encolar, registrar_latido, reencolar_pendientes
+)
+
+
+# Cola sin hilos: lo encolado queda en memoria para revisarlo
+def nueva_cola():
+    cola = ColaDespacho()
+    cola.registrar_canal('falso', TransporteFalso())
+    registrar_latido(cola)
+    return cola
+
+
+def pendientes(cantidad):
+    return [{'residente': f'residente/r{i}', 'tipo': 'Recordatorio', 'mensaje': 'Corte de agua'} for i in range(cantidad)]
+
+
+def test_no_se_reencolan_las_de_una_cola_viva():
+    cola = nueva_cola()
+    assert guardar_y_encolar(pendientes(3), cola=cola) == 3
+
+    assert reencolar_pendientes(cola, antiguedad=0) == 0
+    assert reencolar_pendientes(nueva_cola(), antiguedad=0) == 0
+    assert cola.pendientes() == 3
+
+
+def test_se_reencolan_las_de_una_cola_sin_latido(ahora):
+    perdida = nueva_cola()
+    guardar_y_encolar(pendientes(2), cola=perdida)
+    db.collection(COLECCION_COLAS).document(perdida.id).set({'latido': ahora - timedelta(hours=1)})
+
+    cola = nueva_cola()
+    assert reencolar_pendientes(cola) == 2
+    assert {s.get('encolada_por') for s in db.collection(Notificacion.collection_name).stream()} == {cola.id}
+    # Ya tienen una dueña viva: otro barrido no las duplica
+    assert reencolar_pendientes(nueva_cola()) == 0
+
+
+def test_sin_cola_se_reencolan_por_antiguedad(ahora):
+    for horas, id_notificacion in ((0, 'reciente'), (2, 'antigua')):
+        db.document(f'notificacion/{id_notificacion}').set({
+            'residente': db.document('residente/r1'), 'tipo': 'Recordatorio', 'mensaje': 'Corte de agua',
+            'fecha_envio': ahora - timedelta(hours=horas), 'estado': 'Pendiente',
+        })
+
+    cola = nueva_cola()
+    assert reencolar_pendientes(cola) == 1
+    assert db.document('notificacion/antigua').get().get('encolada_por') == cola.id
@@ -0,0 +1,96 @@
+# backend/tests/test_pagos.py
+
+import pytest
+
+
+@pytest.fixture
+def cuota(crear, departamento, ahora):
+    return crear('cuota', {
+        'departamento': departamento['id_departamento'],
+        'monto': 100,
+        'periodo': '2024-01',
+        'fecha_vencimiento': ahora.isoformat(),
+        'estado': 'Pendiente',
+    })
+
+
+@pytest.fixture
+def pagar(cliente, ahora):
+    def pagar(departamento, monto, encabezados=None, **campos):
+        datos = {
+            'departamento': departamento,
+            'monto': monto,
+            'fecha_pago': ahora.isoformat(),
+            'periodo': '2024-01',
+            'metodo_pago': 'Efectivo',
+            **campos,
+        }
+        return cliente.post('/api/pago/registrar/', json=datos, headers=encabezados)
+    return pagar
+
+
+# El resumen incremental debe coincidir con el que se reconstruye desde las colecciones
+def _verificar_reconstruccion(cliente, resumen, id_departamento):
+    antes = resumen(id_departamento)
+    assert cliente.post('/api/departamento/resumen/reconstruir/').status_code == 200
+    assert resumen(id_departamento) == antes
+
+
+def test_pagos_parciales_acumulan_hasta_pagar_la_cuota(cliente, departamento, cuota, pagar, resumen):
+    id_departamento = departamento['id_departamento']
+    assert resumen(id_departamento) == {'saldo_pendiente': 100, 'cuotas_pendientes': 1, 'total_pagado': 0}
+
+    respuesta = pagar(id_departamento, 60, cuota=cuota['id_cuota'])
+    assert respuesta.status_code == 201
+    assert respuesta.get_json()['data']['cuota'] == {'key': cuota['key'], 'estado': 'Pendiente', 'monto_pagado': 60}
+    assert resumen(id_departamento) == {'saldo_pendiente': 40, 'cuotas_pendientes': 1, 'total_pagado': 60}
+    _verificar_reconstruccion(cliente, resumen, id_departamento)
+
+    respuesta = pagar(id_departamento, 40, cuota=cuota['id_cuota'])
+    assert respuesta.get_json()['data']['cuota']['estado'] == 'Pagada'
+    assert resumen(id_departamento) == {'saldo_pendiente': 0, 'cuotas_pendientes': 0, 'total_pagado': 100}
+    _verificar_reconstruccion(cliente, resumen, id_departamento)
+
+
+def test_no_se_paga_dos_veces_una_cuota_pagada(cliente, departamento, cuota, pagar, resumen):
+    id_departamento = departamento['id_departamento']
+    assert pagar(id_departamento, 100, cuota=cuota['id_cuota']).status_code == 201
+    assert pagar(id_departamento, 1, cuota=cuota['id_cuota']).status_code == 409
+    assert resumen(id_departamento)['total_pagado'] == 100
+    assert len(cliente.get('/api/pago/').get_json()['data']) == 1
+
+
+def test_cuota_de_otro_departamento(crear, cuota, pagar):
+    otro = crear('departamento', {'numero': '102', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'})
+    assert pagar(otro['id_departamento'], 100, cuota=cuota['id_cuota']).status_code == 409
+
+
+def test_morosidad_se_cancela_solo_con_el_pago_completo(crear, departamento, pagar, ahora):
+    id_departamento = departamento['id_departamento']
+    pago = pagar(id_departamento, 10).get_json()['data']['pago']
+    morosidad = crear('morosidad', {
+        'pago': pago['id_pago'],
+        'monto_atrasado': 50,
+        'fecha_retraso': ahora.isoformat(),
+        'intereses': 5,
+        'estado': 'Activo',
+    })
+
+    otro = crear('departamento', {'numero': '102', 'piso': 1, 'tipo': 'Propietario', 'superficie': 50, 'estado': 'Ocupado'})
+    assert pagar(otro['id_departamento'], 55, morosidad=morosidad['id_morosidad']).status_code == 409
+
+    parcial = pagar(id_departamento, 20, morosidad=morosidad['id_morosidad'])
+    assert parcial.get_json()['data']['morosidad']['estado'] == 'Activo'
+    completo = pagar(id_departamento, 55, morosidad=morosidad['id_morosidad'])
+    assert completo.get_json()['data']['morosidad']['estado'] == 'Cancelado'
+
+
+def test_pago_idempotente_no_duplica_el_resumen(departamento, cuota, pagar, resumen):
+    id_departamento = departamento['id_departamento']
+    encabezados = {'Idempotency-Key': 'pago-1'}
+    primera = pagar(id_departamento, 60, encabezados, cuota=cuota['id_cuota'])
+    segunda = pagar(id_departamento, 60, encabezados, cuota=cuota['id_cuota'])
+
+    assert primera.status_code == segunda.status_code == 201
+    assert segunda.headers.get('Idempotent-Replayed') == 'true'
+    assert resumen(id_departamento) == {'saldo_pendiente': 40, 'cuotas_pendientes': 1, 'total_pagado': 60}
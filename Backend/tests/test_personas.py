@@ -0,0 +1,54 @@
+# backend/tests/test_personas.py
+
+import threading
+
+from firebase_config import db
+from services.personas_service import BuscadorPersonas
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+def nombres(resultados):
+    return [r['nombre'] for r in resultados]
+
+
+def test_reconstruye_en_segundo_plano_con_el_indice_anterior(residente, monkeypatch):
+    reloj = Reloj()
+    buscador = BuscadorPersonas(vigencia=60, reloj=reloj)
+    assert nombres(buscador.buscar('perez')) == ['Juan Pérez Soto']
+
+    # Un residente creado por otro worker aparece al vencer la vigencia
+    db.collection('residente').document('r2').set({
+        'departamento': db.document(residente['departamento']), 'nombre': 'Marta', 'apepat': 'Pérez',
+        'apemat': 'Lagos', 'rut': '87654321-K', 'telefono': '+56944444444', 'email': 'marta@example.com',
+    })
+    construir = buscador._construir
+    liberar = threading.Event()
+    monkeypatch.setattr(buscador, '_construir', lambda: liberar.wait(5) and construir())
+
+    reloj.ahora = 61
+    # Mientras se reconstruye se sigue respondiendo con el índice anterior,
+    # y las escrituras de este worker se conservan en el nuevo
+    assert nombres(buscador.buscar('perez')) == ['Juan Pérez Soto']
+    db.document(residente['key']).delete()
+    buscador.retirar(residente['key'])
+    assert buscador.buscar('perez') == []
+
+    liberar.set()
+    buscador.reconstruir_en_segundo_plano().join()
+    assert nombres(buscador.buscar('perez')) == ['Marta Pérez Lagos']
+
+
+def test_invalidar_no_descarta_el_indice(residente):
+    buscador = BuscadorPersonas()
+    assert nombres(buscador.buscar('juan')) == ['Juan Pérez Soto']
+    buscador.invalidar()
+    assert nombres(buscador.buscar('juan')) == ['Juan Pérez Soto']
+    buscador.reconstruir_en_segundo_plano().join()
+    assert buscador._vigente()
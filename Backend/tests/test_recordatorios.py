@@ -0,0 +1,15 @@
+# backend/tests/test_recordatorios.py
+
+from firebase_config import db
+from services.condominio_service import en_condominio
+from services.recordatorio_service import ids_existentes
+
+
+def test_ids_existentes_en_el_condominio_actual():
+    db.document('condominios/norte/notificacion/recordatorio-a').set({'estado': 'Enviado'})
+    db.document('notificacion/recordatorio-b').set({'estado': 'Enviado'})
+    ids = ['recordatorio-a', 'recordatorio-b', 'recordatorio-c']
+
+    with en_condominio('norte'):
+        assert ids_existentes(ids) == {'recordatorio-a'}
+    assert ids_existentes(ids) == {'recordatorio-b'}
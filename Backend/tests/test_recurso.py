@@ -0,0 +1,26 @@
+# backend/tests/test_recurso.py
+
+from controllers.mantenimiento_controller import recurso
+
+
+def test_un_hook_que_falla_no_falla_la_escritura(cliente, monkeypatch, ahora):
+    invalidados = []
+
+    def fallar(argumento):
+        raise RuntimeError('índice no disponible')
+
+    monkeypatch.setattr(recurso, 'al_guardar', [fallar])
+    monkeypatch.setattr(recurso, 'al_eliminar', [fallar])
+    monkeypatch.setattr(recurso, 'invalidar', [lambda: invalidados.append(True)])
+
+    respuesta = cliente.post('/api/mantenimiento/', json={
+        'tipo': 'Bombas', 'descripcion': 'Cambio de sello', 'costo': 500, 'estado': 'Pendiente',
+        'fecha_inicio': ahora.isoformat(), 'fecha_fin': ahora.isoformat(),
+    })
+    assert respuesta.status_code == 201
+    id_mantenimiento = respuesta.get_json()['data']['id_mantenimiento']
+    assert cliente.get(f'/api/mantenimiento/{id_mantenimiento}/').status_code == 200
+
+    assert cliente.delete(f'/api/mantenimiento/{id_mantenimiento}/').status_code == 200
+    assert cliente.get(f'/api/mantenimiento/{id_mantenimiento}/').status_code == 404
+    assert len(invalidados) == 2